@@ -0,0 +1,196 @@
+import argparse
+import collections
+import datetime
+import json
+import sys
+
+import datacache
+import datastore
+import results
+
+# ----------------- Admissions analytics -----------------
+# Counters kept by a write hook on the students collection, so every
+# admission, status change, marks update and deletion adjusts them in the
+# same transaction. One table, one row per (metric, a, b):
+#
+#   students    -          -      every student
+#   admissions  course     day    admissions per course per applied_at day
+#   status      status     -      Pending / Approved / ...
+#   gender      gender     -
+#   marks       bucket     -      scholarship marks histogram, 10-mark buckets
+#
+# The dashboard only ever reads these rows, so it costs the same at any
+# enrollment size. rebuild() recomputes them from the student records.
+
+BUCKET_WIDTH = 10
+ANALYTICS_VERSION = "1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analytics_counts (
+    metric TEXT NOT NULL,
+    a TEXT NOT NULL,
+    b TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (metric, a, b)
+);
+CREATE INDEX IF NOT EXISTS analytics_counts_by_b ON analytics_counts (metric, b);
+"""
+
+
+def course_group(course: str) -> str:
+    # "Tuition Class: 8th" and friends count as one course.
+    return "Tuition" if str(course).startswith("Tuition") else str(course)
+
+def _counts(student) -> collections.Counter:
+    counts = collections.Counter()
+    if not student:
+        return counts
+    counts[("students", "", "")] += 1
+    day = str(student.get("applied_at") or "")[:10] or "unknown"
+    for course in {course_group(c) for c in student.get("courses") or []}:
+        counts[("admissions", course, day)] += 1
+    counts[("status", str(student.get("status") or "Unknown"), "")] += 1
+    counts[("gender", str(student.get("gender") or "Unknown"), "")] += 1
+    marks = results.parse_marks(student.get("scholarship_marks"))
+    if marks is not None:
+        bucket = min(int(marks // BUCKET_WIDTH) * BUCKET_WIDTH, 100)
+        counts[("marks", f"{bucket:03d}", "")] += 1
+    return counts
+
+def _add(conn, deltas: dict):
+    for (metric, a, b), delta in deltas.items():
+        if not delta:
+            continue
+        conn.execute(
+            "INSERT INTO analytics_counts (metric, a, b, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (metric, a, b) DO UPDATE SET count = count + excluded.count",
+            (metric, a, b, delta),
+        )
+        if delta < 0:
+            conn.execute(
+                "DELETE FROM analytics_counts WHERE metric = ? AND a = ? AND b = ? AND count = 0", (metric, a, b)
+            )
+
+def _track_student(conn, collection, key, old, new):
+    deltas = _counts(new)
+    deltas.subtract(_counts(old))
+    _add(conn, deltas)
+
+
+# ----------------- Rebuild -----------------
+
+def _recount(conn) -> collections.Counter:
+    counts = collections.Counter()
+    for (raw,) in conn.execute("SELECT data FROM records WHERE collection = 'students'"):
+        counts.update(_counts(json.loads(raw)))
+    return counts
+
+def rebuild(db_path: str = None) -> int:
+    # Recomputes every counter from the student records; returns the student count.
+    with datastore.transaction(db_path) as conn:
+        counts = _recount(conn)
+        conn.execute("DELETE FROM analytics_counts")
+        conn.executemany(
+            "INSERT INTO analytics_counts (metric, a, b, count) VALUES (?, ?, ?, ?)",
+            [key + (count,) for key, count in counts.items()],
+        )
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('analytics_built', ?)", (ANALYTICS_VERSION,))
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('analytics_rebuilt_at', ?)",
+                     (str(datetime.datetime.now()),))
+    return counts[("students", "", "")]
+
+def verify(db_path: str = None) -> list:
+    # (metric, a, b, stored, actual) for every counter that has drifted.
+    with datastore.transaction(db_path) as conn:
+        expected = _recount(conn)
+        stored = {(m, a, b): c for m, a, b, c in conn.execute("SELECT metric, a, b, count FROM analytics_counts")}
+    return [key + (stored.get(key, 0), expected.get(key, 0))
+            for key in sorted(set(expected) | set(stored)) if stored.get(key, 0) != expected.get(key, 0)]
+
+def _ensure_built(db_path: str = None):
+    # Counters only exist for writes made since the hook was registered;
+    # the first read after an upgrade counts everything once.
+    conn = datastore.get_connection(db_path)
+    row = conn.execute("SELECT value FROM meta WHERE name = 'analytics_built'").fetchone()
+    if not row or row[0] != ANALYTICS_VERSION:
+        rebuild(db_path)
+
+
+# ----------------- Reading -----------------
+
+def _metric(conn, metric: str) -> dict:
+    return {a: count for a, count in conn.execute(
+        "SELECT a, count FROM analytics_counts WHERE metric = ? ORDER BY a", (metric,))}
+
+def summary(db_path: str = None) -> dict:
+    _ensure_built(db_path)
+    conn = datastore.get_connection(db_path)
+    marks = _metric(conn, "marks")
+    with_marks = sum(marks.values())
+    passed = sum(count for bucket, count in marks.items() if results.grade(float(bucket))[1] == results.PASSED)
+    return {
+        "students": _metric(conn, "students").get("", 0),
+        "status": _metric(conn, "status"),
+        "gender": _metric(conn, "gender"),
+        "marks": {f"{int(b)}-{min(int(b) + BUCKET_WIDTH - 1, 100)}" if int(b) < 100 else "100": c
+                  for b, c in marks.items()},
+        "with_marks": with_marks,
+        "pass_rate": passed / with_marks if with_marks else None,
+    }
+
+def admissions(date_from: str, date_to: str, db_path: str = None) -> list:
+    # (day, course, count) for days in [date_from, date_to], "YYYY-MM-DD".
+    _ensure_built(db_path)
+    return datastore.get_connection(db_path).execute(
+        "SELECT b, a, count FROM analytics_counts WHERE metric = 'admissions' AND b BETWEEN ? AND ? ORDER BY b, a",
+        (date_from, date_to),
+    ).fetchall()
+
+
+# ----------------- Chart data -----------------
+
+def dashboard(days: int = 90, db_path: str = None) -> dict:
+    # Everything the Admin Panel charts need, as plain dicts and lists.
+    # Cached until the next write to the students collection or recount.
+    today = datetime.date.today()
+    date_from = str(today - datetime.timedelta(days=days - 1))
+    rebuilt = datastore.get_connection(db_path).execute(
+        "SELECT value FROM meta WHERE name = 'analytics_rebuilt_at'"
+    ).fetchone()
+    stamp = datastore.cache_stamp("students", db_path)
+    stamp = stamp and (*stamp, rebuilt)
+
+    def load():
+        daily = collections.defaultdict(dict)
+        per_course = collections.Counter()
+        for day, course, count in admissions(date_from, str(today), db_path):
+            daily[day][course] = count
+            per_course[course] += count
+        return {
+            "summary": summary(db_path),
+            "daily": dict(daily),
+            "per_course": dict(per_course.most_common()),
+            "date_from": date_from,
+        }
+
+    return datacache.get(f"analytics:{db_path}:{days}:{today}", stamp, load)
+
+
+datastore.register_schema(SCHEMA)
+datastore.register_hook("students", _track_student)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Admissions analytics counters")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="recount everything from the student records")
+    sub.add_parser("verify", help="compare the counters with a full recount")
+    args = parser.parse_args()
+    if args.command == "rebuild":
+        print(f"Counted {rebuild()} students")
+    else:
+        drift = verify()
+        for metric, a, b, stored, actual in drift:
+            print(f"{metric} {a} {b}: stored {stored}, actual {actual}")
+        print(f"{len(drift)} counters differ")
+        sys.exit(1 if drift else 0)
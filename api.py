@@ -0,0 +1,207 @@
+import argparse
+import asyncio
+import json
+import mimetypes
+import os
+import sys
+import threading
+import time
+import urllib.parse
+
+import bulk_pdfs
+import datastore
+import exporter
+import pdfs
+import results
+import sessions
+
+try:
+    import uvicorn
+except ImportError:  # serving over HTTP needs uvicorn; the ASGI app itself does not
+    uvicorn = None
+
+# ----------------- Read-only results API -----------------
+# A small ASGI app for result day, run next to the Streamlit app:
+#
+#   python api.py --port 8600
+#
+#   GET /results/<admission_no>       -> {"admission_no", "name", "marks", "status"}
+#   GET /certificates/<admission_no>  -> certificate PDF (completed courses only)
+#   GET /files/<token>                -> a finished export or certificate batch
+#
+# Lookups are answered from an in-memory index of pre-encoded responses, so
+# a request never parses records or touches SQLite. The index is rebuilt
+# whenever the students collection version changes, checked at most once
+# per RELOAD_INTERVAL seconds.
+
+RELOAD_INTERVAL = 1.0
+URL_ENV = "FICSE_API_URL"  # where browsers reach this app, for download links
+DEFAULT_URL = "http://localhost:8600"
+DOWNLOAD_DIRS = (exporter.EXPORT_DIR, bulk_pdfs.BATCH_DIR)
+FILE_CHUNK = 256 * 1024
+
+
+def _result_body(adm: str, name: str, marks: float) -> bytes:
+    shown, status = results.grade(marks)
+    return json.dumps({
+        "admission_no": adm,
+        "name": name,
+        "marks": shown,
+        "status": results.STATUS_LABELS[status],
+    }, ensure_ascii=False).encode("utf-8")
+
+
+class ResultIndex:
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path
+        self.version = None
+        self.results = {}      # admission_no -> encoded result, or None if no marks yet
+        self.certificates = {}  # admission_no -> name, for completed courses only
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        now = time.monotonic()
+        if now - self.checked_at < RELOAD_INTERVAL:
+            return
+        with self.lock:
+            if now - self.checked_at < RELOAD_INTERVAL:
+                return
+            version = datastore.collection_version("students", self.db_path)
+            if version != self.version:
+                self.load(version)
+            self.checked_at = now
+
+    def load(self, version: int):
+        rows = datastore.get_connection(self.db_path).execute(
+            "SELECT key, COALESCE(json_extract(data, '$.full_name'), json_extract(data, '$.name'), 'Unknown'), "
+            "json_extract(data, '$.scholarship_marks'), json_extract(data, '$.course_completed') "
+            "FROM records WHERE collection = 'students'"
+        ).fetchall()
+        bodies, certificates = {}, {}
+        for adm, name, marks, completed in rows:
+            marks = results.parse_marks(marks)
+            bodies[adm] = None if marks is None else _result_body(adm, name, marks)
+            if completed:
+                certificates[adm] = name
+        # Swapped in whole, so requests in flight see either the old or the new index.
+        self.results, self.certificates, self.version = bodies, certificates, version
+
+
+# ----------------- File downloads -----------------
+# Exports and certificate batches can run to hundreds of MB. The admin page
+# links here instead of handing the bytes to Streamlit, which would hold the
+# whole file in memory; this sends it from disk a chunk at a time. A link
+# carries a short-lived signed token naming the file (see sessions.py), and
+# only files under DOWNLOAD_DIRS are served.
+
+def download_url(path: str) -> str:
+    base = (os.environ.get(URL_ENV) or DEFAULT_URL).rstrip("/")
+    return f"{base}/files/{sessions.issue('file', path)}"
+
+def _download_path(token: str):
+    claims = sessions.verify(token, "file")
+    if not claims:
+        return None
+    path = os.path.realpath(claims["sub"])
+    allowed = [os.path.realpath(directory) + os.sep for directory in DOWNLOAD_DIRS]
+    if not any(path.startswith(directory) for directory in allowed) or not os.path.isfile(path):
+        return None
+    return path
+
+
+# ----------------- ASGI app -----------------
+
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+def _error(message: str) -> bytes:
+    return json.dumps({"error": message}).encode("utf-8")
+
+NOT_FOUND = _error("Admission Number not found.")
+NO_MARKS = _error("Marks not available yet.")
+NOT_COMPLETED = _error("Course not completed yet.")
+
+
+async def _send(send, status: int, body: bytes, headers=JSON_HEADERS):
+    await send({"type": "http.response.start", "status": status,
+                "headers": headers + [(b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+async def _send_file(send, path: str):
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    filename = urllib.parse.quote(os.path.basename(path))
+    with open(path, "rb") as f:
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(os.fstat(f.fileno()).st_size).encode()),
+            (b"content-disposition", f"attachment; filename*=UTF-8''{filename}".encode()),
+        ]})
+        while chunk := await asyncio.to_thread(f.read, FILE_CHUNK):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+def make_app(db_path: str = None):
+    index = ResultIndex(db_path)
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    index.refresh()
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        if scope["method"] != "GET":
+            await _send(send, 405, _error("Method not allowed."))
+            return
+        index.refresh()
+        # ASGI servers hand over the path already percent-decoded.
+        kind, _, key = scope["path"].strip("/").partition("/")
+        if kind == "results" and key:
+            if key not in index.results:
+                await _send(send, 404, NOT_FOUND)
+            elif index.results[key] is None:
+                await _send(send, 404, NO_MARKS)
+            else:
+                await _send(send, 200, index.results[key])
+        elif kind == "certificates" and key:
+            name = index.certificates.get(key)
+            if name is None:
+                await _send(send, 404, NOT_FOUND if key not in index.results else NOT_COMPLETED)
+                return
+            # Rendering is CPU work; repeat downloads come from the PDF cache.
+            pdf = await asyncio.to_thread(pdfs.certificate_pdf, {"full_name": name})
+            filename = urllib.parse.quote(f"Certificate_{name}.pdf")
+            await _send(send, 200, pdf, [
+                (b"content-type", b"application/pdf"),
+                (b"content-disposition", f"attachment; filename*=UTF-8''{filename}".encode()),
+            ])
+        elif kind == "files" and key:
+            path = _download_path(key)
+            if path is None:
+                await _send(send, 404, _error("Link expired or file not found."))
+            else:
+                await _send_file(send, path)
+        else:
+            await _send(send, 404, _error("Not found."))
+
+    app.index = index
+    return app
+
+app = make_app()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve read-only result and certificate lookups and file downloads")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+    datastore.use_data_dir()
+    if uvicorn is None:
+        print("Serving the API needs uvicorn (pip install uvicorn)")
+        sys.exit(1)
+    uvicorn.run(app, host=args.host, port=args.port, access_log=False, log_level="warning")
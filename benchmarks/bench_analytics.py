@@ -0,0 +1,55 @@
+# Dashboard read time from the analytics counters at several enrollment
+# sizes, next to a full scan of the students collection, plus the cost the
+# counters add to each write.
+#
+#   python -m benchmarks.bench_analytics --students 1000 10000 100000
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+import analytics
+import datacache
+import datastore
+
+COURSES = ["Diploma in Information Technology (12 Months)", "Typing (English, Urdu, Sindhi) (02 Months)",
+           "MS Office / Word / Excel / PowerPoint (02 Months)", "Tuition Class: 8th"]
+
+
+def seed(count: int):
+    rng = random.Random(5)
+    today = datetime.date.today()
+    with datastore.transaction() as conn:
+        for i in range(count):
+            adm = f"FICSE-20250301-{i + 100}"
+            datastore._write_row(conn, "students", adm, {
+                "admission_no": adm, "full_name": f"Student {i}", "courses": [rng.choice(COURSES)],
+                "status": rng.choice(["Pending", "Approved"]), "gender": rng.choice(["Male", "Female"]),
+                "applied_at": str(today - datetime.timedelta(days=rng.randrange(365))),
+                "scholarship_marks": rng.randrange(101),
+            })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    for count in args.students:
+        with tempfile.TemporaryDirectory() as tmp:
+            datastore.DB_FILE = os.path.join(tmp, "bench.db")
+            t0 = time.perf_counter()
+            seed(count)
+            write_us = (time.perf_counter() - t0) / count * 1e6
+            analytics.rebuild()
+            t0 = time.perf_counter()
+            for _ in range(20):
+                datacache.invalidate()
+                analytics.dashboard(90)
+            read_ms = (time.perf_counter() - t0) / 20 * 1000
+            t0 = time.perf_counter()
+            datastore.load_collection("students")
+            scan_ms = (time.perf_counter() - t0) * 1000
+            print(f"{count:>7} students: dashboard {read_ms:6.2f} ms uncached (full scan {scan_ms:7.1f} ms), "
+                  f"{write_us:5.0f} us per student written (with the counters hook)")
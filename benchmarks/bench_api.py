@@ -0,0 +1,125 @@
+# Result-day load on the read-only API: starts `api.py` under uvicorn on a
+# synthetic student table and drives GET /results/<adm> from keep-alive
+# connections for a fixed time.
+#
+#   python -m benchmarks.bench_api --students 20000 --connections 1 16 64 --seconds 5
+#
+# --in-process calls the ASGI app directly instead, which measures the
+# handler alone without HTTP parsing.
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import datastore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(count: int) -> list:
+    keys = []
+    with datastore.transaction() as conn:
+        for i in range(count):
+            adm = f"FICSE-20250301-{i + 100}"
+            record = {"admission_no": adm, "full_name": f"Student {i}", "courses": ["Python"]}
+            if i % 10:
+                record["scholarship_marks"] = i % 101
+            datastore._write_row(conn, "students", adm, record)
+            keys.append(adm)
+    return keys
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_for(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("API did not start")
+
+
+async def client(port: int, keys: list, stop: float, latencies: list):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    rng = random.Random()
+    try:
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            writer.write(f"GET /results/{rng.choice(keys)} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        writer.close()
+
+async def drive(port: int, keys: list, connections: int, seconds: float) -> list:
+    latencies = []
+    stop = time.perf_counter() + seconds
+    await asyncio.gather(*(client(port, keys, stop, latencies) for _ in range(connections)))
+    return latencies
+
+async def drive_in_process(app, keys: list, seconds: float) -> list:
+    async def receive():
+        return {"type": "http.request", "body": b""}
+    async def send(message):
+        pass
+    latencies = []
+    rng = random.Random()
+    stop = time.perf_counter() + seconds
+    while time.perf_counter() < stop:
+        t0 = time.perf_counter()
+        scope = {"type": "http", "method": "GET", "path": f"/results/{rng.choice(keys)}"}
+        await app(scope, receive, send)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+def report(label: str, latencies: list, seconds: float):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{label:>16}: {len(latencies) / seconds:9.0f} req/s   p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--in-process", action="store_true")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        datastore.DB_FILE = os.path.join(tmp, datastore.DB_FILE)
+        keys = seed(args.students)
+        if args.in_process:
+            import api
+            app = api.make_app()
+            report("in-process", asyncio.run(drive_in_process(app, keys, args.seconds)), args.seconds)
+            sys.exit(0)
+        port = free_port()
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "api.py"), "--port", str(port)],
+                                  cwd=tmp, env=env)
+        try:
+            wait_for(port)
+            for connections in args.connections:
+                latencies = asyncio.run(drive(port, keys, connections, args.seconds))
+                report(f"{connections} connections", latencies, args.seconds)
+        finally:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,44 @@
+# Bulk certificate throughput for different worker counts.
+#
+#   python -m benchmarks.bench_bulk --students 2000 --workers 1 2 4
+import argparse
+import os
+import tempfile
+import time
+
+import bulk_pdfs
+import datastore
+
+
+def seed(count: int):
+    with datastore.transaction() as conn:
+        for i in range(count):
+            adm = f"BENCH-{i:05d}"
+            datastore._write_row(conn, "students", adm, {
+                "admission_no": adm,
+                "full_name": f"Student {i}",
+                "courses": ["Python"],
+                "status": "Approved",
+                "applied_at": "2025-03-01 10:00:00",
+                "course_completed": True,
+            })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        datastore.DB_FILE = os.path.join(tmp, "bench.db")
+        bulk_pdfs.BATCH_DIR = os.path.join(tmp, "exports")
+        seed(args.students)
+        keys = bulk_pdfs.select_students(completed_only=True)
+        for workers in args.workers:
+            batch_id = bulk_pdfs.create_batch("certificate", keys)
+            t0 = time.perf_counter()
+            result = bulk_pdfs.run_batch(batch_id, workers=workers)
+            elapsed = time.perf_counter() - t0
+            size = os.path.getsize(result["zip_path"]) / (1024 * 1024)
+            print(f"{workers} workers: {result['done']} certificates in {elapsed:.1f} s "
+                  f"({result['done'] / elapsed:.0f}/s), ZIP {size:.1f} MB")
@@ -0,0 +1,57 @@
+# Fee postings per second, and defaulter / daily-total reads from the running
+# aggregates versus summing the whole ledger.
+#
+#   python -m benchmarks.bench_fees --students 5000 --postings 50000
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+import datastore
+import fees
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--postings", type=int, default=50000)
+    args = parser.parse_args()
+    rng = random.Random(3)
+    courses = [c[0] for c in fees.COURSES]
+    with tempfile.TemporaryDirectory() as tmp:
+        datastore.DB_FILE = os.path.join(tmp, "bench.db")
+        keys = [f"FICSE-20250301-{i + 100}" for i in range(args.students)]
+        datastore.put_records("students", {k: {"admission_no": k, "courses": [rng.choice(courses)]} for k in keys})
+        t0 = time.perf_counter()
+        with datastore.transaction():
+            for i in range(args.postings):
+                adm = rng.choice(keys)
+                kind = rng.choice(("charge", "payment", "payment", "waiver"))
+                day = datetime.date(2025, 1, 1) + datetime.timedelta(days=rng.randrange(365))
+                fees.post(adm, rng.choice(courses), kind, rng.randrange(1, 30) * 500, day=day)
+        elapsed = time.perf_counter() - t0
+        print(f"posting: {args.postings / elapsed:8.0f} entries/s")
+
+        conn = datastore.get_connection()
+        for label, read, scan in (
+            ("top 50 defaulters", lambda: fees.defaulters(limit=50), lambda: conn.execute(
+                "SELECT admission_no, course, SUM(CASE kind WHEN 'charge' THEN amount ELSE -amount END) AS due "
+                "FROM fee_ledger GROUP BY admission_no, course HAVING due > 0 ORDER BY due DESC LIMIT 50").fetchall()),
+            ("one month's totals", lambda: fees.daily_totals("2025-03-01", "2025-03-31"), lambda: conn.execute(
+                "SELECT day, SUM(amount) FROM fee_ledger WHERE kind = 'payment' AND day BETWEEN '2025-03-01' "
+                "AND '2025-03-31' GROUP BY day").fetchall()),
+        ):
+            t0 = time.perf_counter()
+            for _ in range(20):
+                read()
+            fast = (time.perf_counter() - t0) / 20 * 1000
+            t0 = time.perf_counter()
+            for _ in range(20):
+                scan()
+            slow = (time.perf_counter() - t0) / 20 * 1000
+            print(f"{label:>20}: {fast:7.2f} ms from aggregates, {slow:7.2f} ms summing the ledger")
+        t0 = time.perf_counter()
+        problems = fees.verify()
+        print(f"replay check: {len(problems)} mismatches in {(time.perf_counter() - t0) * 1000:.0f} ms")
@@ -0,0 +1,66 @@
+# How long an admin's rerun is blocked by a gallery upload: processing the
+# photos inline (as before) versus storing them and submitting a media job.
+# Then times the job itself on the runner's process pool.
+#
+#   python -m benchmarks.bench_jobs --photos 20 --size 2400x1800
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+import blobs
+import jobs
+import media
+
+
+class Upload(io.BytesIO):
+    # Stands in for Streamlit's UploadedFile.
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def photos(count: int, width: int, height: int, seed: int) -> list:
+    files = []
+    for i in range(count):
+        out = io.BytesIO()
+        Image.effect_noise((width, height), 40 + seed + i).convert("RGB").save(out, "JPEG", quality=90)
+        files.append(Upload(out.getvalue(), f"photo_{seed}_{i}.jpg"))
+    return files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=20)
+    parser.add_argument("--size", default="2400x1800")
+    parser.add_argument("--processes", type=int, default=jobs.PROCESSES)
+    args = parser.parse_args()
+    width, height = map(int, args.size.split("x"))
+    jobs.POLL_INTERVAL = 0.05
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        inline_files, queued_files = photos(args.photos, width, height, 0), photos(args.photos, width, height, 1)
+
+        t0 = time.perf_counter()
+        for f in inline_files:
+            media.register_upload(f, "gallery")
+        inline = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        items = []
+        for f in queued_files:
+            blob = blobs.store_stream(f, f.name)
+            items.append({"path": blob["path"], "hash": blob["hash"], "caption": f.name})
+        job_id = jobs.submit("media", {"kind": "gallery", "items": items})
+        queued = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        jobs.Runner(threads=1, processes=args.processes).run(until_idle=True)
+        background = time.perf_counter() - t0
+        job = jobs.get_job(job_id)
+        print(f"{args.photos} photos of {args.size}: rerun blocked {inline * 1000:7.0f} ms inline, "
+              f"{queued * 1000:5.0f} ms with a job; job {job['status']} in {background:.1f} s "
+              f"({args.processes} processes, including pool start-up)")
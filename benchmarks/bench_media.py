@@ -0,0 +1,59 @@
+# Bytes sent per page view with original photos vs. the derivatives.
+#
+#   python -m benchmarks.bench_media                 # synthetic phone photos
+#   python -m benchmarks.bench_media gallery alumni  # real upload folders
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from PIL import Image, ImageFilter
+
+import media
+
+
+def synthetic_photos(directory: str, count: int):
+    rng = random.Random(3)
+    for i in range(count):
+        # Noise blurred a little compresses roughly like a real phone photo.
+        image = Image.effect_noise((3000, 4000), 60).filter(ImageFilter.GaussianBlur(1))
+        image = Image.merge("RGB", (image, image.rotate(90, expand=False), image.transpose(Image.FLIP_LEFT_RIGHT)))
+        image.save(os.path.join(directory, f"photo_{i}.jpg"), quality=rng.randint(88, 95))
+
+
+def measure(paths, width: int) -> dict:
+    original = sum(os.path.getsize(p) for p in paths)
+    t0 = time.perf_counter()
+    served = [media.display_path(p, width) for p in paths]
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    [media.display_path(p, width) for p in paths]
+    cached = time.perf_counter() - t0
+    return {
+        "images": len(paths),
+        "original_kb": original // 1024,
+        "served_kb": sum(os.path.getsize(p) for p in served) // 1024,
+        "first_view_s": round(first, 2),
+        "cached_view_ms": round(cached * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dirs", nargs="*")
+    parser.add_argument("--photos", type=int, default=12, help="synthetic photos when no dirs are given")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        media.DERIVATIVE_DIR = os.path.join(tmp, "media_cache")
+        dirs = args.dirs
+        if not dirs:
+            dirs = [os.path.join(tmp, "gallery")]
+            os.makedirs(dirs[0])
+            synthetic_photos(dirs[0], args.photos)
+        paths = list(media.iter_images(dirs))
+        for label, width in (("Home / Gallery grid", 640), ("Admin thumbnails", 320)):
+            r = measure(paths, width)
+            print(f"{label}: {r['images']} images, {r['original_kb']} KB original -> {r['served_kb']} KB served "
+                  f"({r['served_kb'] / max(r['original_kb'], 1):.1%}); "
+                  f"first view {r['first_view_s']} s, cached view {r['cached_view_ms']} ms")
@@ -0,0 +1,73 @@
+# What notifications cost the Admission Form: the time to submit one
+# admission with the outbox hook, next to sending its three messages inline
+# over a gateway with the given latency. Then drains the queued messages
+# through the stub gateway / SMTP server, with failures, and reports
+# throughput and retries.
+#
+#   python -m benchmarks.bench_notify --students 300 --delay 0.2 --fail-rate 0.1
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+
+import datastore
+import notify
+import notify_stub
+
+
+def student(i: int) -> dict:
+    adm = f"FICSE-20250301-{i + 100}"
+    return {"admission_no": adm, "full_name": f"Student {i}", "father_name": f"Father {i}",
+            "courses": ["Python"], "contact_no": "03001234567", "whatsapp_no": "03007654321",
+            "email": f"student{i}@example.com", "status": "Pending", "applied_at": "2025-03-01 10:00:00"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--delay", type=float, default=0.2, help="gateway latency per message, seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    parser.add_argument("--rate", type=float, default=50.0, help="per-channel rate limit, messages/s")
+    args = parser.parse_args()
+    notify.BACKOFF_BASE = 0.5
+    notify.POLL_INTERVAL = 0.1
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        stub = notify_stub.StubServers(fail_rate=0.0, delay=args.delay).start()
+        transports = notify.transports_from_env(stub.env())
+
+        # Alternate plain and muted writes so both see the same table sizes.
+        timings = {True: 0.0, False: 0.0}
+        for i in range(args.students * 2):
+            s, quiet = student(i), i % 2 == 1
+            t0 = time.perf_counter()
+            with notify.muted() if quiet else contextlib.nullcontext():
+                datastore.put_record("students", s["admission_no"], s, expected_rev=0)
+            timings[quiet] += time.perf_counter() - t0
+        queued, muted = (timings[q] / args.students * 1000 for q in (False, True))
+        t0 = time.perf_counter()
+        for i in range(5):
+            s = student(i)
+            subject, body = notify.message("admission", s)
+            transports["email"].send(s["email"], subject, body)
+            transports["sms"].send(s["contact_no"], subject, body)
+            transports["whatsapp"].send(s["whatsapp_no"], subject, body)
+        inline = (time.perf_counter() - t0) / 5 * 1000
+        print(f"admission submit: {muted:6.2f} ms without outbox, {queued:6.2f} ms with outbox, "
+              f"{inline:7.1f} ms sending inline")
+
+        stub.received.clear()
+        stub.fail_rate = args.fail_rate
+        rate_limits = dict.fromkeys(notify.CHANNELS, args.rate)
+        t0 = time.perf_counter()
+        # until_idle stops while failed sends wait out their backoff; go again until none are left.
+        while any(c.get("pending") for c in notify.status_counts().values()):
+            notify.Worker(transports, rate_limits=rate_limits, threads=8).run(until_idle=True)
+            time.sleep(notify.POLL_INTERVAL)
+        elapsed = time.perf_counter() - t0
+        sent = sum(c.get("sent", 0) for c in notify.status_counts().values())
+        print(f"drained {sent} messages in {elapsed:.1f} s ({sent / elapsed:.0f}/s, "
+              f"limit {args.rate:g}/s per channel), {stub.rejected} gateway failures retried, "
+              f"{len(stub.received)} delivered")
+        stub.stop()
@@ -0,0 +1,58 @@
+# Rerun latency per page: runs the app headless with Streamlit's AppTest,
+# opens each page once, then times further reruns of it (the cost of every
+# widget interaction on that page).
+#
+#   python -m benchmarks.bench_pages --students 2000 --reruns 20
+#   python -m benchmarks.bench_pages --app /tmp/old_app.py   # compare another version
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["Home", "Register", "Forgot Password", "Login", "Admission Form", "Courses", "Teachers",
+         "Gallery", "Contact", "Admin Panel", "Scholarship", "Careers", "Result", "Certificate"]
+
+
+def seed(count: int):
+    import datastore
+    with datastore.transaction() as conn:
+        for i in range(count):
+            adm = f"FICSE-20250301-{i + 100}"
+            datastore._write_row(conn, "students", adm, {
+                "admission_no": adm, "full_name": f"Student {i}", "father_name": f"Father {i}",
+                "contact_no": "03001234567", "courses": ["Python"], "status": "Pending",
+                "applied_at": "2025-03-01 10:00:00", "scholarship_marks": i % 101,
+            })
+
+
+if __name__ == "__main__":
+    # AppTest compiles the script afresh on every run; a real server compiles
+    # it once and keeps the bytecode, so share one cache the same way.
+    shared_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared_cache
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    args = parser.parse_args()
+    sys.path.insert(0, ROOT)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        seed(args.students)
+        for page in args.pages:
+            at = AppTest.from_file(args.app, default_timeout=120)
+            at.session_state["admin_logged_in"] = True
+            at.run()
+            at.sidebar.selectbox[0].select(page).run()
+            t0 = time.perf_counter()
+            for _ in range(args.reruns):
+                at.run()
+            per_run = (time.perf_counter() - t0) / args.reruns * 1000
+            print(f"{page:>16}: {per_run:7.1f} ms per rerun")
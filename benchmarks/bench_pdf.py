@@ -0,0 +1,126 @@
+# Per-document render time and size: the old imperative FPDF layouts
+# (rebuilt, logo/photo re-decoded on every call) vs. the compiled templates.
+#
+#   python -m benchmarks.bench_pdf
+#   python -m benchmarks.bench_pdf --fonts /usr/share/fonts/truetype/dejavu
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from fpdf import FPDF
+from PIL import Image
+
+import pdf_templates
+import pdfs
+
+STUDENT = {
+    "admission_no": "FICSE-1001",
+    "full_name": "Ayesha Khan",
+    "father_name": "Imran Khan",
+    "date_of_birth": "2006-04-12",
+    "gender": "Female",
+    "religion": "Islam",
+    "caste": "Khan",
+    "nationality": "Pakistani",
+    "qualification": "Matric",
+    "contact_no": "03001234567",
+    "whatsapp_no": "03001234567",
+    "email": "ayesha@example.com",
+    "present_address": "House 12, Main Road, Kandiaro",
+    "courses": ["MS Office", "Web Development", "Python"],
+}
+
+
+def legacy_certificate(student: dict, issued_on: str, logo: str) -> bytes:
+    pdf = FPDF('L', 'mm', 'A4')
+    pdf.add_page()
+    pdf.set_line_width(1)
+    pdf.rect(5, 5, 287, 200)
+    pdf.image(logo, x=10, y=10, w=30)
+    pdf.set_font("Arial", 'B', 36)
+    pdf.set_text_color(0, 51, 102)
+    pdf.cell(0, 60, "Certificate of Completion", ln=True, align='C')
+    pdf.set_font("Arial", '', 20)
+    pdf.set_text_color(0, 0, 0)
+    pdf.ln(10)
+    pdf.multi_cell(0, 10, f"This is to certify that {student['full_name']}", align='C')
+    pdf.ln(5)
+    pdf.multi_cell(0, 10, "has successfully completed the course at FICSE.", align='C')
+    pdf.ln(20)
+    pdf.set_font("Arial", 'I', 14)
+    pdf.cell(0, 10, f"Date: {issued_on}", ln=True, align='C')
+    pdf.ln(15)
+    pdf.set_font("Arial", '', 12)
+    pdf.cell(0, 10, "_____________________", ln=True, align='R')
+    pdf.cell(0, 5, "Director / Principal", ln=True, align='R')
+    return pdf.output(dest="S").encode("latin-1")
+
+def legacy_admission_form(student: dict) -> bytes:
+    pdf = FPDF("P", "mm", "A4")
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "Fayaz Institute", ln=True, align="C")
+    pdf.set_font("Arial", "", 12)
+    pdf.cell(0, 6, "Of Computer Science & Education Kandiaro", ln=True, align="C")
+    pdf.ln(4)
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 8, "Admission Form 2025", ln=True, align="C")
+    pdf.ln(5)
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(0, 8, f"Registration No: {student.get('admission_no')}", ln=True)
+    pdf.image(student["photo_path"], x=160, y=35, w=35)
+    pdf.set_font("Arial", "", 11)
+    pdf.ln(10)
+    for label, field in (("Full Name", "full_name"), ("Father Name", "father_name"),
+                         ("Date of Birth", "date_of_birth"), ("Gender", "gender"), ("Religion", "religion"),
+                         ("Caste", "caste"), ("Nationality", "nationality"), ("Qualification", "qualification"),
+                         ("Contact No", "contact_no"), ("WhatsApp No", "whatsapp_no"), ("Email", "email")):
+        pdf.cell(0, 8, f"{label}: {student.get(field, '')}", ln=True)
+    pdf.multi_cell(0, 8, f"Present Address: {student.get('present_address', '')}")
+    pdf.ln(5)
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, "Selected Courses:", ln=True)
+    pdf.set_font("Arial", "", 11)
+    for c in student.get("courses", []):
+        pdf.cell(0, 7, f"- {c}", ln=True)
+    pdf.ln(10)
+    pdf.cell(0, 8, "Signature of Student: ______________________", ln=True)
+    return pdf.output(dest="S").encode("latin-1")
+
+
+def measure(render, runs: int) -> dict:
+    render()  # warm-up: first use parses fonts and images into the caches
+    times, size = [], 0
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        size = len(render())
+        times.append(time.perf_counter() - t0)
+    return {"ms": statistics.median(times) * 1000, "kb": size / 1024}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--fonts", default=pdf_templates.FONT_DIR, help="directory with the DejaVu TTF files")
+    args = parser.parse_args()
+    pdf_templates.FONT_DIR = args.fonts
+    with tempfile.TemporaryDirectory() as tmp:
+        logo = os.path.join(tmp, "logo.png")
+        photo = os.path.join(tmp, "photo.jpg")
+        Image.effect_noise((600, 600), 40).convert("RGB").save(logo)
+        Image.effect_noise((1200, 1600), 40).convert("RGB").save(photo, quality=90)
+        pdfs.LOGO_PATH = logo
+        student = dict(STUDENT, photo_path=photo)
+        fonts = "DejaVu (subset)" if pdf_templates.unicode_font_available() else "core Arial fallback"
+        print(f"templates use {fonts}; median of {args.runs} renders")
+        cases = (
+            ("certificate", lambda: legacy_certificate(student, "01-01-2025", logo),
+             lambda: pdfs.render_certificate(student, "01-01-2025")),
+            ("admission form", lambda: legacy_admission_form(student), lambda: pdfs.render_admission_form(student)),
+        )
+        for label, before, after in cases:
+            b, a = measure(before, args.runs), measure(after, args.runs)
+            print(f"{label}: {b['ms']:.1f} ms / {b['kb']:.0f} KB before -> {a['ms']:.1f} ms / {a['kb']:.0f} KB after")
@@ -0,0 +1,53 @@
+# Result lookups from the published snapshot versus the old full load of the
+# students collection, at several table sizes.
+#
+#   python -m benchmarks.bench_results --students 1000 10000 100000
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import datastore
+import results
+
+
+def seed(count: int) -> list:
+    keys = []
+    with datastore.transaction() as conn:
+        for i in range(count):
+            adm = f"FICSE-20250301-{i + 100}"
+            datastore._write_row(conn, "students", adm, {
+                "admission_no": adm, "full_name": f"Student {i}", "father_name": f"Father {i}",
+                "courses": ["Python"], "present_address": "Kandiaro", "scholarship_marks": i % 101,
+            })
+            keys.append(adm)
+    return keys
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+    rng = random.Random(1)
+    for count in args.students:
+        with tempfile.TemporaryDirectory() as tmp:
+            datastore.DB_FILE = os.path.join(tmp, "bench.db")
+            path = os.path.join(tmp, "results.snap")
+            keys = seed(count)
+            t0 = time.perf_counter()
+            info = results.publish(path=path)
+            publish_ms = (time.perf_counter() - t0) * 1000
+            snapshot = results.current(path)
+            sample = [rng.choice(keys) for _ in range(args.lookups)]
+            t0 = time.perf_counter()
+            for adm in sample:
+                assert results.current(path).lookup(adm) is not None
+            lookup_us = (time.perf_counter() - t0) / len(sample) * 1e6
+            t0 = time.perf_counter()
+            datastore.load_collection("students")
+            full_ms = (time.perf_counter() - t0) * 1000
+            print(f"{count:>7} students: publish {publish_ms:7.1f} ms, {info['bytes'] / 1024:7.0f} KiB, "
+                  f"lookup {lookup_us:5.1f} us (was a {full_ms:7.1f} ms full load)")
+            snapshot.map.close()
@@ -0,0 +1,86 @@
+# Throughput of the Home page with 1, 2, 4... app processes behind the local
+# proxy: each client holds a Streamlit websocket session and asks for reruns
+# back to back, as a browser would on every click. Needs the websockets
+# package (pip install websockets). Connections are spread round-robin since
+# every client here comes from 127.0.0.1.
+#
+#   python -m benchmarks.bench_scale --workers 1,2,4 --clients 16 --seconds 15
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+import cluster
+import datastore
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+
+def seed(students: int):
+    records = {}
+    for i in range(students):
+        adm = f"FICSE-20250301-{i + 100}"
+        records[adm] = {"admission_no": adm, "full_name": f"Student {i}", "courses": ["Python"],
+                        "status": "Approved" if i % 3 else "Pending", "applied_at": "2025-03-01 10:00:00"}
+    datastore.put_records("students", records)
+
+
+async def client(url: str, deadline: float, latencies: list):
+    rerun = BackMsg()
+    rerun.rerun_script.query_string = ""
+    request = rerun.SerializeToString()
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        first = True
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            await ws.send(request)
+            while True:
+                msg = ForwardMsg()
+                msg.ParseFromString(await ws.recv())
+                if msg.WhichOneof("type") == "script_finished":
+                    break
+            if not first:  # the first run of a session includes its set-up
+                latencies.append(time.perf_counter() - t0)
+            first = False
+
+
+async def load(url: str, clients: int, seconds: float) -> list:
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client(url, deadline, latencies) for _ in range(clients)))
+    return latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated app process counts")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--students", type=int, default=500)
+    args = parser.parse_args()
+    if websockets is None:
+        raise SystemExit("bench_scale needs the websockets package (pip install websockets)")
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients, {args.seconds:g} s per run")
+    with tempfile.TemporaryDirectory() as tmp:
+        datastore.use_data_dir(tmp)
+        seed(args.students)
+        for workers in (int(w) for w in args.workers.split(",")):
+            app = cluster.Cluster(workers, tmp, port=0, sticky=False, quiet=True, api_port=0).start()
+            try:
+                url = f"ws://127.0.0.1:{app.proxy.port}/_stcore/stream"
+                asyncio.run(load(url, workers, 2))  # warm every process up
+                latencies = asyncio.run(load(url, args.clients, args.seconds))
+            finally:
+                app.stop()
+            latencies.sort()
+            print(f"{workers} app processes: {len(latencies) / args.seconds:6.1f} reruns/s, "
+                  f"p50 {statistics.median(latencies) * 1000:6.0f} ms, "
+                  f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.0f} ms")
@@ -0,0 +1,52 @@
+# Top-k latency of the student trigram search on a synthetic table.
+#
+#   python -m benchmarks.bench_search --students 100000
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import datastore
+import search
+
+FIRST = ["Ali", "Aisha", "Sara", "Muhammad", "Fatima", "Bilal", "Zainab", "Hassan", "Ayesha", "Usman",
+         "Sana", "Imran", "Hina", "Kashif", "Rabia", "Asif", "Nida", "Farhan", "Sadia", "Waqas"]
+LAST = ["Khan", "Shah", "Memon", "Soomro", "Abbasi", "Bhutto", "Jatoi", "Chandio", "Qureshi", "Siddiqui",
+        "Mangi", "Lashari", "Panhwar", "Shaikh", "Baloch", "Junejo", "Kalhoro", "Magsi", "Rind", "Talpur"]
+QUERIES = ["ali khan", "ayesha soom", "muhamad", "fatma bhuto", "0300", "41303", "FICSE-2025", "zainab"]
+
+
+def populate(db_path: str, count: int):
+    rng = random.Random(7)
+    with datastore.transaction(db_path) as conn:
+        for i in range(count):
+            adm = f"FICSE-2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}-{i}"
+            datastore._write_row(conn, "students", adm, {
+                "admission_no": adm,
+                "full_name": f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+                "father_name": f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+                "cnic": f"{rng.randint(41000, 45999)}{rng.randint(10 ** 7, 10 ** 8 - 1)}",
+                "contact_no": f"03{rng.randint(0, 49):02d}{rng.randint(10 ** 6, 10 ** 7 - 1)}",
+                "whatsapp_no": "",
+            })
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('search_built', ?)",
+                     (search.INDEX_VERSION,))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        t0 = time.perf_counter()
+        populate(db_path, args.students)
+        print(f"indexed {args.students} students in {time.perf_counter() - t0:.1f}s")
+        for query in QUERIES:
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                hits = search.search_students(query, limit=10, db_path=db_path)
+            ms = (time.perf_counter() - t0) / args.repeat * 1000
+            print(f"{query!r:>16}: {ms:7.2f} ms  top={hits[:3]}")
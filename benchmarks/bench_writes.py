@@ -0,0 +1,65 @@
+# Write throughput of the record store under N concurrent writer processes.
+#
+#   python -m benchmarks.bench_writes --writers 1 2 4 8 --ops 500
+#
+# Each writer inserts its own student records and also increments one shared
+# counter record through update_record. At the end the counter must equal the
+# total number of increments, otherwise an update was lost.
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import datastore
+
+
+def _writer(db_path, writer_id, ops, start_event):
+    start_event.wait()
+    for i in range(ops):
+        adm = f"BENCH-{writer_id}-{i}"
+        datastore.put_record("students", adm, {"admission_no": adm, "full_name": f"Student {i}"},
+                             expected_rev=0, db_path=db_path)
+        datastore.update_record("fees", "counter", lambda c: dict(c, n=c["n"] + 1), retries=1000,
+                                db_path=db_path)
+
+
+def run(writers: int, ops: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        datastore.put_record("fees", "counter", {"n": 0}, db_path=db_path)
+        start_event = multiprocessing.Event()
+        procs = [
+            multiprocessing.Process(target=_writer, args=(db_path, w, ops, start_event))
+            for w in range(writers)
+        ]
+        for p in procs:
+            p.start()
+        t0 = time.perf_counter()
+        start_event.set()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+        counter = datastore.get_record("fees", "counter", db_path=db_path)["n"]
+        inserted = len(datastore.load_collection("students", db_path=db_path))
+    writes = writers * ops * 2
+    return {
+        "writers": writers,
+        "writes": writes,
+        "seconds": round(elapsed, 3),
+        "writes_per_sec": round(writes / elapsed),
+        "lost_updates": writers * ops - counter,
+        "missing_inserts": writers * ops - inserted,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ops", type=int, default=500, help="records written per writer")
+    args = parser.parse_args()
+    print(f"{'writers':>8} {'writes':>8} {'seconds':>8} {'writes/s':>9} {'lost':>5} {'missing':>8}")
+    for n in args.writers:
+        r = run(n, args.ops)
+        print(f"{r['writers']:>8} {r['writes']:>8} {r['seconds']:>8} {r['writes_per_sec']:>9} "
+              f"{r['lost_updates']:>5} {r['missing_inserts']:>8}")
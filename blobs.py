@@ -0,0 +1,165 @@
+import argparse
+import contextlib
+import datetime
+import hashlib
+import os
+import tempfile
+
+import datastore
+
+# ----------------- Configuration -----------------
+BLOB_DIR = "blobs"
+CHUNK_SIZE = 256 * 1024
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Record fields that point at a blob; write hooks keep reference counts in
+# step with them, so a blob is deleted once no record uses it any more.
+BLOB_FIELDS = {
+    "students": "photo_blob",
+    "media": "blob",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    refs INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+"""
+
+_on_free = []
+
+
+class BlobTooLarge(ValueError):
+    pass
+
+
+# ----------------- Storing -----------------
+
+def store_stream(fileobj, filename: str = "", max_bytes: int = MAX_UPLOAD_BYTES) -> dict:
+    # Copies `fileobj` in chunks while hashing it, so memory use stays at one
+    # chunk whatever the file size. Identical content is stored only once.
+    ext = os.path.splitext(filename)[1].lower()
+    tmp_dir = os.path.join(BLOB_DIR, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise BlobTooLarge(f"{filename or 'upload'} is larger than {max_bytes // (1024 * 1024)} MB")
+                digest.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        value = digest.hexdigest()
+        with datastore.transaction() as conn:
+            row = conn.execute("SELECT path, size FROM blobs WHERE hash = ?", (value,)).fetchone()
+            if row and os.path.exists(row[0]):
+                os.remove(tmp_path)
+                # Restart the grace period of an unreferenced blob being reused.
+                conn.execute(
+                    "UPDATE blobs SET created_at = ? WHERE hash = ? AND refs <= 0",
+                    (str(datetime.datetime.now()), value),
+                )
+                return {"hash": value, "path": row[0], "size": row[1]}
+            path = os.path.join(BLOB_DIR, value[:2], value + ext)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            conn.execute(
+                "INSERT INTO blobs (hash, path, size, refs, created_at) VALUES (?, ?, ?, 0, ?) "
+                "ON CONFLICT (hash) DO UPDATE SET path = excluded.path",
+                (value, path, size, str(datetime.datetime.now())),
+            )
+        return {"hash": value, "path": path, "size": size}
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+def on_free(callback):
+    # callback(hash) runs after a blob's last reference is gone.
+    if callback not in _on_free:
+        _on_free.append(callback)
+
+
+# ----------------- Reference counting -----------------
+
+def _adjust(conn, digest: str, delta: int):
+    conn.execute("UPDATE blobs SET refs = refs + ? WHERE hash = ?", (delta, digest))
+    if delta >= 0:
+        return
+    row = conn.execute("SELECT path, refs FROM blobs WHERE hash = ?", (digest,)).fetchone()
+    if row and row[1] <= 0:
+        conn.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+        # The file goes only once this commits: a rollback keeps the row.
+        datastore.after_commit(lambda: _remove(digest, row[0]))
+
+def _remove(digest: str, path: str):
+    # Re-checked under the write lock, since store_stream may have stored
+    # the same bytes again between the commit and now.
+    with datastore.transaction() as conn:
+        if conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone():
+            return
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        for callback in _on_free:
+            callback(digest)
+
+def _track_refs(conn, collection, key, old, new):
+    field = BLOB_FIELDS[collection]
+    old_hash = (old or {}).get(field)
+    new_hash = (new or {}).get(field)
+    if old_hash == new_hash:
+        return
+    if new_hash:
+        _adjust(conn, new_hash, 1)
+    if old_hash:
+        _adjust(conn, old_hash, -1)
+
+def collect_garbage(min_age_hours: int = 24) -> int:
+    # Uploads whose record was never saved (abandoned forms) keep refs = 0.
+    cutoff = str(datetime.datetime.now() - datetime.timedelta(hours=min_age_hours))
+    removed = 0
+    with datastore.transaction() as conn:
+        rows = conn.execute(
+            "SELECT hash FROM blobs WHERE refs <= 0 AND created_at < ?", (cutoff,)
+        ).fetchall()
+        for (digest,) in rows:
+            _adjust(conn, digest, -1)
+            removed += 1
+    return removed
+
+def usage() -> dict:
+    row = datastore.get_connection().execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(refs), 0) FROM blobs"
+    ).fetchone()
+    return {"blobs": row[0], "bytes": row[1], "references": row[2]}
+
+
+datastore.register_schema(SCHEMA)
+for _collection in BLOB_FIELDS:
+    datastore.register_hook(_collection, _track_refs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Content-addressed upload store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gc_cmd = sub.add_parser("gc", help="delete unreferenced blobs")
+    gc_cmd.add_argument("min_age_hours", type=int, nargs="?", default=24)
+    sub.add_parser("usage")
+    args = parser.parse_args()
+    # Through the imported module, on which media registers the on_free
+    # hook that removes resized derivatives along with a blob.
+    import blobs, media  # noqa: F401,E401
+    if args.command == "gc":
+        print(f"{blobs.collect_garbage(args.min_age_hours)} unreferenced blobs removed")
+    else:
+        print(blobs.usage())
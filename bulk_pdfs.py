@@ -0,0 +1,263 @@
+import argparse
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import zipfile
+
+import datastore
+import pdf_templates
+import pdfs
+
+# ----------------- Configuration -----------------
+BATCH_DIR = "exports"
+WORKERS = max(1, (os.cpu_count() or 2) - 1)
+CHUNK_SIZE = 8
+KINDS = ("certificate", "admission")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    filters TEXT NOT NULL,
+    issued_on TEXT,
+    keys TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL,
+    zip_path TEXT,
+    created_at TEXT NOT NULL,
+    finished_at TEXT
+);
+"""
+
+
+# ----------------- Selection -----------------
+
+def select_students(course: str = None, cohort: str = None, status: str = None,
+                    completed_only: bool = False, db_path: str = None) -> list:
+    # Admission numbers in key order, so a batch always lists them the same way.
+    # cohort is the year-month the student applied in, e.g. "2025-03".
+    rows = datastore.get_connection(db_path).execute(
+        "SELECT key FROM records WHERE collection = 'students' "
+        "AND (:status IS NULL OR json_extract(data, '$.status') = :status) "
+        "AND (:cohort IS NULL OR substr(json_extract(data, '$.applied_at'), 1, 7) = :cohort) "
+        "AND (:course IS NULL OR EXISTS "
+        "     (SELECT 1 FROM json_each(data, '$.courses') WHERE value = :course)) "
+        "AND (NOT :completed OR json_extract(data, '$.course_completed')) "
+        "ORDER BY key",
+        {"course": course, "cohort": cohort, "status": status, "completed": int(completed_only)},
+    )
+    return [key for (key,) in rows]
+
+def filter_options(db_path: str = None) -> dict:
+    # Distinct values for the admin selection widgets.
+    conn = datastore.get_connection(db_path)
+    courses = conn.execute(
+        "SELECT DISTINCT c.value FROM records, json_each(records.data, '$.courses') AS c "
+        "WHERE collection = 'students' ORDER BY c.value"
+    ).fetchall()
+    cohorts = conn.execute(
+        "SELECT DISTINCT substr(json_extract(data, '$.applied_at'), 1, 7) AS cohort FROM records "
+        "WHERE collection = 'students' AND cohort IS NOT NULL ORDER BY cohort DESC"
+    ).fetchall()
+    statuses = conn.execute(
+        "SELECT DISTINCT json_extract(data, '$.status') AS status FROM records "
+        "WHERE collection = 'students' AND status IS NOT NULL ORDER BY status"
+    ).fetchall()
+    return {
+        "courses": [r[0] for r in courses],
+        "cohorts": [r[0] for r in cohorts],
+        "statuses": [r[0] for r in statuses],
+    }
+
+
+# ----------------- Batches -----------------
+
+def create_batch(kind: str, keys: list, filters: dict = None, db_path: str = None) -> int:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown document kind: {kind}")
+    # Fixed once, so a batch resumed tomorrow still carries today's date.
+    issued_on = datetime.datetime.now().strftime('%d-%m-%Y') if kind == "certificate" else None
+    with datastore.transaction(db_path) as conn:
+        cursor = conn.execute(
+            "INSERT INTO pdf_batches (kind, filters, issued_on, keys, total, status, created_at) "
+            "VALUES (?, ?, ?, ?, ?, 'pending', ?)",
+            (kind, json.dumps(filters or {}), issued_on, json.dumps(keys), len(keys),
+             str(datetime.datetime.now())),
+        )
+        return cursor.lastrowid
+
+def get_batch(batch_id: int, db_path: str = None):
+    conn = datastore.get_connection(db_path)
+    cursor = conn.execute("SELECT * FROM pdf_batches WHERE id = ?", (batch_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    batch = dict(zip([c[0] for c in cursor.description], row))
+    batch["filters"] = json.loads(batch["filters"])
+    batch["keys"] = json.loads(batch["keys"])
+    batch["failed"] = json.loads(batch["failed"])
+    return batch
+
+def list_batches(limit: int = 10, db_path: str = None) -> list:
+    rows = datastore.get_connection(db_path).execute(
+        "SELECT id FROM pdf_batches ORDER BY id DESC LIMIT ?", (limit,)
+    ).fetchall()
+    return [get_batch(batch_id, db_path) for (batch_id,) in rows]
+
+def delete_batch(batch_id: int, db_path: str = None):
+    batch = get_batch(batch_id, db_path)
+    if not batch:
+        return
+    shutil.rmtree(_parts_dir(batch_id), ignore_errors=True)
+    if batch["zip_path"]:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(batch["zip_path"])
+    with datastore.transaction(db_path) as conn:
+        conn.execute("DELETE FROM pdf_batches WHERE id = ?", (batch_id,))
+
+def _parts_dir(batch_id: int) -> str:
+    return os.path.join(BATCH_DIR, f"batch_{batch_id}")
+
+def _file_name(kind: str, key: str) -> str:
+    return f"Certificate_{key}.pdf" if kind == "certificate" else f"{key}.pdf"
+
+def _update(batch_id: int, db_path: str = None, **fields):
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    with datastore.transaction(db_path) as conn:
+        conn.execute(f"UPDATE pdf_batches SET {assignments} WHERE id = ?", (*fields.values(), batch_id))
+
+
+# ----------------- Rendering -----------------
+# Each PDF is written by the worker straight to its own file under
+# exports/batch_<id>/, so nothing accumulates in memory and a crashed or
+# interrupted batch resumes from the files already there.
+
+def _init_worker(settings: dict):
+    pdfs.LOGO_PATH = settings["logo"]
+    pdf_templates.FONT_DIR = settings["fonts"]
+
+def _render_one(task):
+    kind, key, student, issued_on, target = task
+    try:
+        if kind == "certificate":
+            data = pdfs.render_certificate(student, issued_on)
+        else:
+            data = pdfs.render_admission_form(student)
+        tmp_path = target + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+        return key, None
+    except Exception as e:
+        return key, f"{type(e).__name__}: {e}"
+
+def run_batch(batch_id: int, progress=None, workers: int = None, db_path: str = None) -> dict:
+    # Renders whatever is still missing, then writes the ZIP. progress(done, total)
+    # is called as documents finish. Safe to call again on a failed or
+    # interrupted batch.
+    batch = get_batch(batch_id, db_path)
+    if batch is None:
+        raise KeyError(f"batch {batch_id}")
+    parts = _parts_dir(batch_id)
+    os.makedirs(parts, exist_ok=True)
+    kind, total = batch["kind"], batch["total"]
+    pending = [k for k in batch["keys"] if not os.path.exists(os.path.join(parts, _file_name(kind, k)))]
+    done = total - len(pending)
+    failed = {}
+    _update(batch_id, db_path, status="running", done=done)
+    if progress:
+        progress(done, total)
+
+    def tasks():
+        for key in pending:
+            student = datastore.get_record("students", key, db_path)
+            if student is None:
+                failed[key] = "student record no longer exists"
+                continue
+            yield kind, key, student, batch["issued_on"], os.path.join(parts, _file_name(kind, key))
+
+    try:
+        if pending:
+            settings = {"logo": pdfs.LOGO_PATH, "fonts": pdf_templates.FONT_DIR}
+            # spawn rather than fork: the Streamlit server process runs many threads.
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(workers or WORKERS, initializer=_init_worker, initargs=(settings,)) as pool:
+                for i, (key, error) in enumerate(pool.imap_unordered(_render_one, tasks(), CHUNK_SIZE), 1):
+                    if error:
+                        failed[key] = error
+                    else:
+                        done += 1
+                    if progress:
+                        progress(done, total)
+                    if i % 100 == 0:
+                        _update(batch_id, db_path, done=done)
+        zip_path = _write_zip(batch, parts)
+    except BaseException:
+        _update(batch_id, db_path, status="failed", done=done, failed=json.dumps(failed))
+        raise
+    status = "done" if not failed else "partial"
+    _update(batch_id, db_path, status=status, done=done, failed=json.dumps(failed), zip_path=zip_path,
+            finished_at=str(datetime.datetime.now()))
+    return get_batch(batch_id, db_path)
+
+def _write_zip(batch: dict, parts: str) -> str:
+    # Copies the rendered files into the archive one at a time. PDFs are
+    # already compressed, so they are stored rather than deflated.
+    zip_path = os.path.join(BATCH_DIR, f"{batch['kind']}s_batch_{batch['id']}.zip")
+    tmp_path = zip_path + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for key in batch["keys"]:
+            name = _file_name(batch["kind"], key)
+            path = os.path.join(parts, name)
+            if os.path.exists(path):
+                zf.write(path, name)
+    os.replace(tmp_path, zip_path)
+    return zip_path
+
+
+datastore.register_schema(SCHEMA)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk certificate / admission-form PDFs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    start = sub.add_parser("start")
+    start.add_argument("kind", choices=KINDS)
+    start.add_argument("--course")
+    start.add_argument("--cohort", help="year-month applied, e.g. 2025-03")
+    start.add_argument("--status")
+    start.add_argument("--all", action="store_true", help="certificates also for students without course_completed")
+    resume = sub.add_parser("resume")
+    resume.add_argument("batch_id", type=int)
+    sub.add_parser("list")
+    for p in (start, resume):
+        p.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    def report(done, total):
+        print(f"\r{done}/{total}", end="", flush=True)
+
+    if args.command == "list":
+        for b in list_batches(50):
+            print(f"#{b['id']} {b['kind']} {b['status']} {b['done']}/{b['total']} {b['zip_path'] or ''}")
+        sys.exit(0)
+    if args.command == "start":
+        filters = {"course": args.course, "cohort": args.cohort, "status": args.status,
+                   "completed_only": args.kind == "certificate" and not args.all}
+        keys = select_students(**filters)
+        if not keys:
+            print("No students match")
+            sys.exit(1)
+        batch_id = create_batch(args.kind, keys, filters)
+    else:
+        batch_id = args.batch_id
+    result = run_batch(batch_id, progress=report, workers=args.workers)
+    print(f"\nbatch #{batch_id}: {result['status']}, {result['done']}/{result['total']} -> {result['zip_path']}")
+    for key, error in result["failed"].items():
+        print(f"  {key}: {error}")
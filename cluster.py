@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import zlib
+
+import datastore
+import notify
+import sessions
+
+# ----------------- Several app processes behind one port -----------------
+# A Streamlit server runs every session's script on one Python process, so
+# one process is busy with one rerun at a time (the GIL). This starts N app
+# processes on consecutive ports against one shared FICSE_DATA_DIR, one
+# process for background jobs (and notices, if a transport is configured),
+# the download API (api.py, when uvicorn is installed; set FICSE_API_URL to
+# the address browsers reach it at), and a TCP proxy that spreads browsers
+# over the app processes:
+#
+#   python cluster.py --workers 4 --port 8501 --data-dir /srv/ficse
+#
+# The proxy keeps each client address on the same app process, because a
+# Streamlit session and its file uploads live in that process's memory; it
+# moves to the next process only when one stops answering, and the signed
+# login token in the URL keeps the student or admin logged in there. Any
+# HTTP load balancer with sticky sessions and websocket support (nginx
+# ip_hash, HAProxy "balance source") can take the proxy's place.
+#
+# Several nodes can share the data directory only over a filesystem with
+# working POSIX locks; SQLite's WAL mode needs all writers on one host.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, "app.py")
+READY_TIMEOUT = 60  # seconds for an app process to answer its health check
+
+
+class Proxy:
+    def __init__(self, backends: list, host: str = "127.0.0.1", port: int = 0, sticky: bool = True):
+        self.backends = backends  # [(host, port)]
+        self.host, self.port, self.sticky = host, port, sticky
+        self.connections = [0] * len(backends)  # accepted per backend, for reports
+        self._next = 0
+        self._loop = None
+        self._ready = threading.Event()
+
+    def _order(self, client: str) -> list:
+        # Backends to try for a new connection, preferred one first.
+        n = len(self.backends)
+        if self.sticky:
+            first = zlib.crc32(client.encode()) % n
+        else:
+            first, self._next = self._next, (self._next + 1) % n
+        return [(first + i) % n for i in range(n)]
+
+    async def _pipe(self, reader, writer):
+        try:
+            while data := await reader.read(65536):
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, reader, writer):
+        client = writer.get_extra_info("peername")[0]
+        for i in self._order(client):
+            try:
+                up_reader, up_writer = await asyncio.open_connection(*self.backends[i])
+            except OSError:
+                continue
+            self.connections[i] += 1
+            await asyncio.gather(self._pipe(reader, up_writer), self._pipe(up_reader, writer))
+            return
+        writer.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self):
+        threading.Thread(target=self._run, name="proxy", daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._close)
+
+    def _close(self):
+        for task in asyncio.all_tasks(self._loop):
+            task.cancel()
+        self._loop.call_soon(self._loop.stop)
+
+
+class Cluster:
+    def __init__(self, workers: int, data_dir: str, port: int = 8501, host: str = "127.0.0.1",
+                 worker_port: int = 8511, sticky: bool = True, quiet: bool = False, api_port: int = 8600):
+        self.data_dir = os.path.abspath(data_dir)
+        self.ports = [worker_port + i for i in range(workers)]
+        self.proxy = Proxy([("127.0.0.1", p) for p in self.ports], host, port, sticky)
+        self.host, self.api_port, self.quiet = host, api_port, quiet
+        self.processes = []
+        self.cookie_secret = None
+
+    def _env(self) -> dict:
+        env = dict(os.environ)
+        env[datastore.DATA_DIR_ENV] = self.data_dir
+        env["FICSE_BACKGROUND_WORKERS"] = "0"
+        # Every app process must accept the XSRF cookie another one set.
+        env["STREAMLIT_SERVER_COOKIE_SECRET"] = self.cookie_secret
+        return env
+
+    def _spawn(self, cmd: list):
+        out = subprocess.DEVNULL if self.quiet else None
+        return subprocess.Popen(cmd, cwd=self.data_dir, env=self._env(), stdout=out, stderr=out)
+
+    def start(self):
+        # Read from the shared database by path; the supervisor's own working
+        # directory stays where it was.
+        os.makedirs(self.data_dir, exist_ok=True)
+        secret = sessions.secret(os.path.join(self.data_dir, datastore.DB_FILE))
+        self.cookie_secret = hmac.new(secret, b"streamlit-cookie", hashlib.sha256).hexdigest()
+        for port in self.ports:
+            self.processes.append(self._spawn([
+                sys.executable, "-m", "streamlit", "run", APP,
+                "--server.port", str(port), "--server.address", "127.0.0.1",
+                "--server.headless", "true", "--server.fileWatcherType", "none",
+                "--browser.gatherUsageStats", "false",
+            ]))
+        self.processes.append(self._spawn([sys.executable, os.path.join(HERE, "jobs.py"), "worker"]))
+        if self.api_port and importlib.util.find_spec("uvicorn"):
+            self.processes.append(self._spawn([sys.executable, os.path.join(HERE, "api.py"),
+                                               "--host", self.host, "--port", str(self.api_port)]))
+        if notify.transports_from_env():
+            self.processes.append(self._spawn([sys.executable, os.path.join(HERE, "notify.py"), "worker"]))
+        try:
+            for port in self.ports:
+                wait_ready(port)
+        except RuntimeError:
+            self.stop()
+            raise
+        self.proxy.start()
+        return self
+
+    def restart_exited(self) -> list:
+        # Starts again any process that died; meanwhile the proxy sends its
+        # clients to the next app process.
+        restarted = []
+        for i, process in enumerate(self.processes):
+            if process.poll() is not None:
+                self.processes[i] = self._spawn(process.args)
+                restarted.append(process.pid)
+        return restarted
+
+    def stop(self):
+        self.proxy.stop()
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+
+
+def wait_ready(port: int, timeout: float = READY_TIMEOUT):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        if time.time() > deadline:
+            raise RuntimeError(f"App process on port {port} did not start")
+        time.sleep(0.2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run several app processes behind one port")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--data-dir", default=os.environ.get(datastore.DATA_DIR_ENV, "."))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8501)
+    parser.add_argument("--worker-port", type=int, default=8511, help="first app process port")
+    parser.add_argument("--api-port", type=int, default=8600, help="download API port (0: do not start it)")
+    parser.add_argument("--round-robin", action="store_true",
+                        help="spread connections evenly instead of by client address (breaks uploads)")
+    args = parser.parse_args()
+    cluster = Cluster(args.workers, args.data_dir, args.port, args.host, args.worker_port,
+                      sticky=not args.round_robin, api_port=args.api_port).start()
+    print(f"{args.workers} app processes on ports {cluster.ports[0]}-{cluster.ports[-1]}, "
+          f"serving http://{args.host}:{cluster.proxy.port}", flush=True)
+    try:
+        while True:
+            time.sleep(1)
+            for pid in cluster.restart_exited():
+                print(f"process {pid} exited; started again", flush=True)
+    except KeyboardInterrupt:
+        cluster.stop()
@@ -0,0 +1,44 @@
+import threading
+
+# ----------------- Shared read cache -----------------
+# Lives in an imported module so it survives Streamlit reruns and is shared by
+# every browser session in the process. Cached objects are handed out as-is:
+# callers must copy a record before changing it.
+
+_lock = threading.Lock()
+_entries = {}
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def get(path: str, stamp, loader):
+    # A stamp of None loads without caching (see datastore.cache_stamp).
+    if stamp is None:
+        with _lock:
+            _stats["misses"] += 1
+        return loader()
+    with _lock:
+        entry = _entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            _stats["hits"] += 1
+            return entry[1]
+        _stats["misses"] += 1
+    data = loader()
+    with _lock:
+        _entries[path] = (stamp, data)
+    return data
+
+def invalidate(path: str = None):
+    with _lock:
+        if path is None:
+            _entries.clear()
+        else:
+            _entries.pop(path, None)
+        _stats["invalidations"] += 1
+
+def stats() -> dict:
+    with _lock:
+        result = dict(_stats)
+        result["entries"] = len(_entries)
+    total = result["hits"] + result["misses"]
+    result["hit_rate"] = round(result["hits"] / total, 3) if total else 0.0
+    return result
@@ -0,0 +1,473 @@
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+# ----------------- Configuration -----------------
+DB_FILE = "ficse.db"
+
+# Every path the app uses (ficse.db, blobs/, media_cache/, exports/, logo.png)
+# is relative to the working directory, and records store them that way.
+# Point FICSE_DATA_DIR at one shared directory and every app process and
+# worker started with it works on the same data and files.
+DATA_DIR_ENV = "FICSE_DATA_DIR"
+
+# Legacy JSON data files and the record collection each one now lives in.
+COLLECTIONS = {
+    "users.json": "users",
+    "students.json": "students",
+    "teachers.json": "teachers",
+    "fees.json": "fees",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    collection TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    rev INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (collection, key)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+
+-- Bumped by every write to a collection, from any process; readers use it
+-- to tell whether their cached copy is still current.
+CREATE TABLE IF NOT EXISTS versions (
+    collection TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+
+-- Durable counters behind generated IDs (see allocate_sequence).
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS lookups (
+    collection TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (collection, field, value, key)
+);
+
+CREATE TRIGGER IF NOT EXISTS records_version_ins AFTER INSERT ON records BEGIN
+    INSERT INTO versions (collection, version) VALUES (NEW.collection, 1)
+    ON CONFLICT (collection) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS records_version_upd AFTER UPDATE ON records BEGIN
+    INSERT INTO versions (collection, version) VALUES (NEW.collection, 1)
+    ON CONFLICT (collection) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS records_version_del AFTER DELETE ON records BEGIN
+    INSERT INTO versions (collection, version) VALUES (OLD.collection, 1)
+    ON CONFLICT (collection) DO UPDATE SET version = version + 1;
+END;
+"""
+
+_local = threading.local()
+_hooks = {}
+_schemas = []
+
+
+class ConflictError(Exception):
+    """Raised when a record changed (or appeared) since the caller read it."""
+
+
+# ----------------- Connection -----------------
+
+_data_dir_lock = threading.Lock()
+_data_dirs = {}  # path as given -> absolute path it was resolved to
+
+def use_data_dir(path: str = None) -> str:
+    # Call once per process, at start-up and before the first database access:
+    # the working directory is process-wide. A relative path is resolved
+    # against the directory the process started in, so calling again with the
+    # same path changes nothing. Returns the data directory.
+    path = path or os.environ.get(DATA_DIR_ENV)
+    if not path:
+        return os.getcwd()
+    with _data_dir_lock:
+        if path not in _data_dirs:
+            _data_dirs[path] = os.path.realpath(path)
+        target = _data_dirs[path]
+        if os.getcwd() != target:
+            os.makedirs(target, exist_ok=True)
+            os.chdir(target)
+    return target
+
+def get_connection(db_path: str = None) -> sqlite3.Connection:
+    # One connection per thread: Streamlit serves every session on its own thread.
+    db_path = db_path or DB_FILE
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        for extra in _schemas:
+            conn.executescript(extra)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(records)")]
+        if "rev" not in columns:
+            conn.execute("ALTER TABLE records ADD COLUMN rev INTEGER NOT NULL DEFAULT 1")
+        for collection, fields in SORT_FIELDS.items():
+            partition = PARTITION_FIELDS.get(collection)
+            leading = f"{_sort_expr(partition)}, " if partition else ""
+            for field in fields:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS records_sort_{collection}_{field} "
+                    f"ON records (collection, {leading}{_sort_expr(field)}, key)"
+                )
+        conns[db_path] = conn
+        if not conn.execute("SELECT 1 FROM meta WHERE name = 'lookups_built'").fetchone():
+            rebuild_lookups(db_path)
+    return conn
+
+def collection_for(path: str):
+    return COLLECTIONS.get(os.path.basename(path))
+
+def collection_version(collection: str, db_path: str = None) -> int:
+    row = get_connection(db_path).execute(
+        "SELECT version FROM versions WHERE collection = ?", (collection,)
+    ).fetchone()
+    return row[0] if row else 0
+
+def cache_stamp(collection: str, db_path: str = None):
+    # Stamp for datacache entries built from a collection. None inside an
+    # open transaction: what it reads may still be rolled back, and the
+    # version it sees would then be reused by the next commit.
+    if get_connection(db_path).in_transaction:
+        return None
+    return ("version", collection_version(collection, db_path))
+
+
+# ----------------- Record access -----------------
+
+@contextlib.contextmanager
+def transaction(db_path: str = None):
+    # Nested calls join the outer transaction.
+    conn = get_connection(db_path)
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    _local.after_commit = []
+    try:
+        yield conn
+    except BaseException:
+        _local.after_commit = None
+        conn.execute("ROLLBACK")
+        raise
+    callbacks, _local.after_commit = _local.after_commit, None
+    conn.execute("COMMIT")
+    for callback in callbacks:
+        callback()
+
+def after_commit(callback):
+    # Side effects outside the database (deleting files) wait until the
+    # current transaction commits and are dropped if it rolls back.
+    pending = getattr(_local, "after_commit", None)
+    if pending is None:
+        callback()
+    else:
+        pending.append(callback)
+
+def register_schema(sql: str):
+    # Tables owned by other modules, created on every connection.
+    if sql in _schemas:
+        return
+    _schemas.append(sql)
+    for conn in getattr(_local, "conns", {}).values():
+        conn.executescript(sql)
+
+def register_hook(collection: str, hook):
+    # hook(conn, collection, key, old, new) runs inside the write transaction;
+    # old is None for inserts and new is None for deletes.
+    if hook not in _hooks.setdefault(collection, []):
+        _hooks[collection].append(hook)
+
+def _write_row(conn, collection: str, key: str, data, expected_rev: int = None, raw: str = None):
+    # Single place every write goes through, so hooks and indexes never drift.
+    row = conn.execute(
+        "SELECT data, rev FROM records WHERE collection = ? AND key = ?", (collection, key)
+    ).fetchone()
+    old, rev = (json.loads(row[0]), row[1]) if row else (None, 0)
+    if expected_rev is not None and expected_rev != rev:
+        if expected_rev == 0:
+            raise ConflictError(f"{collection}/{key} already exists")
+        raise ConflictError(f"{collection}/{key} was changed by someone else")
+    if data is None:
+        if row is None:
+            return False
+        conn.execute("DELETE FROM records WHERE collection = ? AND key = ?", (collection, key))
+    elif row is None:
+        conn.execute(
+            "INSERT INTO records (collection, key, data) VALUES (?, ?, ?)",
+            (collection, key, raw or json.dumps(data, ensure_ascii=False)),
+        )
+    else:
+        conn.execute(
+            "UPDATE records SET data = ?, rev = rev + 1 WHERE collection = ? AND key = ?",
+            (raw or json.dumps(data, ensure_ascii=False), collection, key),
+        )
+    _update_lookups(conn, collection, key, old, data)
+    for hook in _hooks.get(collection, []):
+        hook(conn, collection, key, old, data)
+    return True
+
+def get_record(collection: str, key: str, db_path: str = None):
+    row = get_connection(db_path).execute(
+        "SELECT data FROM records WHERE collection = ? AND key = ?", (collection, key)
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+def get_record_rev(collection: str, key: str, db_path: str = None):
+    row = get_connection(db_path).execute(
+        "SELECT data, rev FROM records WHERE collection = ? AND key = ?", (collection, key)
+    ).fetchone()
+    return (json.loads(row[0]), row[1]) if row else (None, 0)
+
+def put_record(collection: str, key: str, data, expected_rev: int = None, db_path: str = None):
+    # expected_rev=None writes unconditionally, 0 means "must not exist yet",
+    # anything else must match the rev returned by get_record_rev.
+    with transaction(db_path) as conn:
+        _write_row(conn, collection, key, data, expected_rev)
+
+def put_records(collection: str, records: dict, db_path: str = None):
+    # Many records in one transaction: one commit (and one fsync) per batch
+    # instead of per record. Hooks and lookups run for each row as usual.
+    with transaction(db_path) as conn:
+        for key, data in records.items():
+            _write_row(conn, collection, key, data)
+
+def update_record(collection: str, key: str, change, retries: int = 10, db_path: str = None):
+    # Optimistic read-modify-write: re-read and re-apply `change` if another
+    # session or worker wrote the record in between.
+    for _ in range(retries):
+        current, rev = get_record_rev(collection, key, db_path)
+        if current is None:
+            raise KeyError(f"{collection}/{key}")
+        updated = change(current)
+        try:
+            put_record(collection, key, updated, expected_rev=rev, db_path=db_path)
+            return updated
+        except ConflictError:
+            continue
+    raise ConflictError(f"{collection}/{key} kept changing, gave up after {retries} tries")
+
+def delete_record(collection: str, key: str, db_path: str = None) -> bool:
+    with transaction(db_path) as conn:
+        return _write_row(conn, collection, key, None)
+
+def load_collection(collection: str, db_path: str = None) -> dict:
+    rows = get_connection(db_path).execute(
+        "SELECT key, data FROM records WHERE collection = ? ORDER BY rowid", (collection,)
+    )
+    return {key: json.loads(data) for key, data in rows}
+
+
+# ----------------- Paging -----------------
+
+# Fields each collection can be listed by; every one gets an expression index
+# so a page costs O(page size) however large the collection is.
+SORT_FIELDS = {
+    "students": ("applied_at", "status", "full_name"),
+    "media": ("uploaded_at",),
+}
+
+# Collections that are always listed one slice at a time (e.g. media by kind);
+# the field leads their sort indexes.
+PARTITION_FIELDS = {
+    "media": "kind",
+}
+
+def _sort_expr(field: str) -> str:
+    return f"COALESCE(json_extract(data, '$.{field}'), '')"
+
+def count_records(collection: str, partition: str = None, db_path: str = None) -> int:
+    if partition is None:
+        return get_connection(db_path).execute(
+            "SELECT COUNT(*) FROM records WHERE collection = ?", (collection,)
+        ).fetchone()[0]
+    return get_connection(db_path).execute(
+        f"SELECT COUNT(*) FROM records WHERE collection = ? AND {_sort_expr(PARTITION_FIELDS[collection])} = ?",
+        (collection, partition),
+    ).fetchone()[0]
+
+def page_records(collection: str, sort_field: str, limit: int, after=None,
+                 descending: bool = False, partition: str = None, db_path: str = None):
+    # Keyset paging: `after` is the cursor returned for the previous page (or
+    # None for the first). Returns (records, cursor_for_next_page_or_None).
+    if sort_field not in SORT_FIELDS.get(collection, ()):
+        raise ValueError(f"{collection} cannot be sorted by {sort_field}")
+    expr = _sort_expr(sort_field)
+    order = "DESC" if descending else "ASC"
+    params = [collection]
+    where = "collection = ?"
+    if partition is not None:
+        where += f" AND {_sort_expr(PARTITION_FIELDS[collection])} = ?"
+        params.append(partition)
+    if after is not None:
+        # The plain bound on the sort value lets SQLite seek the index; the
+        # row-value comparison then skips ties already shown.
+        op = "<" if descending else ">"
+        where += f" AND {expr} {op}= ? AND ({expr}, key) {op} (?, ?)"
+        params += [after[0], after[0], after[1]]
+    rows = get_connection(db_path).execute(
+        f"SELECT key, data, {expr} FROM records WHERE {where} "
+        f"ORDER BY {expr} {order}, key {order} LIMIT ?",
+        (*params, limit + 1),
+    ).fetchall()
+    cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        cursor = (rows[-1][2], rows[-1][0])
+    return [json.loads(raw) for _, raw, _ in rows], cursor
+
+
+# ----------------- Sequences -----------------
+
+def allocate_sequence(name: str, count: int = 1, initial=None, db_path: str = None) -> range:
+    # Reserves `count` consecutive values of the named counter and returns
+    # them. Runs under the write lock, so concurrent sessions and processes
+    # never get the same value; inside a caller's transaction the block is
+    # released again if that transaction rolls back. initial(conn) gives the
+    # last value already in use when the counter does not exist yet.
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    with transaction(db_path) as conn:
+        row = conn.execute("SELECT value FROM sequences WHERE name = ?", (name,)).fetchone()
+        last = row[0] if row else (initial(conn) if initial else 0)
+        conn.execute(
+            "INSERT INTO sequences (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+            (name, last + count),
+        )
+    return range(last + 1, last + count + 1)
+
+def max_key_number(conn, collection: str, prefix: str) -> int:
+    # Largest N among keys "<prefix>N" of a collection, 0 when there are none.
+    rows = conn.execute(
+        "SELECT key FROM records WHERE collection = ? AND key >= ? AND key < ?",
+        (collection, prefix, prefix + "\U0010ffff"),
+    )
+    return max([int(k[len(prefix):]) for (k,) in rows if k[len(prefix):].isdigit()], default=0)
+
+
+# ----------------- Secondary indexes -----------------
+
+def normalize_cnic(value) -> str:
+    return "".join(ch for ch in str(value or "") if ch.isdigit())
+
+def normalize_text(value) -> str:
+    return str(value or "")
+
+def normalize_name(value) -> str:
+    return " ".join(str(value or "").casefold().split())
+
+# collection -> {field: normalizer}. Every write keeps the lookups table in
+# step, so these fields can be searched without scanning the collection.
+LOOKUP_FIELDS = {
+    "users": {"cnic": normalize_cnic},
+    "students": {"cnic": normalize_cnic, "full_name": normalize_name},
+    "media": {"hash": normalize_text},
+}
+
+def _update_lookups(conn, collection: str, key: str, old, new):
+    fields = LOOKUP_FIELDS.get(collection)
+    if not fields:
+        return
+    for field, normalize in fields.items():
+        old_value = normalize(old.get(field)) if old else ""
+        new_value = normalize(new.get(field)) if new else ""
+        if old_value == new_value:
+            continue
+        if old_value:
+            conn.execute(
+                "DELETE FROM lookups WHERE collection = ? AND field = ? AND value = ? AND key = ?",
+                (collection, field, old_value, key),
+            )
+        if new_value:
+            conn.execute(
+                "INSERT OR IGNORE INTO lookups (collection, field, value, key) VALUES (?, ?, ?, ?)",
+                (collection, field, new_value, key),
+            )
+
+def find_keys(collection: str, field: str, value, prefix: bool = False, db_path: str = None) -> list:
+    value = LOOKUP_FIELDS[collection][field](value)
+    if not value:
+        return []
+    conn = get_connection(db_path)
+    if prefix:
+        rows = conn.execute(
+            "SELECT key FROM lookups WHERE collection = ? AND field = ? AND value >= ? AND value < ? "
+            "ORDER BY value, key",
+            (collection, field, value, value + "\U0010ffff"),
+        )
+    else:
+        rows = conn.execute(
+            "SELECT key FROM lookups WHERE collection = ? AND field = ? AND value = ? ORDER BY key",
+            (collection, field, value),
+        )
+    return [row[0] for row in rows]
+
+def rebuild_lookups(db_path: str = None):
+    with transaction(db_path) as conn:
+        conn.execute("DELETE FROM lookups")
+        for collection in LOOKUP_FIELDS:
+            rows = conn.execute(
+                "SELECT key, data FROM records WHERE collection = ?", (collection,)
+            ).fetchall()
+            for key, raw in rows:
+                _update_lookups(conn, collection, key, None, json.loads(raw))
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('lookups_built', '1')")
+
+
+# ----------------- Migration -----------------
+
+def migrate_json_files(directory: str = ".", db_path: str = None, force: bool = False) -> dict:
+    # One-shot import of users.json, students.json, teachers.json and fees.json.
+    # The source files are left in place so the migration can be verified.
+    conn = get_connection(db_path)
+    if not force and conn.execute("SELECT 1 FROM meta WHERE name = 'json_migrated'").fetchone():
+        return {}
+    counts = {}
+    with transaction(db_path):
+        for filename, collection in COLLECTIONS.items():
+            path = os.path.join(directory, filename)
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for key, value in data.items():
+                _write_row(conn, collection, key, value)
+            counts[collection] = len(data)
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('json_migrated', '1')")
+    return counts
+
+
+if __name__ == "__main__":
+    # Migrate through the imported module, whose hooks (search index,
+    # counters, blob references) these imports register, as the app does.
+    import analytics, blobs, datastore, media, notify, search  # noqa: F401,E401
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print("Usage: python datastore.py migrate [data_dir] [--force]")
+        sys.exit(1)
+    args = [a for a in sys.argv[2:] if a != "--force"]
+    with notify.muted():
+        result = datastore.migrate_json_files(args[0] if args else ".", force="--force" in sys.argv)
+    if not result:
+        print("Nothing migrated (already done or no JSON files found).")
+    for name, count in result.items():
+        print(f"{name}: {count} records")
@@ -0,0 +1,205 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+
+import datastore
+import results
+
+try:
+    import openpyxl
+except ImportError:  # XLSX export needs openpyxl
+    openpyxl = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export needs pyarrow
+    pyarrow = None
+
+# ----------------- Configuration -----------------
+EXPORT_DIR = "exports"
+PAGE_SIZE = 1000
+PARQUET_ROW_GROUP = 10000
+FORMATS = ("csv", "xlsx", "parquet")
+
+# dataset -> (collection, date field used by the date range, columns).
+# Password hashes are never exported.
+DATASETS = {
+    "students": ("students", "applied_at", (
+        "admission_no", "full_name", "father_name", "date_of_birth", "gender", "religion", "caste",
+        "nationality", "qualification", "contact_no", "whatsapp_no", "email", "cnic", "present_address",
+        "courses", "status", "applied_at", "scholarship_marks", "course_completed",
+    )),
+    "users": ("users", "created_at", ("username", "cnic", "mobile", "created_at")),
+    "marks": ("students", "applied_at", ("admission_no", "full_name", "father_name", "courses",
+                                         "scholarship_marks", "result")),
+}
+
+
+# ----------------- Rows -----------------
+
+def _row(dataset: str, key: str, record: dict) -> dict:
+    row = dict(record)
+    if dataset == "users":
+        row["username"] = key
+    if dataset == "students":
+        row.setdefault("admission_no", key)
+    if dataset == "marks":
+        # Old records may hold marks as text; those that do not parse are left out.
+        marks = results.parse_marks(record.get("scholarship_marks"))
+        if marks is None:
+            return None
+        row.setdefault("admission_no", key)
+        shown, status = results.grade(marks)
+        row["scholarship_marks"], row["result"] = shown, results.STATUS_LABELS[status]
+    if isinstance(row.get("courses"), list):
+        row["courses"] = "; ".join(row["courses"])
+    return row
+
+def iter_rows(dataset: str, columns=None, course: str = None, status: str = None,
+              date_from: str = None, date_to: str = None, db_path: str = None):
+    # Yields one {column: value} dict at a time, reading the store a page at
+    # a time in key order; dates are "YYYY-MM-DD" and both ends are inclusive.
+    collection, date_field, all_columns = DATASETS[dataset]
+    columns = list(columns or all_columns)
+    unknown = [c for c in columns if c not in all_columns]
+    if unknown:
+        raise ValueError(f"Unknown {dataset} columns: {', '.join(unknown)}")
+    where = ["collection = :collection", "key > :after"]
+    if course:
+        where.append("EXISTS (SELECT 1 FROM json_each(data, '$.courses') WHERE value = :course)")
+    if status:
+        where.append("json_extract(data, '$.status') = :status")
+    if date_from:
+        where.append(f"substr(json_extract(data, '$.{date_field}'), 1, 10) >= :date_from")
+    if date_to:
+        where.append(f"substr(json_extract(data, '$.{date_field}'), 1, 10) <= :date_to")
+    if dataset == "marks":
+        where.append("json_type(data, '$.scholarship_marks') IN ('integer', 'real', 'text')")
+    sql = f"SELECT key, data FROM records WHERE {' AND '.join(where)} ORDER BY key LIMIT :limit"
+    params = {"collection": collection, "course": course, "status": status, "date_from": date_from,
+              "date_to": date_to, "after": "", "limit": PAGE_SIZE}
+    conn = datastore.get_connection(db_path)
+    while True:
+        rows = conn.execute(sql, params).fetchall()
+        for key, raw in rows:
+            row = _row(dataset, key, json.loads(raw))
+            if row is not None:
+                yield {c: row.get(c) for c in columns}
+        if len(rows) < PAGE_SIZE:
+            return
+        params["after"] = rows[-1][0]
+
+
+# ----------------- Writers -----------------
+# Each writer takes rows one at a time and writes them to a binary file.
+
+def write_csv(rows, columns, out) -> int:
+    text = io.TextIOWrapper(out, encoding="utf-8-sig", newline="")
+    writer = csv.DictWriter(text, fieldnames=columns)
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    text.flush()
+    text.detach()  # leave `out` open for the caller
+    return count
+
+def write_xlsx(rows, columns, out) -> int:
+    if openpyxl is None:
+        raise RuntimeError("XLSX export needs openpyxl (pip install openpyxl)")
+    # write_only workbooks stream rows to a temporary file instead of
+    # keeping every cell object in memory.
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+    count = 0
+    for row in rows:
+        sheet.append([row[c] for c in columns])
+        count += 1
+    workbook.save(out)
+    return count
+
+def write_parquet(rows, columns, out) -> int:
+    if pyarrow is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    # Every column is written as text: records are schemaless JSON, so a
+    # column can hold numbers in one row and strings in the next.
+    schema = pyarrow.schema([(c, pyarrow.string()) for c in columns])
+    count = 0
+    with pyarrow.parquet.ParquetWriter(out, schema) as writer:
+        group = {c: [] for c in columns}
+        for row in rows:
+            for c in columns:
+                value = row[c]
+                group[c].append(None if value is None else str(value))
+            count += 1
+            if count % PARQUET_ROW_GROUP == 0:
+                writer.write_table(pyarrow.table(group, schema=schema))
+                group = {c: [] for c in columns}
+        if not count or count % PARQUET_ROW_GROUP:
+            writer.write_table(pyarrow.table(group, schema=schema))
+    return count
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx, "parquet": write_parquet}
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def available_formats() -> list:
+    # FORMATS whose optional library is installed.
+    missing = {"xlsx": openpyxl is None, "parquet": pyarrow is None}
+    return [fmt for fmt in FORMATS if not missing.get(fmt)]
+
+def export(dataset: str, fmt: str, path: str, columns=None, db_path: str = None, **filters) -> int:
+    # Writes the export to `path` (via a temporary file, so a nightly job
+    # never leaves half a report behind) and returns the number of rows.
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    columns = list(columns or DATASETS[dataset][2])
+    rows = iter_rows(dataset, columns, db_path=db_path, **filters)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as out:
+            count = WRITERS[fmt](rows, columns, out)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export students, users or scholarship marks")
+    parser.add_argument("dataset", choices=DATASETS)
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--out", help="output file (default: exports/<dataset>.<format>)")
+    parser.add_argument("--columns", help="comma-separated column names")
+    parser.add_argument("--course")
+    parser.add_argument("--status")
+    parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+    args = parser.parse_args()
+    out = args.out or os.path.join(EXPORT_DIR, f"{args.dataset}.{args.format}")
+    try:
+        count = export(
+            args.dataset, args.format, out,
+            columns=args.columns.split(",") if args.columns else None,
+            course=args.course, status=args.status, date_from=args.date_from, date_to=args.date_to,
+        )
+    except (ValueError, RuntimeError) as e:
+        print(e)
+        sys.exit(1)
+    print(f"{count} rows -> {out}")
@@ -0,0 +1,276 @@
+import argparse
+import datetime
+import sys
+
+import datastore
+
+# ----------------- Fee ledger -----------------
+# Every charge, payment and waiver is one row appended to fee_ledger; rows
+# are never updated or deleted (triggers refuse it), so a mistake is fixed
+# by posting a correcting entry. The same transaction that appends a row
+# updates three running aggregates:
+#
+#   fee_balances  per student and course: charged, paid, waived, balance
+#   fee_courses   per course: the same totals over all students
+#   fee_daily     per day: charges, collections and waivers posted
+#
+# so balances, defaulter lists and daily totals are read straight from the
+# aggregates instead of summing the ledger. verify() replays the ledger and
+# compares; rebuild() recomputes the aggregates from it.
+
+KINDS = ("charge", "payment", "waiver")
+
+# (admission form label, name on the Courses page, duration, fee in PKR)
+COURSES = (
+    ("Diploma in Information Technology (12 Months)", "Diploma in Information Technology", "12 Months", 15000),
+    ("Certificate in Information Technology (06 Months)", "Certificate in Information Technology", "06 Months", 10000),
+    ("Short Course of Computer Science (04 Months)", "Short Course of Computer Science", "04 Months", 8000),
+    ("MS Office / Word / Excel / PowerPoint (02 Months)", "MS Office / Word / Excel / PowerPoint", "02 Months", 5000),
+    ("Typing (English, Urdu, Sindhi) (02 Months)", "Typing English/Urdu/Sindhi", "02 Months", 4000),
+    ("Special Course - All Subjects Expert (02 Months)", "Special Course All Subjects Expert", "02 Months", 6000),
+)
+STANDARD_FEES = {label: fee for label, _, _, fee in COURSES}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fee_ledger (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    admission_no TEXT NOT NULL,
+    course TEXT NOT NULL,
+    kind TEXT NOT NULL CHECK (kind IN ('charge', 'payment', 'waiver')),
+    amount INTEGER NOT NULL CHECK (amount > 0),
+    day TEXT NOT NULL,
+    posted_at TEXT NOT NULL,
+    note TEXT
+);
+CREATE INDEX IF NOT EXISTS fee_ledger_student ON fee_ledger (admission_no, id);
+
+CREATE TRIGGER IF NOT EXISTS fee_ledger_no_update BEFORE UPDATE ON fee_ledger BEGIN
+    SELECT RAISE(ABORT, 'fee_ledger is append-only');
+END;
+CREATE TRIGGER IF NOT EXISTS fee_ledger_no_delete BEFORE DELETE ON fee_ledger BEGIN
+    SELECT RAISE(ABORT, 'fee_ledger is append-only');
+END;
+
+CREATE TABLE IF NOT EXISTS fee_balances (
+    admission_no TEXT NOT NULL,
+    course TEXT NOT NULL,
+    charged INTEGER NOT NULL DEFAULT 0,
+    paid INTEGER NOT NULL DEFAULT 0,
+    waived INTEGER NOT NULL DEFAULT 0,
+    balance INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (admission_no, course)
+);
+CREATE INDEX IF NOT EXISTS fee_balances_due ON fee_balances (balance) WHERE balance > 0;
+CREATE INDEX IF NOT EXISTS fee_balances_course_due ON fee_balances (course, balance) WHERE balance > 0;
+
+CREATE TABLE IF NOT EXISTS fee_courses (
+    course TEXT PRIMARY KEY,
+    charged INTEGER NOT NULL DEFAULT 0,
+    paid INTEGER NOT NULL DEFAULT 0,
+    waived INTEGER NOT NULL DEFAULT 0,
+    balance INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS fee_daily (
+    day TEXT PRIMARY KEY,
+    charged INTEGER NOT NULL DEFAULT 0,
+    paid INTEGER NOT NULL DEFAULT 0,
+    waived INTEGER NOT NULL DEFAULT 0,
+    postings INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# ledger kind -> aggregate column it adds to
+COLUMNS = {"charge": "charged", "payment": "paid", "waiver": "waived"}
+AGGREGATES = ("fee_balances", "fee_courses", "fee_daily")
+
+
+# ----------------- Posting -----------------
+
+def _apply(conn, admission_no: str, course: str, kind: str, amount: int, day: str):
+    column = COLUMNS[kind]
+    delta = amount if kind == "charge" else -amount
+    conn.execute(
+        f"INSERT INTO fee_balances (admission_no, course, {column}, balance) VALUES (?, ?, ?, ?) "
+        f"ON CONFLICT (admission_no, course) DO UPDATE SET {column} = {column} + excluded.{column}, "
+        f"balance = balance + excluded.balance",
+        (admission_no, course, amount, delta),
+    )
+    conn.execute(
+        f"INSERT INTO fee_courses (course, {column}, balance) VALUES (?, ?, ?) "
+        f"ON CONFLICT (course) DO UPDATE SET {column} = {column} + excluded.{column}, "
+        f"balance = balance + excluded.balance",
+        (course, amount, delta),
+    )
+    conn.execute(
+        f"INSERT INTO fee_daily (day, {column}, postings) VALUES (?, ?, 1) "
+        f"ON CONFLICT (day) DO UPDATE SET {column} = {column} + excluded.{column}, postings = postings + 1",
+        (day, amount),
+    )
+
+def post(admission_no: str, course: str, kind: str, amount: int, note: str = "",
+         day: datetime.date = None, db_path: str = None) -> int:
+    # Appends one entry and updates the aggregates in the same transaction.
+    # Returns the entry id; raises ValueError for an invalid posting.
+    if kind not in KINDS:
+        raise ValueError(f"Unknown fee entry kind: {kind}")
+    if not isinstance(amount, int) or isinstance(amount, bool) or amount <= 0:
+        raise ValueError("Amount must be a whole number of rupees above zero")
+    if not course:
+        raise ValueError("Course is required")
+    day = (day or datetime.date.today()).isoformat()
+    with datastore.transaction(db_path) as conn:
+        if datastore.get_record("students", admission_no, db_path) is None:
+            raise ValueError(f"Admission Number {admission_no} not found")
+        cursor = conn.execute(
+            "INSERT INTO fee_ledger (admission_no, course, kind, amount, day, posted_at, note) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (admission_no, course, kind, amount, day, str(datetime.datetime.now()), note or None),
+        )
+        _apply(conn, admission_no, course, kind, amount, day)
+        return cursor.lastrowid
+
+def charge_standard_fees(admission_no: str, db_path: str = None) -> list:
+    # Charges the listed fee for each of the student's courses that has not
+    # been charged yet. Returns the courses charged.
+    charged = []
+    with datastore.transaction(db_path) as conn:
+        student = datastore.get_record("students", admission_no, db_path)
+        if student is None:
+            raise ValueError(f"Admission Number {admission_no} not found")
+        for course in student.get("courses") or []:
+            if course not in STANDARD_FEES:
+                continue
+            row = conn.execute(
+                "SELECT charged FROM fee_balances WHERE admission_no = ? AND course = ?", (admission_no, course)
+            ).fetchone()
+            if row and row[0]:
+                continue
+            post(admission_no, course, "charge", STANDARD_FEES[course], "Course fee", db_path=db_path)
+            charged.append(course)
+    return charged
+
+
+# ----------------- Reading -----------------
+
+def student_balances(admission_no: str, db_path: str = None) -> list:
+    rows = datastore.get_connection(db_path).execute(
+        "SELECT course, charged, paid, waived, balance FROM fee_balances WHERE admission_no = ? ORDER BY course",
+        (admission_no,),
+    ).fetchall()
+    return [dict(zip(("course", "charged", "paid", "waived", "balance"), row)) for row in rows]
+
+def student_ledger(admission_no: str, limit: int = 100, db_path: str = None) -> list:
+    rows = datastore.get_connection(db_path).execute(
+        "SELECT id, day, course, kind, amount, note FROM fee_ledger WHERE admission_no = ? "
+        "ORDER BY id DESC LIMIT ?",
+        (admission_no, limit),
+    ).fetchall()
+    return [dict(zip(("id", "day", "course", "kind", "amount", "note"), row)) for row in rows]
+
+def defaulters(course: str = None, min_balance: int = 1, limit: int = 100, db_path: str = None) -> list:
+    # Largest outstanding balances first, read from the partial balance index.
+    where, params = "balance >= ? AND balance > 0", [min_balance]
+    if course:
+        where += " AND course = ?"
+        params.append(course)
+    rows = datastore.get_connection(db_path).execute(
+        f"SELECT admission_no, course, charged, paid, waived, balance FROM fee_balances "
+        f"WHERE {where} ORDER BY balance DESC LIMIT ?",
+        params + [limit],
+    ).fetchall()
+    return [dict(zip(("admission_no", "course", "charged", "paid", "waived", "balance"), row)) for row in rows]
+
+def daily_totals(date_from: str, date_to: str, db_path: str = None) -> list:
+    rows = datastore.get_connection(db_path).execute(
+        "SELECT day, charged, paid, waived, postings FROM fee_daily WHERE day BETWEEN ? AND ? ORDER BY day",
+        (date_from, date_to),
+    ).fetchall()
+    return [dict(zip(("day", "charged", "paid", "waived", "postings"), row)) for row in rows]
+
+def course_totals(db_path: str = None) -> list:
+    rows = datastore.get_connection(db_path).execute(
+        "SELECT course, charged, paid, waived, balance FROM fee_courses ORDER BY course"
+    ).fetchall()
+    return [dict(zip(("course", "charged", "paid", "waived", "balance"), row)) for row in rows]
+
+
+# ----------------- Replay -----------------
+
+def _replay(conn) -> dict:
+    # The aggregates as the ledger says they should be, keyed by table.
+    expected = {table: {} for table in AGGREGATES}
+    for admission_no, course, kind, amount, day in conn.execute(
+        "SELECT admission_no, course, kind, amount, day FROM fee_ledger ORDER BY id"
+    ):
+        column = ("charged", "paid", "waived").index(COLUMNS[kind])
+        delta = amount if kind == "charge" else -amount
+        for table, key in (("fee_balances", (admission_no, course)), ("fee_courses", (course,))):
+            row = expected[table].setdefault(key, [0, 0, 0, 0])
+            row[column] += amount
+            row[3] += delta
+        row = expected["fee_daily"].setdefault((day,), [0, 0, 0, 0])
+        row[column] += amount
+        row[3] += 1
+    return expected
+
+def _stored(conn) -> dict:
+    return {
+        "fee_balances": {(r[0], r[1]): list(r[2:]) for r in conn.execute(
+            "SELECT admission_no, course, charged, paid, waived, balance FROM fee_balances")},
+        "fee_courses": {(r[0],): list(r[1:]) for r in conn.execute(
+            "SELECT course, charged, paid, waived, balance FROM fee_courses")},
+        "fee_daily": {(r[0],): list(r[1:]) for r in conn.execute(
+            "SELECT day, charged, paid, waived, postings FROM fee_daily")},
+    }
+
+def verify(db_path: str = None) -> list:
+    # Replays the whole ledger and returns the aggregate rows that disagree
+    # with it, as (table, key, stored, expected); empty means all is well.
+    with datastore.transaction(db_path) as conn:
+        expected, stored = _replay(conn), _stored(conn)
+    mismatches = []
+    for table in AGGREGATES:
+        for key in sorted(set(expected[table]) | set(stored[table])):
+            want, have = expected[table].get(key), stored[table].get(key)
+            if want != have and not (want is None and not any(have)):
+                mismatches.append((table, key, have, want))
+    return mismatches
+
+def rebuild(db_path: str = None) -> int:
+    # Recomputes every aggregate from the ledger; returns the ledger size.
+    with datastore.transaction(db_path) as conn:
+        expected = _replay(conn)
+        for table in AGGREGATES:
+            conn.execute(f"DELETE FROM {table}")
+        conn.executemany(
+            "INSERT INTO fee_balances (admission_no, course, charged, paid, waived, balance) VALUES (?, ?, ?, ?, ?, ?)",
+            [key + tuple(row) for key, row in expected["fee_balances"].items()],
+        )
+        conn.executemany(
+            "INSERT INTO fee_courses (course, charged, paid, waived, balance) VALUES (?, ?, ?, ?, ?)",
+            [key + tuple(row) for key, row in expected["fee_courses"].items()],
+        )
+        conn.executemany(
+            "INSERT INTO fee_daily (day, charged, paid, waived, postings) VALUES (?, ?, ?, ?, ?)",
+            [key + tuple(row) for key, row in expected["fee_daily"].items()],
+        )
+        return conn.execute("SELECT COUNT(*) FROM fee_ledger").fetchone()[0]
+
+
+datastore.register_schema(SCHEMA)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fee ledger maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("verify", help="replay the ledger and compare it with the stored balances")
+    sub.add_parser("rebuild", help="recompute the stored balances from the ledger")
+    args = parser.parse_args()
+    if args.command == "verify":
+        problems = verify()
+        for table, key, have, want in problems:
+            print(f"{table} {key}: stored {have}, ledger says {want}")
+        print(f"{len(problems)} mismatches")
+        sys.exit(1 if problems else 0)
+    print(f"Rebuilt balances from {rebuild()} ledger entries")
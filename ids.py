@@ -0,0 +1,40 @@
+import datetime
+
+import datastore
+
+# ----------------- Generated IDs -----------------
+# Admission numbers (FICSE-YYYYMMDD-NNN, one counter per day) and teacher
+# IDs (TNNN) come from durable sequences in the store instead of random
+# draws, so two sessions or processes can never be handed the same one.
+# Counters start above the highest ID already in use, so numbers issued
+# before the sequences existed are never repeated.
+
+ADMISSION_PREFIX = "FICSE"
+TEACHER_PREFIX = "T"
+FIRST_NUMBER = 100  # keeps the three-digit look of the old random IDs
+
+
+def admission_numbers(count: int = 1, day: datetime.date = None, db_path: str = None) -> list:
+    # A block of `count` numbers for bulk imports; see datastore.allocate_sequence.
+    day = day or datetime.date.today()
+    prefix = f"{ADMISSION_PREFIX}-{day:%Y%m%d}-"
+    values = datastore.allocate_sequence(
+        f"admission:{day:%Y%m%d}", count,
+        initial=lambda conn: max(FIRST_NUMBER - 1, datastore.max_key_number(conn, "students", prefix)),
+        db_path=db_path,
+    )
+    return [f"{prefix}{v}" for v in values]
+
+def next_admission_no(day: datetime.date = None, db_path: str = None) -> str:
+    return admission_numbers(1, day, db_path)[0]
+
+def teacher_ids(count: int = 1, db_path: str = None) -> list:
+    values = datastore.allocate_sequence(
+        "teacher", count,
+        initial=lambda conn: max(FIRST_NUMBER - 1, datastore.max_key_number(conn, "teachers", TEACHER_PREFIX)),
+        db_path=db_path,
+    )
+    return [f"{TEACHER_PREFIX}{v}" for v in values]
+
+def next_teacher_id(db_path: str = None) -> str:
+    return teacher_ids(1, db_path)[0]
@@ -0,0 +1,308 @@
+import argparse
+import contextlib
+import csv
+import datetime
+import io
+import os
+import re
+import sys
+
+import analytics  # noqa: F401  (keeps the admissions counters current)
+import datastore
+import ids
+import notify
+import search
+
+try:
+    import openpyxl
+except ImportError:  # XLSX import needs openpyxl; CSV always works
+    openpyxl = None
+
+# ----------------- Configuration -----------------
+BATCH_SIZE = 500
+KINDS = ("admissions", "marks")
+SHEET_TYPES = ("csv", "xlsx") if openpyxl else ("csv",)
+
+# Same labels as the Admission Form checkboxes.
+ADMISSION_COURSES = (
+    "Diploma in Information Technology (12 Months)",
+    "Certificate in Information Technology (06 Months)",
+    "Short Course of Computer Science (04 Months)",
+    "MS Office / Word / Excel / PowerPoint (02 Months)",
+    "Typing (English, Urdu, Sindhi) (02 Months)",
+    "Special Course - All Subjects Expert (02 Months)",
+)
+
+# Column headings people actually use -> student record fields.
+HEADER_ALIASES = {
+    "name": "full_name",
+    "student_name": "full_name",
+    "father": "father_name",
+    "fathers_name": "father_name",
+    "dob": "date_of_birth",
+    "birth_date": "date_of_birth",
+    "mobile": "contact_no",
+    "phone": "contact_no",
+    "contact": "contact_no",
+    "whatsapp": "whatsapp_no",
+    "address": "present_address",
+    "course": "courses",
+    "admission_number": "admission_no",
+    "adm_no": "admission_no",
+    "registration_no": "admission_no",
+    "marks": "scholarship_marks",
+    "score": "scholarship_marks",
+}
+
+TEXT_FIELDS = (
+    "full_name", "father_name", "religion", "caste", "nationality", "qualification",
+    "email", "present_address", "whatsapp_no",
+)
+REQUIRED_FIELDS = ("full_name", "father_name", "contact_no", "courses", "present_address")
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%Y/%m/%d")
+
+
+class RowError(ValueError):
+    pass
+
+
+# ----------------- Reading -----------------
+
+def _header(name) -> str:
+    key = re.sub(r"[^0-9a-z]+", "_", str(name or "").strip().lower()).strip("_")
+    return HEADER_ALIASES.get(key, key)
+
+def read_rows(fileobj, filename: str):
+    # Yields (line_number, {field: value}) one row at a time; the header is
+    # line 1. Blank rows are skipped.
+    if filename.lower().endswith(".xlsx"):
+        rows = _xlsx_rows(fileobj)
+    else:
+        rows = _csv_rows(fileobj)
+    header = [_header(h) for h in next(rows, [])]
+    for line, values in enumerate(rows, 2):
+        row = {h: v for h, v in zip(header, values) if h and v not in (None, "")}
+        if row:
+            yield line, row
+
+def _csv_rows(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    finally:
+        text.detach()  # leave the caller's file open
+
+def _xlsx_rows(fileobj):
+    if openpyxl is None:
+        raise RuntimeError("XLSX import needs openpyxl (pip install openpyxl); save the sheet as CSV instead")
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+# ----------------- Normalizing -----------------
+
+_COURSE_NAMES = {}
+for _label in ADMISSION_COURSES:
+    _COURSE_NAMES[_label.casefold()] = _label
+    _COURSE_NAMES[re.sub(r"\s*\(\d+ Months\)$", "", _label).casefold()] = _label
+
+def normalize_courses(value) -> list:
+    # "Diploma in Information Technology; Tuition 8th" -> the form's labels.
+    courses = []
+    for part in re.split(r"[;|\n]", str(value or "")):
+        name = " ".join(part.split())
+        if not name:
+            continue
+        if name.casefold().startswith("tuition"):
+            grade = re.sub(r"^tuition(\s+class)?\s*:?\s*", "", name, flags=re.IGNORECASE)
+            courses.append(f"Tuition Class: {grade}")
+        elif name.casefold() in _COURSE_NAMES:
+            courses.append(_COURSE_NAMES[name.casefold()])
+        else:
+            raise RowError(f"unknown course '{name}'")
+    return courses
+
+def normalize_date(value) -> str:
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if not isinstance(value, datetime.date):
+        text = str(value).strip().split(" ")[0]
+        for fmt in DATE_FORMATS:
+            try:
+                value = datetime.datetime.strptime(text, fmt).date()
+                break
+            except ValueError:
+                continue
+        else:
+            raise RowError(f"unreadable date '{text}'")
+    if not datetime.date(1950, 1, 1) <= value <= datetime.date.today():
+        raise RowError(f"date of birth {value} is out of range")
+    return str(value)
+
+def normalize_phone(value) -> str:
+    digits = "".join(ch for ch in str(value or "") if ch.isdigit())
+    if isinstance(value, (int, float)) and len(digits) == 10:
+        digits = "0" + digits  # spreadsheets drop the leading zero of 03xx numbers
+    return digits
+
+def student_from_row(row: dict) -> dict:
+    errors = []
+    invalid = set()
+    student = {f: str(row[f]).strip() for f in TEXT_FIELDS if f in row}
+    if row.get("admission_no"):
+        student["admission_no"] = str(row["admission_no"]).strip()
+    for field, normalize in (("courses", normalize_courses), ("date_of_birth", normalize_date)):
+        if field in row:
+            try:
+                student[field] = normalize(row[field])
+            except RowError as e:
+                errors.append(str(e))
+                invalid.add(field)
+    if "contact_no" in row:
+        student["contact_no"] = normalize_phone(row["contact_no"])
+    if "whatsapp_no" in row:
+        student["whatsapp_no"] = normalize_phone(row["whatsapp_no"])
+    if "cnic" in row:
+        student["cnic"] = datastore.normalize_cnic(row["cnic"])
+        if len(student["cnic"]) != 13:
+            errors.append(f"CNIC '{row['cnic']}' must have 13 digits")
+    if "gender" in row:
+        gender = {"m": "Male", "male": "Male", "f": "Female", "female": "Female"}.get(str(row["gender"]).strip().lower())
+        if gender is None:
+            errors.append(f"unknown gender '{row['gender']}'")
+        student["gender"] = gender
+    missing = [f for f in REQUIRED_FIELDS if not student.get(f) and f not in invalid]
+    if missing:
+        errors.append("missing " + ", ".join(missing))
+    if errors:
+        raise RowError("; ".join(errors))
+    student["status"] = str(row.get("status") or "Pending").strip()
+    student["applied_at"] = str(datetime.datetime.now())
+    return student
+
+def marks_from_row(row: dict):
+    admission_no = str(row.get("admission_no") or "").strip()
+    if not admission_no:
+        raise RowError("missing admission_no")
+    try:
+        marks = float(row.get("scholarship_marks"))
+    except (TypeError, ValueError):
+        raise RowError(f"marks '{row.get('scholarship_marks', '')}' are not a number")
+    if not (0 <= marks <= 100 and marks == int(marks)):
+        raise RowError(f"marks {row['scholarship_marks']} must be a whole number from 0 to 100")
+    return admission_no, int(marks)
+
+
+# ----------------- Importing -----------------
+
+def _flush_admissions(batch, state, db_path, dry_run):
+    records = {}
+    unnumbered = []
+    seen, errors = state["seen"], state["errors"]
+    for line, student in batch:
+        adm = student.get("admission_no")
+        if adm and (adm in seen or datastore.get_record("students", adm, db_path)):
+            errors.append({"row": line, "admission_no": adm, "error": "admission number already exists"})
+            continue
+        cnic = student.get("cnic")
+        if cnic and (("cnic", cnic) in seen or datastore.find_keys("students", "cnic", cnic, db_path=db_path)):
+            errors.append({"row": line, "admission_no": adm or "", "error": f"CNIC {cnic} is already registered"})
+            continue
+        if cnic:
+            seen.add(("cnic", cnic))
+        if not adm:
+            unnumbered.append(student)
+            continue
+        seen.add(adm)
+        records[adm] = student
+    # One block of numbers per batch, taken in the batch's own transaction so
+    # a failed batch gives them back. A dry run does not use any up.
+    if unnumbered and not dry_run:
+        numbers = ids.admission_numbers(len(unnumbered), db_path=db_path)
+    else:
+        numbers = [f"(new {i})" for i in range(1, len(unnumbered) + 1)]
+    for adm, student in zip(numbers, unnumbered):
+        records[adm] = dict(student, admission_no=adm)
+    return records
+
+def _flush_marks(batch, state, db_path, dry_run):
+    records = {}
+    for line, (adm, marks) in batch:
+        current = records.get(adm) or datastore.get_record("students", adm, db_path)
+        if current is None:
+            state["errors"].append({"row": line, "admission_no": adm, "error": "admission number not found"})
+            continue
+        records[adm] = dict(current, scholarship_marks=marks)
+    return records
+
+def _flush(kind, batch, state, dry_run, db_path) -> int:
+    if not batch:
+        return 0
+    # One write transaction per batch; a dry run only reads.
+    context = contextlib.nullcontext(datastore.get_connection(db_path)) if dry_run else datastore.transaction(db_path)
+    with context as conn:
+        flush = _flush_admissions if kind == "admissions" else _flush_marks
+        records = flush(batch, state, db_path, dry_run)
+        if not dry_run:
+            quiet = contextlib.nullcontext() if state["notify"] else notify.muted()
+            with search.deferred_index(conn), quiet:
+                datastore.put_records("students", records, db_path=db_path)
+    batch.clear()
+    return len(records)
+
+def import_file(fileobj, filename: str, kind: str, dry_run: bool = False, batch_size: int = BATCH_SIZE,
+                progress=None, notify_students: bool = True, db_path: str = None) -> dict:
+    # Streams the file; returns {"rows", "imported", "errors": [{"row", "admission_no", "error"}]}.
+    # progress(rows_read) is called after every committed batch. notify_students=False
+    # queues no admission / result notices for the imported rows.
+    if kind not in KINDS:
+        raise ValueError(f"Unknown import kind: {kind}")
+    parse = student_from_row if kind == "admissions" else marks_from_row
+    result = {"rows": 0, "imported": 0, "errors": [], "dry_run": dry_run}
+    state = {"seen": set(), "errors": result["errors"], "notify": notify_students}
+    batch = []
+    for line, row in read_rows(fileobj, filename):
+        result["rows"] += 1
+        try:
+            batch.append((line, parse(row)))
+        except RowError as e:
+            result["errors"].append({"row": line, "admission_no": str(row.get("admission_no", "")), "error": str(e)})
+        if len(batch) >= batch_size:
+            result["imported"] += _flush(kind, batch, state, dry_run, db_path)
+            if progress:
+                progress(result["rows"])
+    result["imported"] += _flush(kind, batch, state, dry_run, db_path)
+    if progress:
+        progress(result["rows"])
+    result["errors"].sort(key=lambda e: e["row"])
+    return result
+
+def error_report_csv(errors: list) -> bytes:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=["row", "admission_no", "error"])
+    writer.writeheader()
+    writer.writerows(errors)
+    return out.getvalue().encode("utf-8-sig")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import of admissions or scholarship marks")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("file", help="CSV or XLSX with a header row")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    parser.add_argument("--no-notify", action="store_true", help="queue no notices to the students imported")
+    args = parser.parse_args()
+    with open(args.file, "rb") as f:
+        result = import_file(f, args.file, args.kind, dry_run=args.dry_run, notify_students=not args.no_notify,
+                             progress=lambda n: print(f"\r{n} rows", end="", flush=True))
+    verb = "would be imported" if args.dry_run else "imported"
+    print(f"\n{result['rows']} rows read, {result['imported']} {verb}, {len(result['errors'])} errors")
+    if result["errors"]:
+        report = os.path.splitext(args.file)[0] + ".errors.csv"
+        with open(report, "wb") as f:
+            f.write(error_report_csv(result["errors"]))
+        print(f"error report: {report}")
+        sys.exit(1)
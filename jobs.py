@@ -0,0 +1,395 @@
+import argparse
+import concurrent.futures
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+import datastore
+
+# ----------------- Background jobs -----------------
+# Heavy admin work (bulk PDFs, photo processing, exports, imports) is
+# submitted here instead of running inside the admin's rerun. A job is a row
+# in the jobs table; a Runner in each server process claims queued jobs and
+# runs them on a thread pool (I/O-bound kinds) or a process pool (CPU-bound
+# kinds). Handlers report progress through a JobContext, which is also where
+# a cancel request is noticed and where a handler can checkpoint its state.
+#
+# While a job runs, its runner heartbeats it. A running job whose heartbeat
+# stops (the server crashed or was restarted) is queued again and picks up
+# from its last checkpoint, or marked failed if its kind cannot resume safely.
+
+THREADS = 2
+PROCESSES = max(1, (os.cpu_count() or 2) - 1)
+POLL_INTERVAL = 1.0
+HEARTBEAT_INTERVAL = 5.0
+STALE_AFTER = 60.0       # seconds without a heartbeat before a running job counts as abandoned
+PROGRESS_INTERVAL = 0.5  # seconds between progress writes
+MAX_ATTEMPTS = 3
+ACTIVE = ("queued", "running")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    resumable INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    message TEXT,
+    state TEXT,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    heartbeat_at REAL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_active ON jobs (status, id) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_by_kind ON jobs (kind, id);
+"""
+
+# kind -> (handler, pool, resumable); see register().
+KINDS = {}
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when the job has been cancelled."""
+
+
+def register(kind: str, handler, pool: str = "thread", resumable: bool = True):
+    # handler(params, ctx) -> JSON-serialisable result. pool is "thread" for
+    # I/O-bound work or "process" for CPU-bound work; process handlers must be
+    # module-level functions. resumable=False for work that must not run
+    # twice, which then fails instead of restarting after a crash.
+    if pool not in ("thread", "process"):
+        raise ValueError(f"Unknown pool: {pool}")
+    KINDS[kind] = (handler, pool, resumable)
+
+
+# ----------------- Submitting and inspecting -----------------
+
+def submit(kind: str, params: dict = None, title: str = None, db_path: str = None) -> int:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    with datastore.transaction(db_path) as conn:
+        return conn.execute(
+            "INSERT INTO jobs (kind, title, params, resumable, created_at) VALUES (?, ?, ?, ?, ?)",
+            (kind, title or kind, json.dumps(params or {}), int(KINDS[kind][2]), str(datetime.datetime.now())),
+        ).lastrowid
+
+def _job(cursor, row) -> dict:
+    job = dict(zip([c[0] for c in cursor.description], row))
+    for field in ("params", "state", "result"):
+        job[field] = json.loads(job[field]) if job[field] else None
+    return job
+
+def get_job(job_id: int, db_path: str = None):
+    cursor = datastore.get_connection(db_path).execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+    row = cursor.fetchone()
+    return _job(cursor, row) if row else None
+
+def list_jobs(kinds=None, limit: int = 20, db_path: str = None) -> list:
+    # Newest first; kinds limits the listing to those job kinds.
+    kinds = list(kinds or [])
+    where = f"WHERE kind IN ({', '.join('?' * len(kinds))})" if kinds else ""
+    cursor = datastore.get_connection(db_path).execute(
+        f"SELECT * FROM jobs {where} ORDER BY id DESC LIMIT ?", (*kinds, limit)
+    )
+    return [_job(cursor, row) for row in cursor.fetchall()]
+
+def cancel(job_id: int, db_path: str = None) -> bool:
+    # A queued job is cancelled at once; a running one at its next progress report.
+    with datastore.transaction(db_path) as conn:
+        queued = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+            (str(datetime.datetime.now()), job_id),
+        ).rowcount
+        running = conn.execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)
+        ).rowcount
+    return bool(queued or running)
+
+def delete_job(job_id: int, db_path: str = None):
+    # Finished jobs only; a file the job produced (result["file"]) goes with it.
+    job = get_job(job_id, db_path)
+    if not job or job["status"] in ACTIVE:
+        return
+    path = job["result"].get("file") if isinstance(job["result"], dict) else None
+    if path:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+    with datastore.transaction(db_path) as conn:
+        conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+
+# ----------------- Running -----------------
+
+class JobContext:
+    # Handed to every handler. progress() doubles as the cancellation point.
+    def __init__(self, job_id: int, state=None, db_path: str = None):
+        self.job_id, self.state, self.db_path = job_id, state, db_path
+        self._written = 0.0
+
+    def progress(self, done: int, total: int = None, message: str = None):
+        now = time.monotonic()
+        if now - self._written < PROGRESS_INTERVAL and (total is None or done < total):
+            return
+        self._written = now
+        with datastore.transaction(self.db_path) as conn:
+            conn.execute(
+                "UPDATE jobs SET done = ?, total = COALESCE(?, total), message = COALESCE(?, message) WHERE id = ?",
+                (done, total, message, self.job_id),
+            )
+            cancelled = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (self.job_id,)).fetchone()
+        if cancelled and cancelled[0]:
+            raise JobCancelled()
+
+    def checkpoint(self, state):
+        # Saved with the job; a resumed run finds it in ctx.state.
+        self.state = state
+        with datastore.transaction(self.db_path) as conn:
+            conn.execute("UPDATE jobs SET state = ? WHERE id = ?", (json.dumps(state), self.job_id))
+
+def _execute(job_id: int, kind: str, params: dict, state, db_path: str = None):
+    handler = KINDS[kind][0]
+    return handler(params, JobContext(job_id, state, db_path))
+
+def _init_process():
+    # Writes from a job process must run the same hooks as the app's.
+    import analytics, blobs, media, notify, search  # noqa: F401,E401
+
+
+class Runner:
+    def __init__(self, threads: int = THREADS, processes: int = PROCESSES, db_path: str = None):
+        self.db_path = db_path
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.slots = {"thread": threads, "process": processes}
+        self.pools = {"thread": concurrent.futures.ThreadPoolExecutor(threads, "job"), "process": None}
+        self.running = {}  # future -> (job_id, pool)
+        self.stopping = threading.Event()
+        self._beat = 0.0
+
+    def _pool(self, name: str):
+        if self.pools[name] is None:
+            # spawn rather than fork: the Streamlit server process runs many threads.
+            self.pools[name] = concurrent.futures.ProcessPoolExecutor(
+                self.slots[name], multiprocessing.get_context("spawn"), initializer=_init_process
+            )
+        return self.pools[name]
+
+    def _claim(self):
+        # The oldest queued job of a kind this process knows, with room in its pool.
+        free = {name: self.slots[name] - sum(1 for _, p in self.running.values() if p == name)
+                for name in self.slots}
+        with datastore.transaction(self.db_path) as conn:
+            for job_id, kind, params, state in conn.execute(
+                "SELECT id, kind, params, state FROM jobs WHERE status = 'queued' ORDER BY id"
+            ).fetchall():
+                if kind not in KINDS or free[KINDS[kind][1]] <= 0:
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, heartbeat_at = ?, attempts = attempts + 1, "
+                    "started_at = COALESCE(started_at, ?) WHERE id = ?",
+                    (self.owner, time.time(), str(datetime.datetime.now()), job_id),
+                )
+                return job_id, kind, json.loads(params), json.loads(state) if state else None
+        return None
+
+    def _start(self, job_id: int, kind: str, params: dict, state):
+        pool = KINDS[kind][1]
+        future = self._pool(pool).submit(_execute, job_id, kind, params, state, self.db_path)
+        self.running[future] = (job_id, pool)
+
+    def _finish(self, future):
+        job_id, _ = self.running.pop(future)
+        status, result, error = "done", None, None
+        try:
+            result = future.result()
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+        with datastore.transaction(self.db_path) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+                "done = CASE WHEN ? = 'done' THEN COALESCE(total, done) ELSE done END WHERE id = ?",
+                (status, json.dumps(result), error, str(datetime.datetime.now()), status, job_id),
+            )
+
+    def _heartbeat(self):
+        now = time.time()
+        if now - self._beat < HEARTBEAT_INTERVAL:
+            return
+        self._beat = now
+        with datastore.transaction(self.db_path) as conn:
+            conn.executemany("UPDATE jobs SET heartbeat_at = ? WHERE id = ?",
+                             [(now, job_id) for job_id, _ in self.running.values()])
+            recover_abandoned(conn, now)
+
+    def run(self, until_idle: bool = False):
+        # Claims and runs jobs until stop(), or with until_idle=True until the
+        # queue is empty and nothing is running.
+        with datastore.transaction(self.db_path) as conn:
+            recover_abandoned(conn, time.time())
+        try:
+            while not self.stopping.is_set():
+                self._heartbeat()
+                while (claimed := self._claim()) is not None:
+                    self._start(*claimed)
+                if not self.running:
+                    if until_idle:
+                        break
+                    self.stopping.wait(POLL_INTERVAL)
+                    continue
+                done, _ = concurrent.futures.wait(
+                    self.running, timeout=POLL_INTERVAL, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    self._finish(future)
+        finally:
+            for future in concurrent.futures.as_completed(list(self.running)):
+                self._finish(future)
+            for pool in self.pools.values():
+                if pool is not None:
+                    pool.shutdown()
+
+    def stop(self):
+        self.stopping.set()
+
+def _owner_gone(owner: str) -> bool:
+    # True when the owning process was on this machine and no longer exists.
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit() or int(pid) == os.getpid():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+def recover_abandoned(conn, now: float) -> int:
+    # Running jobs whose runner died: queued again to resume, or failed when
+    # their kind is not resumable or they have crashed too often.
+    rows = conn.execute(
+        "SELECT id, owner, heartbeat_at, resumable, attempts FROM jobs WHERE status = 'running'"
+    ).fetchall()
+    recovered = 0
+    for job_id, owner, heartbeat_at, resumable, attempts in rows:
+        if (heartbeat_at or 0) > now - STALE_AFTER and not _owner_gone(owner):
+            continue
+        if resumable and attempts < MAX_ATTEMPTS:
+            conn.execute("UPDATE jobs SET status = 'queued', owner = NULL WHERE id = ?", (job_id,))
+        else:
+            reason = "interrupted and cannot be resumed" if not resumable else "interrupted too many times"
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (f"Job {reason}", str(datetime.datetime.now()), job_id),
+            )
+        recovered += 1
+    return recovered
+
+def start_background(db_path: str = None) -> Runner:
+    # Runs jobs from a daemon thread of the current process.
+    runner = Runner(db_path=db_path)
+    threading.Thread(target=runner.run, name="job-runner", daemon=True).start()
+    return runner
+
+
+# ----------------- Job kinds -----------------
+# Imports are inside the handlers so that importing jobs stays cheap.
+
+def _bulk_pdfs(params, ctx):
+    # The batch renders on its own process pool and resumes from the files
+    # already written, so the job itself only needs a thread.
+    import bulk_pdfs
+    batch = bulk_pdfs.run_batch(params["batch_id"], progress=ctx.progress, db_path=ctx.db_path)
+    return {"batch_id": batch["id"], "status": batch["status"], "done": batch["done"],
+            "failed": len(batch["failed"]), "zip_path": batch["zip_path"]}
+
+def _media(params, ctx):
+    # Resizes and registers already stored uploads; one checkpoint per photo.
+    import media
+    items, finished = params["items"], (ctx.state or {}).get("finished", 0)
+    for i, item in enumerate(items[finished:], finished):
+        ctx.progress(i, len(items), item["caption"])
+        media.register_file(item["path"], params["kind"], item["caption"], blob=item["hash"],
+                            media_id=item.get("id"))
+        ctx.checkpoint({"finished": i + 1})
+    return {"photos": len(items)}
+
+def _export(params, ctx):
+    import exporter
+    count = exporter.export(params["dataset"], params["format"], params["path"], columns=params.get("columns"),
+                            db_path=ctx.db_path, **params.get("filters", {}))
+    return {"rows": count, "file": params["path"]}
+
+def _import(params, ctx):
+    # Not resumable: re-running a half-done admissions import would number
+    # the unnumbered rows a second time.
+    import importer
+    size = os.path.getsize(params["path"])
+    with open(params["path"], "rb") as f:
+        result = importer.import_file(
+            f, params["filename"], params["kind"], dry_run=params.get("dry_run", False),
+            notify_students=params.get("notify", True), db_path=ctx.db_path,
+            progress=lambda rows: ctx.progress(f.tell(), size, f"{rows} rows read"),
+        )
+    report = None
+    if result["errors"]:
+        # With the other job output, not beside the upload in the blob store;
+        # delete_job removes it with the job.
+        import exporter
+        os.makedirs(exporter.EXPORT_DIR, exist_ok=True)
+        report = os.path.join(exporter.EXPORT_DIR, f"import_{ctx.job_id}.errors.csv")
+        with open(report, "wb") as out:
+            out.write(importer.error_report_csv(result["errors"]))
+    return {"rows": result["rows"], "imported": result["imported"], "errors": len(result["errors"]),
+            "dry_run": result["dry_run"], "file": report}
+
+register("bulk_pdfs", _bulk_pdfs)
+register("media", _media, pool="process")
+register("export", _export)
+register("import", _import, resumable=False)
+
+
+datastore.register_schema(SCHEMA)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Background job queue")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker_cmd = sub.add_parser("worker", help="run queued jobs in this process")
+    worker_cmd.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    worker_cmd.add_argument("--threads", type=int, default=THREADS)
+    worker_cmd.add_argument("--processes", type=int, default=PROCESSES)
+    sub.add_parser("list")
+    cancel_cmd = sub.add_parser("cancel")
+    cancel_cmd.add_argument("job_id", type=int)
+    args = parser.parse_args()
+    datastore.use_data_dir()
+    if args.command == "list":
+        for job in list_jobs(limit=50):
+            total = f"/{job['total']}" if job["total"] else ""
+            print(f"#{job['id']} {job['kind']} {job['status']} {job['done']}{total} {job['title']} "
+                  f"{job['error'] or ''}")
+    elif args.command == "cancel":
+        print("cancel requested" if cancel(args.job_id) else "job is not queued or running")
+    else:
+        _init_process()
+        runner = Runner(args.threads, args.processes)
+        try:
+            runner.run(until_idle=args.once)
+        except KeyboardInterrupt:
+            runner.stop()
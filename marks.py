@@ -0,0 +1,142 @@
+import datetime
+import json
+
+import pandas as pd
+
+import datacache
+import datastore
+import results
+
+# ----------------- Scholarship marks -----------------
+# The Admin Panel edits marks in a grid over one cached frame of every
+# student. Saving diffs the grid against that frame and writes all changed
+# marks in a single transaction; each saved batch is kept so the last one
+# can be undone.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS marks_batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    changes TEXT NOT NULL,
+    undone_at TEXT
+);
+"""
+
+COLUMNS = ["admission_no", "full_name", "scholarship_marks"]
+
+
+def marks_frame(db_path: str = None) -> pd.DataFrame:
+    # Rebuilt only when the students collection changes. Read straight from
+    # SQL so no record JSON is decoded in Python. Do not modify the result.
+    stamp = datastore.cache_stamp("students", db_path)
+    return datacache.get(f"marks_frame:{db_path}", stamp, lambda: _load_frame(db_path))
+
+def _load_frame(db_path: str = None) -> pd.DataFrame:
+    rows = datastore.get_connection(db_path).execute(
+        "SELECT key, COALESCE(json_extract(data, '$.full_name'), json_extract(data, '$.name'), 'Unknown'), "
+        "json_extract(data, '$.scholarship_marks') "
+        "FROM records WHERE collection = 'students' ORDER BY key"
+    ).fetchall()
+    frame = pd.DataFrame(rows, columns=COLUMNS)
+    frame["scholarship_marks"] = pd.to_numeric(frame["scholarship_marks"], errors="coerce").astype("Float64")
+    return frame
+
+def _value(marks):
+    # Grid cell or stored value -> float or None, like every other reader.
+    return None if pd.isna(marks) else results.parse_marks(marks)
+
+def _plain(marks):
+    # Whole marks are stored as ints, as the forms and importer write them.
+    return None if marks is None else results.grade(marks)[0]
+
+
+# ----------------- Saving -----------------
+
+def diff_marks(original: pd.DataFrame, edited: pd.DataFrame):
+    # Returns ({admission_no: (old, new)}, [error messages]). Blank means
+    # "no marks"; anything else must be a whole number from 0 to 100.
+    changes, errors = {}, []
+    before = original.set_index("admission_no")["scholarship_marks"]
+    for adm, entered in zip(edited["admission_no"], edited["scholarship_marks"]):
+        old, new = _value(before.get(adm)), _value(entered)
+        unreadable = new is None and not pd.isna(entered)  # out of range, inf
+        if old == new and not unreadable:
+            continue
+        if unreadable or new is not None and not new.is_integer():
+            errors.append(f"{adm}: marks {entered:g} must be a whole number from 0 to 100")
+            continue
+        # Old marks keep their fraction (legacy "72.5"), so commit_marks
+        # still recognises them as what the grid started from.
+        changes[adm] = (_plain(old), _plain(new))
+    return changes, errors
+
+def commit_marks(changes: dict, db_path: str = None):
+    # One validated write for the whole batch. A row whose stored marks no
+    # longer match what the grid started from was changed by someone else
+    # meanwhile; it is skipped and reported instead of overwritten.
+    # Returns (batch_id or None, [skipped admission numbers]).
+    skipped = []
+    applied = []
+    with datastore.transaction(db_path) as conn:
+        updates = {}
+        for adm, (old, new) in changes.items():
+            current = datastore.get_record("students", adm, db_path)
+            stored = results.parse_marks(current.get("scholarship_marks")) if current else None
+            if current is None or stored != results.parse_marks(old):
+                skipped.append(adm)
+                continue
+            updates[adm] = _with_marks(current, new)
+            applied.append([adm, old, new])
+        if not updates:
+            return None, skipped
+        datastore.put_records("students", updates, db_path=db_path)
+        cursor = conn.execute(
+            "INSERT INTO marks_batches (created_at, changes) VALUES (?, ?)",
+            (str(datetime.datetime.now()), json.dumps(applied)),
+        )
+        return cursor.lastrowid, skipped
+
+def _with_marks(student: dict, marks):
+    updated = dict(student)
+    if marks is None:
+        updated.pop("scholarship_marks", None)
+    else:
+        updated["scholarship_marks"] = marks
+    return updated
+
+
+# ----------------- Undo -----------------
+
+def last_batch(db_path: str = None):
+    row = datastore.get_connection(db_path).execute(
+        "SELECT id, created_at, changes FROM marks_batches WHERE undone_at IS NULL ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    if row is None:
+        return None
+    return {"id": row[0], "created_at": row[1], "changes": json.loads(row[2])}
+
+def undo_batch(batch_id: int, db_path: str = None) -> dict:
+    # Puts the old marks back, except where a student's marks were changed
+    # again after the batch. Returns {"restored": n, "skipped": [...]}.
+    with datastore.transaction(db_path) as conn:
+        row = conn.execute(
+            "SELECT changes FROM marks_batches WHERE id = ? AND undone_at IS NULL", (batch_id,)
+        ).fetchone()
+        if row is None:
+            return {"restored": 0, "skipped": []}
+        updates, skipped = {}, []
+        for adm, old, new in json.loads(row[0]):
+            current = datastore.get_record("students", adm, db_path)
+            stored = results.parse_marks(current.get("scholarship_marks")) if current else None
+            if current is None or stored != results.parse_marks(new):
+                skipped.append(adm)
+                continue
+            updates[adm] = _with_marks(current, old)
+        datastore.put_records("students", updates, db_path=db_path)
+        conn.execute(
+            "UPDATE marks_batches SET undone_at = ? WHERE id = ?", (str(datetime.datetime.now()), batch_id)
+        )
+    return {"restored": len(updates), "skipped": skipped}
+
+
+datastore.register_schema(SCHEMA)
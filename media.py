@@ -0,0 +1,238 @@
+import contextlib
+import datetime
+import hashlib
+import os
+import sys
+import threading
+
+from PIL import Image, ImageOps, features
+
+import blobs
+import datastore
+
+# ----------------- Configuration -----------------
+DERIVATIVE_DIR = "media_cache"
+WIDTHS = (320, 640, 1280)
+QUALITY = 80
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# WebP when this Pillow build can write it, JPEG otherwise.
+if features.check("webp"):
+    FORMAT, EXTENSION = "WEBP", ".webp"
+else:
+    FORMAT, EXTENSION = "JPEG", ".jpg"
+
+_lock = threading.Lock()
+_hashes = {}
+
+
+# ----------------- Derivatives -----------------
+
+def content_hash(path: str) -> str:
+    # Hashing is remembered per (path, mtime, size) so reruns do not re-read
+    # every original just to find its derivatives.
+    st = os.stat(path)
+    stamp = (path, st.st_mtime_ns, st.st_size)
+    with _lock:
+        cached = _hashes.get(stamp)
+    if cached:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _lock:
+        _hashes[stamp] = value
+    return value
+
+def derivative_path(digest: str, width: int) -> str:
+    return os.path.join(DERIVATIVE_DIR, digest[:2], f"{digest}_{width}{EXTENSION}")
+
+def make_derivatives(path: str) -> dict:
+    # Writes every configured width that is missing; returns {width: path}.
+    digest = content_hash(path)
+    wanted = {w: derivative_path(digest, w) for w in WIDTHS}
+    missing = {w: p for w, p in wanted.items() if not os.path.exists(p)}
+    if not missing:
+        return wanted
+    with Image.open(path) as original:
+        # Apply the EXIF orientation, then drop all metadata by re-encoding
+        # only the pixels.
+        image = ImageOps.exif_transpose(original)
+        keep_alpha = FORMAT == "WEBP" and ("A" in image.getbands() or "transparency" in image.info)
+        if keep_alpha:
+            image = image.convert("RGBA")
+        elif image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        for width, target in sorted(missing.items()):
+            resized = image.copy()
+            if resized.width > width:
+                resized.thumbnail((width, width * 10), Image.LANCZOS)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp_path = target + ".tmp"
+            resized.save(tmp_path, FORMAT, quality=QUALITY, optimize=True)
+            os.replace(tmp_path, target)
+    return wanted
+
+def display_path(path: str, width: int = 640) -> str:
+    # Smallest derivative at least `width` wide, generated on first use for
+    # files that predate the pipeline. Falls back to the original on error.
+    if not path or not os.path.exists(path):
+        return path
+    try:
+        derivatives = make_derivatives(path)
+    except (OSError, ValueError):
+        return path
+    chosen = next((w for w in WIDTHS if w >= width), WIDTHS[-1])
+    return derivatives[chosen]
+
+
+# ----------------- Manifest -----------------
+# One "media" record per displayed image, so pages list photos from the
+# store in a stable order instead of calling os.listdir on every rerun.
+# Records are keyed per upload, not by content: two uploads of the same
+# photo are two entries sharing one blob, and the blob's reference count
+# keeps the bytes until both are deleted.
+
+MEDIA_DIRS = {"gallery": "gallery", "alumni": "alumni"}
+
+def register_upload(uploaded_file, kind: str, caption: str = None) -> dict:
+    # Streams the upload into the blob store; the manifest record holds the
+    # blob reference, so deleting the entry frees the bytes if unshared.
+    blob = blobs.store_stream(uploaded_file, uploaded_file.name)
+    return register_file(blob["path"], kind, caption or uploaded_file.name, blob=blob["hash"])
+
+def new_media_id(kind: str) -> str:
+    return f"{kind}-{datastore.allocate_sequence('media')[0]}"
+
+def _id_for_path(path: str, kind: str):
+    # A file registered from disk keeps its entry when indexed again.
+    row = datastore.get_connection().execute(
+        "SELECT key FROM records WHERE collection = 'media' AND json_extract(data, '$.path') = ? "
+        "AND json_extract(data, '$.kind') = ? AND json_extract(data, '$.blob') IS NULL LIMIT 1",
+        (path, kind),
+    ).fetchone()
+    return row[0] if row else None
+
+def register_file(path: str, kind: str, caption: str = None, blob: str = None, media_id: str = None) -> dict:
+    # media_id lets a caller that may run twice (a resumed job) write the same
+    # entry again; otherwise every upload gets a new one.
+    digest = blob or content_hash(path)
+    try:
+        derivatives = make_derivatives(path)
+        with Image.open(path) as image:
+            width, height = ImageOps.exif_transpose(image).size
+    except (OSError, ValueError):
+        derivatives, width, height = {}, None, None
+    media_id = media_id or (None if blob else _id_for_path(path, kind)) or new_media_id(kind)
+    existing = datastore.get_record("media", media_id)
+    record = {
+        "id": media_id,
+        "kind": kind,
+        "path": path,
+        "caption": caption or os.path.basename(path),
+        "hash": digest,
+        "width": width,
+        "height": height,
+        "uploaded_at": existing["uploaded_at"] if existing else str(datetime.datetime.now()),
+        "derivatives": {str(w): p for w, p in derivatives.items()},
+    }
+    if blob:
+        record["blob"] = blob
+    datastore.put_record("media", media_id, record)
+    return record
+
+def remove_file(media_id: str):
+    record = datastore.get_record("media", media_id)
+    if not record:
+        return
+    datastore.delete_record("media", media_id)
+    if record.get("blob"):
+        # The blob store drops the file and, via remove_derivatives, its thumbnails.
+        return
+    if os.path.exists(record["path"]) and not _path_in_use(record["path"]):
+        os.remove(record["path"])
+    remove_derivatives(record["hash"])
+
+def remove_derivatives(digest: str):
+    # Derivatives are shared by content; keep them while anything else uses them.
+    if datastore.find_keys("media", "hash", digest):
+        return
+    for width in WIDTHS:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(derivative_path(digest, width))
+
+def _path_in_use(path: str) -> bool:
+    conn = datastore.get_connection()
+    return conn.execute(
+        "SELECT 1 FROM records WHERE collection = 'media' AND json_extract(data, '$.path') = ? LIMIT 1",
+        (path,),
+    ).fetchone() is not None
+
+def list_media(kind: str, limit: int, after=None):
+    # Oldest first so page boundaries do not shift as new photos arrive.
+    return datastore.page_records("media", "uploaded_at", limit, after=after, partition=kind)
+
+def count_media(kind: str) -> int:
+    return datastore.count_records("media", partition=kind)
+
+def media_src(record: dict, width: int = 640) -> str:
+    derivatives = record.get("derivatives") or {}
+    chosen = next((w for w in WIDTHS if w >= width), WIDTHS[-1])
+    path = derivatives.get(str(chosen))
+    if path and os.path.exists(path):
+        return path
+    return display_path(record["path"], width)
+
+def import_existing(force: bool = False) -> dict:
+    # One-shot manifest build for photos uploaded before the manifest existed.
+    # Teacher photos used to be saved into gallery/ as teacher_*.
+    conn = datastore.get_connection()
+    if not force and conn.execute("SELECT 1 FROM meta WHERE name = 'media_imported'").fetchone():
+        return {}
+    counts = {}
+    for kind, directory in MEDIA_DIRS.items():
+        for path in iter_images([directory]):
+            file_kind = "teacher" if os.path.basename(path).startswith("teacher_") else kind
+            register_file(path, file_kind)
+            counts[file_kind] = counts.get(file_kind, 0) + 1
+    conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('media_imported', '1')")
+    return counts
+
+
+# ----------------- Backfill -----------------
+
+def iter_images(directories):
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(directory, name)
+
+def backfill(directories=("gallery", "alumni", "uploads")) -> dict:
+    counts = {"done": 0, "failed": 0}
+    for path in iter_images(directories):
+        try:
+            make_derivatives(path)
+            counts["done"] += 1
+        except (OSError, ValueError) as e:
+            counts["failed"] += 1
+            print(f"skipped {path}: {e}")
+    return counts
+
+
+blobs.on_free(remove_derivatives)
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "backfill":
+        result = backfill(sys.argv[2:] or ("gallery", "alumni", "uploads"))
+        print(f"{result['done']} images processed, {result['failed']} skipped")
+    elif command == "index":
+        for kind, count in import_existing(force=True).items():
+            print(f"{kind}: {count} images")
+    else:
+        print("Usage: python media.py backfill [dir ...] | python media.py index")
+        sys.exit(1)
@@ -0,0 +1,423 @@
+import argparse
+import concurrent.futures
+import contextlib
+import datetime
+import email.message
+import json
+import os
+import random
+import smtplib
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import datastore
+import results
+
+# ----------------- Notification outbox -----------------
+# Students are told when their admission form arrives, when scholarship marks
+# are posted and when their certificate is ready. A write hook on the
+# students collection puts the messages in the outbox table inside the same
+# transaction as the change, so a notice exists exactly when the change
+# committed, and no page ever waits on a mail server or SMS gateway.
+#
+# A Worker (a background thread of the app, or "python notify.py worker")
+# claims due messages per channel, sends them on a small thread pool under a
+# per-channel rate limit and records the outcome. Failed sends are retried
+# with exponential backoff; a claim is a lease, so messages held by a crashed
+# worker are picked up again once it runs out. Delivery is at least once.
+
+CHANNELS = ("email", "sms", "whatsapp")
+RECIPIENT_FIELDS = {"email": "email", "sms": "contact_no", "whatsapp": "whatsapp_no"}
+
+BATCH_SIZE = 50        # messages claimed per channel at a time
+SEND_THREADS = 4       # per channel
+RATE_LIMITS = {"email": 5.0, "sms": 1.0, "whatsapp": 1.0}  # messages per second
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 30      # seconds before the first retry, doubled for each further one
+BACKOFF_MAX = 3600
+LEASE = 300            # seconds a claimed message is reserved for one worker
+POLL_INTERVAL = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event TEXT NOT NULL,
+    student TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    sent_at TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (channel, next_attempt_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS outbox_pending_by_student ON outbox (student, event) WHERE status = 'pending';
+"""
+
+_local = threading.local()
+
+
+class PermanentError(Exception):
+    """Raised by a transport when retrying cannot help (address rejected, bad request)."""
+
+
+# ----------------- Queueing -----------------
+
+def _events(old, new) -> list:
+    if not new:
+        return []
+    old = old or {}
+    events = []
+    if not old:
+        events.append("admission")
+    marks = results.parse_marks(new.get("scholarship_marks"))
+    if marks is not None and marks != results.parse_marks(old.get("scholarship_marks")):
+        events.append("marks")
+    if new.get("course_completed") and not old.get("course_completed"):
+        events.append("certificate")
+    return events
+
+def _recipient(channel: str, value) -> str:
+    value = str(value or "").strip()
+    if channel == "email":
+        return value if "@" in value else ""
+    digits = "".join(c for c in value if c.isdigit())
+    if len(digits) < 10:
+        return ""
+    return ("+" if value.startswith("+") else "") + digits
+
+def message(event: str, student: dict) -> tuple:
+    # (subject, body); the body doubles as the SMS / WhatsApp text.
+    name = student.get("full_name") or student.get("name") or "Student"
+    adm = student.get("admission_no", "")
+    if event == "admission":
+        courses = ", ".join(student.get("courses") or [])
+        return (f"Admission received - {adm}",
+                f"Dear {name}, your admission form for {courses} has been received. "
+                f"Your Admission No is {adm}. Please keep it for results and certificates.")
+    if event == "marks":
+        marks, status = results.grade(results.parse_marks(student.get("scholarship_marks")))
+        return (f"Scholarship test result - {adm}",
+                f"Dear {name}, your scholarship test result is out: {marks} marks "
+                f"({results.STATUS_LABELS[status]}). "
+                f"Check the Result page with Admission No {adm}.")
+    if event == "certificate":
+        return (f"Certificate ready - {adm}",
+                f"Dear {name}, congratulations on completing your course. Your certificate is ready "
+                f"to download from the Certificate page with Admission No {adm}.")
+    raise ValueError(f"Unknown event: {event}")
+
+def _queue_student(conn, collection, key, old, new):
+    events = _events(old, new)
+    if "marks" in events or (new is None and old):
+        # Only the newest marks are worth sending, and nothing to a deleted record.
+        conn.execute(
+            "UPDATE outbox SET status = 'superseded' WHERE student = ? AND status = 'pending' "
+            "AND (event = 'marks' OR ?)", (key, new is None),
+        )
+    if not events or getattr(_local, "muted", False):
+        return
+    now, created_at = time.time(), str(datetime.datetime.now())
+    student = dict(new, admission_no=new.get("admission_no") or key)
+    rows = []
+    for event in events:
+        subject, body = message(event, student)
+        for channel in CHANNELS:
+            recipient = _recipient(channel, new.get(RECIPIENT_FIELDS[channel]))
+            if recipient:
+                rows.append((event, key, channel, recipient, subject, body, now, created_at))
+    conn.executemany(
+        "INSERT INTO outbox (event, student, channel, recipient, subject, body, next_attempt_at, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows,
+    )
+
+@contextlib.contextmanager
+def muted():
+    # Writes made inside queue no notices: migrating old data, back-filling
+    # past admissions from a spreadsheet.
+    previous = getattr(_local, "muted", False)
+    _local.muted = True
+    try:
+        yield
+    finally:
+        _local.muted = previous
+
+
+# ----------------- Transports -----------------
+# A transport is anything with send(recipient, subject, body). It raises
+# PermanentError for messages that must not be retried; any other exception
+# means "try again later".
+
+class SMTPTransport:
+    def __init__(self, host: str, port: int = 587, username: str = None, password: str = None,
+                 sender: str = None, starttls: bool = True, timeout: float = 30):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.username, self.password, self.starttls = username, password, starttls
+        self.sender = sender or username or f"noreply@{host}"
+        self._local = threading.local()  # one open connection per send thread
+
+    def _connection(self):
+        smtp = getattr(self._local, "smtp", None)
+        if smtp is None:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            self._local.smtp = smtp
+        return smtp
+
+    def send(self, recipient: str, subject: str, body: str):
+        msg = email.message.EmailMessage()
+        msg["From"], msg["To"], msg["Subject"] = self.sender, recipient, subject
+        msg.set_content(body)
+        try:
+            self._connection().send_message(msg)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise PermanentError(f"recipient refused: {e.recipients}") from e
+        except Exception:
+            smtp, self._local.smtp = getattr(self._local, "smtp", None), None
+            if smtp is not None:
+                with contextlib.suppress(Exception):
+                    smtp.close()
+            raise
+
+
+class GatewayTransport:
+    # SMS and WhatsApp through an HTTP gateway: POSTs
+    # {"channel", "to", "message"} as JSON, with an optional bearer token.
+    def __init__(self, url: str, channel: str = "sms", token: str = None, timeout: float = 15):
+        self.url, self.channel, self.token, self.timeout = url, channel, token, timeout
+
+    def send(self, recipient: str, subject: str, body: str):
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        payload = json.dumps({"channel": self.channel, "to": recipient, "message": body}).encode("utf-8")
+        request = urllib.request.Request(self.url, payload, headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            if 400 <= e.code < 500 and e.code not in (408, 429):
+                raise PermanentError(f"gateway answered HTTP {e.code}") from e
+            raise
+
+def transports_from_env(environ=None) -> dict:
+    # channel -> transport for every channel configured in the environment:
+    #   FICSE_SMTP_HOST, FICSE_SMTP_PORT, FICSE_SMTP_USER, FICSE_SMTP_PASSWORD,
+    #   FICSE_SMTP_FROM, FICSE_SMTP_STARTTLS (default 1)
+    #   FICSE_SMS_URL, FICSE_WHATSAPP_URL, FICSE_GATEWAY_TOKEN
+    env = os.environ if environ is None else environ
+    transports = {}
+    if env.get("FICSE_SMTP_HOST"):
+        transports["email"] = SMTPTransport(
+            env["FICSE_SMTP_HOST"], int(env.get("FICSE_SMTP_PORT", 587)),
+            env.get("FICSE_SMTP_USER"), env.get("FICSE_SMTP_PASSWORD"), env.get("FICSE_SMTP_FROM"),
+            starttls=env.get("FICSE_SMTP_STARTTLS", "1") not in ("0", "false", "no"),
+        )
+    for channel in ("sms", "whatsapp"):
+        url = env.get(f"FICSE_{channel.upper()}_URL")
+        if url:
+            transports[channel] = GatewayTransport(url, channel, env.get("FICSE_GATEWAY_TOKEN"))
+    return transports
+
+
+# ----------------- Sending -----------------
+
+class RateLimiter:
+    # Token bucket shared by the send threads of one channel.
+    def __init__(self, rate: float, burst: float = 1):
+        self.rate, self.burst = rate, burst
+        self.tokens, self.updated = burst, time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+def claim(channel: str, limit: int, db_path: str = None) -> list:
+    # Due messages for one channel, leased to the caller for LEASE seconds.
+    now = time.time()
+    with datastore.transaction(db_path) as conn:
+        rows = conn.execute(
+            "SELECT id, recipient, subject, body, attempts + 1 FROM outbox "
+            "WHERE channel = ? AND status = 'pending' AND next_attempt_at <= ? "
+            "ORDER BY next_attempt_at, id LIMIT ?", (channel, now, limit),
+        ).fetchall()
+        conn.executemany(
+            "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ? WHERE id = ?",
+            [(now + LEASE, row[0]) for row in rows],
+        )
+    return rows
+
+def backoff(attempts: int) -> float:
+    # Seconds to wait after the given number of failed attempts, with jitter so
+    # a gateway outage does not end in every message retrying at once.
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+def record_result(message_id: int, attempts: int, error: str = None, permanent: bool = False,
+                  db_path: str = None):
+    with datastore.transaction(db_path) as conn:
+        if error is None:
+            conn.execute(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?",
+                (str(datetime.datetime.now()), message_id),
+            )
+        elif permanent or attempts >= MAX_ATTEMPTS:
+            conn.execute("UPDATE outbox SET status = 'failed', last_error = ? WHERE id = ?", (error, message_id))
+        else:
+            conn.execute(
+                "UPDATE outbox SET next_attempt_at = ?, last_error = ? WHERE id = ? AND status = 'pending'",
+                (time.time() + backoff(attempts), error, message_id),
+            )
+
+
+class Worker:
+    def __init__(self, transports: dict, db_path: str = None, batch_size: int = BATCH_SIZE,
+                 threads: int = SEND_THREADS, rate_limits: dict = None):
+        self.transports = transports
+        self.db_path = db_path
+        rate_limits = dict(RATE_LIMITS, **(rate_limits or {}))
+        self.limiters = {channel: RateLimiter(rate_limits[channel]) for channel in transports}
+        # Never claim more than a channel can send well within its lease.
+        self.windows = {channel: max(1, min(batch_size, int(rate_limits[channel] * LEASE / 2)))
+                        for channel in transports}
+        # A pool per channel, so a slow SMS gateway never holds up email.
+        self.pools = {channel: concurrent.futures.ThreadPoolExecutor(threads, f"notify-{channel}")
+                      for channel in transports}
+        self.stopping = threading.Event()
+        self.stats = {"sent": 0, "retry": 0, "failed": 0}
+
+    def _send(self, channel: str, row):
+        message_id, recipient, subject, body, attempts = row
+        self.limiters[channel].acquire()
+        try:
+            self.transports[channel].send(recipient, subject, body)
+            return message_id, attempts, None, False
+        except PermanentError as e:
+            return message_id, attempts, str(e), True
+        except Exception as e:
+            return message_id, attempts, f"{type(e).__name__}: {e}", False
+
+    def _finish(self, future):
+        message_id, attempts, error, permanent = future.result()
+        record_result(message_id, attempts, error, permanent, self.db_path)
+        if error is None:
+            self.stats["sent"] += 1
+        elif permanent or attempts >= MAX_ATTEMPTS:
+            self.stats["failed"] += 1
+        else:
+            self.stats["retry"] += 1
+
+    def run(self, until_idle: bool = False) -> dict:
+        # Keeps every channel's window full until stop() is called, or with
+        # until_idle=True until nothing is due and nothing is in flight.
+        inflight = {}
+        try:
+            while not self.stopping.is_set():
+                for channel, window in self.windows.items():
+                    room = window - sum(1 for c in inflight.values() if c == channel)
+                    if room > 0:
+                        for row in claim(channel, room, self.db_path):
+                            inflight[self.pools[channel].submit(self._send, channel, row)] = channel
+                if not inflight:
+                    if until_idle:
+                        break
+                    self.stopping.wait(POLL_INTERVAL)
+                    continue
+                done, _ = concurrent.futures.wait(
+                    inflight, timeout=POLL_INTERVAL, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    del inflight[future]
+                    self._finish(future)
+        finally:
+            # Messages already handed to a transport are seen through and recorded.
+            for future in concurrent.futures.as_completed(inflight):
+                self._finish(future)
+            for pool in self.pools.values():
+                pool.shutdown()
+        return self.stats
+
+    def stop(self):
+        self.stopping.set()
+
+def start_background(transports: dict, db_path: str = None) -> Worker:
+    # Drains the outbox from a daemon thread of the current process.
+    worker = Worker(transports, db_path)
+    threading.Thread(target=worker.run, name="notify-worker", daemon=True).start()
+    return worker
+
+
+# ----------------- Monitoring -----------------
+
+def status_counts(db_path: str = None) -> dict:
+    # {channel: {status: count}}
+    counts = {}
+    for channel, status, count in datastore.get_connection(db_path).execute(
+        "SELECT channel, status, COUNT(*) FROM outbox GROUP BY channel, status"
+    ):
+        counts.setdefault(channel, {})[status] = count
+    return counts
+
+def recent(status: str = None, limit: int = 20, db_path: str = None) -> list:
+    cursor = datastore.get_connection(db_path).execute(
+        "SELECT id, event, student, channel, recipient, status, attempts, last_error, created_at, sent_at "
+        "FROM outbox WHERE ? IS NULL OR status = ? ORDER BY id DESC LIMIT ?", (status, status, limit),
+    )
+    names = [c[0] for c in cursor.description]
+    return [dict(zip(names, row)) for row in cursor]
+
+def retry_failed(db_path: str = None) -> int:
+    # Puts every failed message back in the queue with a fresh set of attempts.
+    with datastore.transaction(db_path) as conn:
+        return conn.execute(
+            "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ? WHERE status = 'failed'",
+            (time.time(),),
+        ).rowcount
+
+
+datastore.register_schema(SCHEMA)
+datastore.register_hook("students", _queue_student)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Student notification outbox")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker_cmd = sub.add_parser("worker", help="send queued messages (transports from FICSE_* variables)")
+    worker_cmd.add_argument("--once", action="store_true", help="exit when nothing is due")
+    sub.add_parser("status")
+    sub.add_parser("retry-failed")
+    args = parser.parse_args()
+    datastore.use_data_dir()
+    if args.command == "status":
+        for channel, counts in sorted(status_counts().items()):
+            print(channel, ", ".join(f"{status} {n}" for status, n in sorted(counts.items())))
+    elif args.command == "retry-failed":
+        print(f"{retry_failed()} messages queued again")
+    else:
+        transports = transports_from_env()
+        if not transports:
+            print("No transports configured (set FICSE_SMTP_HOST, FICSE_SMS_URL or FICSE_WHATSAPP_URL)")
+            sys.exit(1)
+        worker = Worker(transports)
+        print(f"Sending {', '.join(transports)}", flush=True)
+        try:
+            stats = worker.run(until_idle=args.once)
+        except KeyboardInterrupt:
+            stats = worker.stats
+        print(f"{stats['sent']} sent, {stats['retry']} to retry, {stats['failed']} failed")
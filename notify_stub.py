@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ----------------- Local stand-ins for the notification transports -----------------
+# An SMS/WhatsApp gateway and an SMTP server that accept everything and keep
+# what they received, so the outbox worker can be run end to end on a laptop:
+#
+#   python notify_stub.py --http-port 8700 --smtp-port 8025 --fail-rate 0.1
+#   FICSE_SMS_URL=http://127.0.0.1:8700/send FICSE_WHATSAPP_URL=http://127.0.0.1:8700/send \
+#   FICSE_SMTP_HOST=127.0.0.1 FICSE_SMTP_PORT=8025 FICSE_SMTP_STARTTLS=0 python notify.py worker
+#
+# fail_rate makes the gateway answer 503 (and the SMTP server 451) to that
+# share of messages, to exercise retries; delay adds that many seconds of
+# latency to every message, like a real gateway over the internet.
+
+
+class StubServers:
+    def __init__(self, http_port: int = 0, smtp_port: int = 0, fail_rate: float = 0.0, delay: float = 0.0,
+                 echo: bool = False):
+        self.fail_rate, self.delay, self.echo = fail_rate, delay, echo
+        self.received = []  # {"channel", "to", "message" or "data", "at"}
+        self.rejected = 0
+        self.lock = threading.Lock()
+        self.http = ThreadingHTTPServer(("127.0.0.1", http_port), self._http_handler())
+        self.http.daemon_threads = True
+        self.http_port = self.http.server_address[1]
+        self.smtp_port = smtp_port
+        self._loop = None
+        self._smtp_ready = threading.Event()
+
+    def _fail(self) -> bool:
+        if self.fail_rate and random.random() < self.fail_rate:
+            with self.lock:
+                self.rejected += 1
+            return True
+        return False
+
+    def _keep(self, item: dict):
+        item["at"] = time.time()
+        with self.lock:
+            self.received.append(item)
+        if self.echo:
+            print(json.dumps(item, ensure_ascii=False), flush=True)
+
+    def _http_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                time.sleep(stub.delay)
+                if stub._fail():
+                    code = 503
+                else:
+                    try:
+                        stub._keep(json.loads(body))
+                        code = 200
+                    except ValueError:
+                        code = 400
+                self.send_response(code)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    async def _smtp_session(self, reader, writer):
+        # Just enough of RFC 5321 for smtplib: EHLO, MAIL, RCPT, DATA, RSET, QUIT.
+        def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+
+        reply("220 stub ESMTP")
+        sender, recipients = None, []
+        while True:
+            line = (await reader.readline()).decode(errors="replace").rstrip("\r\n")
+            if not line:
+                break
+            verb = line[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                reply("250 stub")
+            elif verb == "MAIL":
+                sender, recipients = line[10:].strip("<> "), []
+                reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(line[8:].strip("<> "))
+                reply("250 OK")
+            elif verb == "DATA":
+                reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while (data := await reader.readline()) not in (b".\r\n", b""):
+                    lines.append(data)
+                await asyncio.sleep(self.delay)
+                if self._fail():
+                    reply("451 Try again later")
+                else:
+                    for to in recipients:
+                        self._keep({"channel": "email", "from": sender, "to": to,
+                                    "data": b"".join(lines).decode(errors="replace")})
+                    reply("250 OK")
+            elif verb in ("RSET", "NOOP"):
+                reply("250 OK")
+            elif verb == "QUIT":
+                reply("221 Bye")
+                break
+            else:
+                reply("502 Not implemented")
+            await writer.drain()
+        await writer.drain()
+        writer.close()
+
+    def _run_smtp(self):
+        self._loop = asyncio.new_event_loop()
+        server = self._loop.run_until_complete(
+            asyncio.start_server(self._smtp_session, "127.0.0.1", self.smtp_port)
+        )
+        self.smtp_port = server.sockets[0].getsockname()[1]
+        self._smtp_ready.set()
+        self._loop.run_forever()
+
+    def start(self):
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+        threading.Thread(target=self._run_smtp, daemon=True).start()
+        self._smtp_ready.wait()
+        return self
+
+    def stop(self):
+        self.http.shutdown()
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._close_sessions)
+
+    def _close_sessions(self):
+        for task in asyncio.all_tasks(self._loop):
+            task.cancel()
+        self._loop.call_soon(self._loop.stop)
+
+    def env(self) -> dict:
+        # FICSE_* settings that point notify.transports_from_env() at these stubs.
+        url = f"http://127.0.0.1:{self.http_port}/send"
+        return {
+            "FICSE_SMS_URL": url, "FICSE_WHATSAPP_URL": url,
+            "FICSE_SMTP_HOST": "127.0.0.1", "FICSE_SMTP_PORT": str(self.smtp_port), "FICSE_SMTP_STARTTLS": "0",
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub SMS/WhatsApp gateway and SMTP server")
+    parser.add_argument("--http-port", type=int, default=8700)
+    parser.add_argument("--smtp-port", type=int, default=8025)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds of latency per message")
+    args = parser.parse_args()
+    stub = StubServers(args.http_port, args.smtp_port, args.fail_rate, args.delay, echo=True).start()
+    print(f"gateway http://127.0.0.1:{stub.http_port}/send, SMTP 127.0.0.1:{stub.smtp_port}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,286 @@
+import collections
+import os
+import threading
+import types
+
+import fpdf.fpdf
+from fpdf import FPDF
+from fpdf.ttfonts import TTFontFile
+
+try:
+    # Optional: joins Arabic-script letters and orders right-to-left runs so
+    # Urdu/Sindhi names print correctly. Without them the glyphs still render.
+    import arabic_reshaper
+    from bidi.algorithm import get_display
+except ImportError:
+    arabic_reshaper = None
+
+# ----------------- Configuration -----------------
+# A Unicode TTF family covering Latin and Arabic script. DejaVu Sans ships
+# in fonts/ next to this file (licence in fonts/LICENSE_DEJAVU); when the
+# files are missing the templates fall back to the core Arial font, which
+# can only print Latin-1.
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+UNICODE_FAMILY = "DejaVu"
+UNICODE_FONT_FILES = {
+    "": "DejaVuSans.ttf",
+    "B": "DejaVuSans-Bold.ttf",
+    "I": "DejaVuSans-Oblique.ttf",
+}
+
+# Every embedded subset includes the whole Latin-1 range, so documents with
+# Latin-only text share one cached subset per font.
+BASE_SUBSET = frozenset(range(32, 256))
+SUBSET_CACHE_ENTRIES = 64
+
+_lock = threading.Lock()
+_images = {}
+_fonts = {}
+_subsets = collections.OrderedDict()
+
+
+# ----------------- Shared resources -----------------
+
+def unicode_font_available() -> bool:
+    return all(os.path.exists(os.path.join(FONT_DIR, f)) for f in UNICODE_FONT_FILES.values())
+
+def _has_arabic(text: str) -> bool:
+    return any("؀" <= ch <= "ۿ" or "ﭐ" <= ch <= "﻿" for ch in text)
+
+
+class SubsetCachingTTFontFile(TTFontFile):
+    # makeSubset re-reads and re-checksums the whole TTF on every output; the
+    # result only depends on the file and the glyph set, so keep it.
+
+    def makeSubset(self, file, subset):
+        st = os.stat(file)
+        key = (file, st.st_mtime_ns, tuple(subset))
+        with _lock:
+            cached = _subsets.get(key)
+            if cached is not None:
+                _subsets.move_to_end(key)
+        if cached is None:
+            stream = super().makeSubset(file, subset)
+            cached = (stream, self.codeToGlyph, self.maxUni)
+            with _lock:
+                _subsets[key] = cached
+                while len(_subsets) > SUBSET_CACHE_ENTRIES:
+                    _subsets.popitem(last=False)
+        stream, self.codeToGlyph, self.maxUni = cached
+        return stream
+
+
+# PyFPDF 1.7.2 (pinned in requirements.txt) looks TTFontFile up as a global
+# of fpdf.fpdf when it writes fonts. TemplatePDF runs that same _putfonts
+# over a copy of the module's globals naming the caching subclass instead,
+# so the fpdf module and plain FPDF documents are left untouched.
+_putfonts_with_cache = types.FunctionType(
+    FPDF._putfonts.__code__, dict(vars(fpdf.fpdf), TTFontFile=SubsetCachingTTFontFile),
+    "_putfonts", FPDF._putfonts.__defaults__, FPDF._putfonts.__closure__,
+)
+
+
+class TemplatePDF(FPDF):
+    # FPDF that takes parsed images and font metrics from process-wide caches,
+    # so logo.png, student photos and the TTF files are only read once.
+
+    def image(self, name, *args, **kwargs):
+        if name not in self.images:
+            info = self._cached_image(name)
+            if info is not None:
+                # Per-document copy: FPDF drops 'data' from it after writing.
+                self.images[name] = dict(info, i=len(self.images) + 1)
+        return super().image(name, *args, **kwargs)
+
+    def _cached_image(self, path: str):
+        parser = {".jpg": self._parsejpg, ".jpeg": self._parsejpg, ".png": self._parsepng}.get(
+            os.path.splitext(path)[1].lower()
+        )
+        if parser is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (path, st.st_mtime_ns, st.st_size)
+        with _lock:
+            info = _images.get(key)
+        if info is None:
+            info = parser(path)
+            with _lock:
+                _images[key] = info
+        return info
+
+    def add_font(self, family, style="", fname="", uni=False):
+        fontkey = family.lower() + style.upper()
+        if fontkey in self.fonts:
+            return
+        key = (fontkey, fname, uni)
+        with _lock:
+            cached = _fonts.get(key)
+        if cached is None:
+            super().add_font(family, style, fname, uni)
+            font = dict(self.fonts[fontkey])
+            files = {k: dict(self.font_files[k]) for k in (fontkey, fname) if k in self.font_files}
+            with _lock:
+                _fonts[key] = (font, files)
+            return
+        font, files = cached
+        # Fresh glyph subset per document; metrics ('cw') are shared read-only.
+        first_chars = 57 if hasattr(self, "str_alias_nb_pages") else 32
+        self.fonts[fontkey] = dict(font, i=len(self.fonts) + 1, subset=list(range(first_chars)))
+        for k, v in files.items():
+            self.font_files[k] = dict(v)
+
+    def _putfonts(self):
+        for font in self.fonts.values():
+            if font.get("type") == "TTF":
+                # FPDF drops subset[0] (always code 0) before subsetting.
+                font["subset"] = [0] + sorted((set(font["subset"]) | BASE_SUBSET) - {0})
+        _putfonts_with_cache(self)
+
+
+# ----------------- Templates -----------------
+
+class Template:
+    # A layout described as a list of (op, *args) steps, compiled once into
+    # bound drawing calls. Text arguments are str.format templates filled
+    # from the render context; ("each", "items", [...]) repeats its steps
+    # for every value of context["items"] (available as {item}).
+
+    def __init__(self, orientation: str, steps: list):
+        self.orientation = orientation
+        self.styles = set()
+        self.steps = self._compile(steps)
+
+    def _compile(self, steps):
+        compiled = []
+        for op, *args in steps:
+            if op == "each":
+                compiled.append((op, args[0], self._compile(args[1])))
+                continue
+            if op not in _OPS:
+                raise ValueError(f"Unknown template step: {op}")
+            if op == "font":
+                self.styles.add(args[0])
+            compiled.append((op, args, None))
+        return compiled
+
+    def render(self, context: dict) -> bytes:
+        unicode_font = unicode_font_available()
+        pdf = TemplatePDF(self.orientation, "mm", "A4")
+        if unicode_font:
+            for style in self.styles:
+                file = UNICODE_FONT_FILES.get(style) or UNICODE_FONT_FILES[""]
+                pdf.add_font(UNICODE_FAMILY, style, os.path.join(FONT_DIR, file), uni=True)
+        pdf.add_page()
+        state = {"family": UNICODE_FAMILY if unicode_font else "Arial", "unicode": unicode_font}
+        self._run(pdf, self.steps, context, state)
+        out = pdf.output(dest="S")
+        # PyFPDF returns a latin-1 str for dest="S", fpdf2 returns a bytearray.
+        return out.encode("latin-1") if isinstance(out, str) else bytes(out)
+
+    def _run(self, pdf, steps, context, state):
+        for op, args, children in steps:
+            if op == "each":
+                for item in context.get(args, []):
+                    self._run(pdf, children, dict(context, item=item), state)
+            else:
+                _OPS[op](pdf, context, state, *args)
+
+
+def _text(state, template: str, context: dict) -> str:
+    text = template.format_map(context)
+    if state["unicode"]:
+        if arabic_reshaper and _has_arabic(text):
+            text = get_display(arabic_reshaper.reshape(text))
+        return text
+    # Core fonts are latin-1 only.
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+def _op_font(pdf, context, state, style, size):
+    pdf.set_font(state["family"], style, size)
+
+def _op_image(pdf, context, state, source, x, y, w):
+    path = source.format_map(context)
+    if path and os.path.exists(path):
+        pdf.image(path, x=x, y=y, w=w)
+
+def _op_cell(pdf, context, state, w, h, text, ln=False, align=""):
+    pdf.cell(w, h, _text(state, text, context), ln=ln, align=align)
+
+def _op_multi_cell(pdf, context, state, w, h, text, align="J"):
+    pdf.multi_cell(w, h, _text(state, text, context), align=align)
+
+_OPS = {
+    "font": _op_font,
+    "color": lambda pdf, context, state, r, g, b: pdf.set_text_color(r, g, b),
+    "line_width": lambda pdf, context, state, width: pdf.set_line_width(width),
+    "rect": lambda pdf, context, state, x, y, w, h: pdf.rect(x, y, w, h),
+    "auto_page_break": lambda pdf, context, state, margin: pdf.set_auto_page_break(auto=True, margin=margin),
+    "ln": lambda pdf, context, state, h=None: pdf.ln(h),
+    "image": _op_image,
+    "cell": _op_cell,
+    "multi_cell": _op_multi_cell,
+}
+
+
+CERTIFICATE = Template("L", [
+    ("line_width", 1),
+    ("rect", 5, 5, 287, 200),
+    ("image", "{logo}", 10, 10, 30),
+    ("font", "B", 36),
+    ("color", 0, 51, 102),
+    ("cell", 0, 60, "Certificate of Completion", True, "C"),
+    ("font", "", 20),
+    ("color", 0, 0, 0),
+    ("ln", 10),
+    ("multi_cell", 0, 10, "This is to certify that {name}", "C"),
+    ("ln", 5),
+    ("multi_cell", 0, 10, "has successfully completed the course at FICSE.", "C"),
+    ("ln", 20),
+    ("font", "I", 14),
+    ("cell", 0, 10, "Date: {issued_on}", True, "C"),
+    ("ln", 15),
+    ("font", "", 12),
+    ("cell", 0, 10, "_____________________", True, "R"),
+    ("cell", 0, 5, "Director / Principal", True, "R"),
+])
+
+ADMISSION_FORM = Template("P", [
+    ("auto_page_break", 15),
+    ("font", "B", 16),
+    ("cell", 0, 10, "Fayaz Institute", True, "C"),
+    ("font", "", 12),
+    ("cell", 0, 6, "Of Computer Science & Education Kandiaro", True, "C"),
+    ("ln", 4),
+    ("font", "B", 14),
+    ("cell", 0, 8, "Admission Form 2025", True, "C"),
+    ("ln", 5),
+    ("font", "B", 11),
+    ("cell", 0, 8, "Registration No: {admission_no}", True),
+    ("image", "{photo_path}", 160, 35, 35),
+    ("font", "", 11),
+    ("ln", 10),
+    ("cell", 0, 8, "Full Name: {full_name}", True),
+    ("cell", 0, 8, "Father Name: {father_name}", True),
+    ("cell", 0, 8, "Date of Birth: {date_of_birth}", True),
+    ("cell", 0, 8, "Gender: {gender}", True),
+    ("cell", 0, 8, "Religion: {religion}", True),
+    ("cell", 0, 8, "Caste: {caste}", True),
+    ("cell", 0, 8, "Nationality: {nationality}", True),
+    ("cell", 0, 8, "Qualification: {qualification}", True),
+    ("cell", 0, 8, "Contact No: {contact_no}", True),
+    ("cell", 0, 8, "WhatsApp No: {whatsapp_no}", True),
+    ("cell", 0, 8, "Email: {email}", True),
+    ("multi_cell", 0, 8, "Present Address: {present_address}"),
+    ("ln", 5),
+    ("font", "B", 12),
+    ("cell", 0, 8, "Selected Courses:", True),
+    ("font", "", 11),
+    ("each", "courses", [
+        ("cell", 0, 7, "- {item}", True),
+    ]),
+    ("ln", 10),
+    ("cell", 0, 8, "Signature of Student: ______________________", True),
+])
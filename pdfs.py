@@ -0,0 +1,128 @@
+import collections
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+import media
+import pdf_templates
+
+# ----------------- Configuration -----------------
+# Bump when a layout changes so cached PDFs from the old layout are not served.
+TEMPLATE_VERSION = 2
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+LOGO_PATH = "logo.png"
+
+ADMISSION_FIELDS = (
+    "admission_no", "full_name", "father_name", "date_of_birth", "gender", "religion", "caste",
+    "nationality", "qualification", "contact_no", "whatsapp_no", "email", "present_address", "courses",
+)
+
+
+def student_name(student: dict) -> str:
+    return student.get("full_name") or student.get("name") or "Unknown"
+
+def _context(student: dict, fields) -> dict:
+    return {f: "" if student.get(f) is None else student.get(f) for f in fields}
+
+
+# ----------------- Layouts -----------------
+# The layouts themselves live in pdf_templates as compiled templates.
+
+def render_certificate(student: dict, issued_on: str) -> bytes:
+    return pdf_templates.CERTIFICATE.render(
+        {"name": student_name(student), "issued_on": issued_on, "logo": LOGO_PATH}
+    )
+
+def render_admission_form(student: dict) -> bytes:
+    context = _context(student, ADMISSION_FIELDS + ("photo_path",))
+    context["courses"] = student.get("courses") or []
+    return pdf_templates.ADMISSION_FORM.render(context)
+
+
+# ----------------- Cache -----------------
+
+class PdfCache:
+    # LRU over rendered PDFs, bounded by total bytes rather than entry count.
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+cache = PdfCache(CACHE_MAX_BYTES)
+
+
+def _photo_fingerprint(student: dict) -> str:
+    if student.get("photo_blob"):
+        return student["photo_blob"]
+    path = student.get("photo_path")
+    if path and os.path.exists(path):
+        return media.content_hash(path)
+    return ""
+
+def _cache_key(kind: str, fields: dict, photo: str = "") -> str:
+    payload = json.dumps([kind, TEMPLATE_VERSION, fields, photo], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _cached(key: str, render) -> bytes:
+    data = cache.get(key)
+    if data is None:
+        data = render()
+        cache.put(key, data)
+    return data
+
+def admission_form_pdf(student: dict) -> bytes:
+    fields = {f: student.get(f) for f in ADMISSION_FIELDS}
+    key = _cache_key("admission", fields, _photo_fingerprint(student))
+    return _cached(key, lambda: render_admission_form(student))
+
+def certificate_pdf(student: dict, issued_on: str = None) -> bytes:
+    issued_on = issued_on or datetime.datetime.now().strftime('%d-%m-%Y')
+    logo = media.content_hash(LOGO_PATH) if os.path.exists(LOGO_PATH) else ""
+    key = _cache_key("certificate", {"name": student_name(student), "issued_on": issued_on}, logo)
+    return _cached(key, lambda: render_certificate(student, issued_on))
@@ -0,0 +1,193 @@
+import argparse
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+import datastore
+
+# ----------------- Published results -----------------
+# "Publish results" compiles every student's admission number, display name,
+# marks and pass/fail status into one immutable snapshot file that the
+# Result page reads through mmap:
+#
+#   header   magic, bucket count, record count, students version, published at
+#   buckets  (offset, count) per hash bucket, crc32(admission_no) % buckets
+#   records  per bucket: status, key length, name length, marks, key, name
+#
+# A lookup reads the header, one bucket entry and one bucket of about
+# BUCKET_TARGET records, i.e. a few pages however many students there are.
+# Publishing writes a new file and renames it over the old one; readers
+# notice the new inode and remap, while lookups already running finish on
+# the old mapping. lookup() answers from the snapshot only while no student
+# was added or changed since it was published, and from the record otherwise.
+
+SNAPSHOT_FILE = "results.snap"
+BUCKET_TARGET = 8
+PASS_MARKS = 50
+
+MAGIC = b"FRS1"
+HEADER = struct.Struct("<4sIIQd")
+BUCKET = struct.Struct("<QI")
+RECORD = struct.Struct("<BHHd")
+
+NO_MARKS, PASSED, FAILED = 0, 1, 2
+STATUS_LABELS = {PASSED: "Passed", FAILED: "Failed"}
+
+
+def parse_marks(value):
+    # The one reading of stored marks, which may be ints, floats or (in old
+    # records) strings; None when a student has none, or when the value is
+    # not a mark at all (a bool, "nan", "inf", anything outside 0-100).
+    # Every module that compares marks goes through it.
+    if isinstance(value, bool):
+        return None
+    try:
+        marks = float(value)
+    except (TypeError, ValueError):
+        return None
+    return marks if math.isfinite(marks) and 0 <= marks <= 100 else None
+
+def grade(marks: float) -> tuple:
+    # The one pass/fail decision and display form for parsed marks:
+    # (marks as shown, an int when whole; PASSED or FAILED).
+    return int(marks) if marks.is_integer() else marks, PASSED if marks >= PASS_MARKS else FAILED
+
+def _result(adm: str, name: str, marks):
+    marks = parse_marks(marks)
+    if marks is None:
+        return {"admission_no": adm, "name": name, "marks": None, "status": None}
+    shown, status = grade(marks)
+    return {"admission_no": adm, "name": name, "marks": shown, "status": STATUS_LABELS[status]}
+
+def result_of(adm: str, student: dict):
+    # The same result shape from a live record, for before anything is published.
+    name = student.get("full_name") or student.get("name") or "Unknown"
+    return _result(adm, name, student.get("scholarship_marks"))
+
+
+# ----------------- Publishing -----------------
+
+def publish(db_path: str = None, path: str = None) -> dict:
+    path = path or SNAPSHOT_FILE
+    conn = datastore.get_connection(db_path)
+    # Read the rows and the version in one transaction so they agree.
+    conn.execute("BEGIN")
+    try:
+        version = datastore.collection_version("students", db_path)
+        rows = conn.execute(
+            "SELECT key, COALESCE(json_extract(data, '$.full_name'), json_extract(data, '$.name'), 'Unknown'), "
+            "json_extract(data, '$.scholarship_marks') FROM records WHERE collection = 'students'"
+        ).fetchall()
+    finally:
+        conn.execute("COMMIT")
+
+    bucket_count = 1
+    while bucket_count * BUCKET_TARGET < len(rows):
+        bucket_count *= 2
+    buckets = [[] for _ in range(bucket_count)]
+    for adm, name, marks in rows:
+        key = adm.encode("utf-8")
+        marks = parse_marks(marks)
+        status = NO_MARKS if marks is None else grade(marks)[1]
+        marks = 0.0 if marks is None else marks
+        buckets[zlib.crc32(key) % bucket_count].append((key, str(name).encode("utf-8"), status, marks))
+
+    table, chunks = [], []
+    offset = HEADER.size + BUCKET.size * bucket_count
+    for bucket in buckets:
+        bucket.sort()
+        data = b"".join(
+            RECORD.pack(status, len(key), len(name), marks) + key + name
+            for key, name, status, marks in bucket
+        )
+        table.append(BUCKET.pack(offset, len(bucket)))
+        chunks.append(data)
+        offset += len(data)
+
+    # A temp file of its own, so two publishes at once cannot write into one.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, bucket_count, len(rows), version, time.time()))
+            f.write(b"".join(table))
+            for data in chunks:
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return {"records": len(rows), "buckets": bucket_count, "bytes": offset, "version": version}
+
+
+# ----------------- Reading -----------------
+
+class Snapshot:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.stamp = _stamp(os.fstat(f.fileno()))
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bucket_count, self.records, self.version, self.published_at = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a results snapshot")
+
+    def lookup(self, adm: str):
+        # None if the admission number is not in the snapshot.
+        key = adm.encode("utf-8")
+        offset, count = BUCKET.unpack_from(
+            self.map, HEADER.size + BUCKET.size * (zlib.crc32(key) % self.bucket_count)
+        )
+        for _ in range(count):
+            status, key_len, name_len, marks = RECORD.unpack_from(self.map, offset)
+            offset += RECORD.size
+            if key_len == len(key) and self.map[offset:offset + key_len] == key:
+                name = self.map[offset + key_len:offset + key_len + name_len].decode("utf-8")
+                return _result(adm, name, None if status == NO_MARKS else marks)
+            offset += key_len + name_len
+        return None
+
+def _stamp(st):
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+_snapshots = {}
+
+def current(path: str = None):
+    # The published snapshot, or None if results were never published.
+    # Costs one stat() per call; the file is only remapped after a publish.
+    path = path or SNAPSHOT_FILE
+    try:
+        stamp = _stamp(os.stat(path))
+    except FileNotFoundError:
+        return None
+    snapshot = _snapshots.get(path)
+    if snapshot is None or snapshot.stamp != stamp:
+        snapshot = _snapshots[path] = Snapshot(path)
+    return snapshot
+
+def lookup(adm: str, db_path: str = None, path: str = None):
+    # The student's result, or None for an unknown admission number.
+    snapshot = current(path)
+    if snapshot is not None and snapshot.version == datastore.collection_version("students", db_path):
+        return snapshot.lookup(adm)
+    student = datastore.get_record("students", adm, db_path)
+    return result_of(adm, student) if student else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish or query the results snapshot")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("publish")
+    lookup = sub.add_parser("lookup")
+    lookup.add_argument("admission_no")
+    args = parser.parse_args()
+    if args.command == "publish":
+        info = publish()
+        print(f"Published {info['records']} results ({info['bytes']} bytes, {info['buckets']} buckets)")
+    else:
+        print(lookup(args.admission_no) or "Admission Number not found.")
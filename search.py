@@ -0,0 +1,247 @@
+import collections
+import contextlib
+import json
+import threading
+
+import datastore
+
+# ----------------- Student search index -----------------
+# Two tables, both maintained by a write hook on the students collection:
+#   search_terms  every word (and the whole value) of each searchable field,
+#                 so prefix matches are a B-tree range scan;
+#   search_grams  front-padded trigrams ("  al", " al", "ali") of each word,
+#                 so misspelt queries still find records by gram overlap.
+# search_df keeps per-gram document counts so a fuzzy query only aggregates
+# its rarest grams instead of every posting of "  a".
+
+SEARCH_FIELDS = ("full_name", "father_name", "cnic", "contact_no", "whatsapp_no", "admission_no")
+NAME_FIELDS = ("full_name", "father_name")
+MIN_SCORE = 0.3
+POSTINGS_BUDGET = 20000
+INDEX_VERSION = "3"
+
+_local = threading.local()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_terms (
+    field TEXT NOT NULL,
+    term TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (field, term, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS search_grams (
+    gram TEXT NOT NULL,
+    field TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (gram, field, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS search_df (
+    gram TEXT NOT NULL,
+    field TEXT NOT NULL,
+    df INTEGER NOT NULL,
+    PRIMARY KEY (gram, field)
+) WITHOUT ROWID;
+"""
+
+
+def normalize(value) -> str:
+    words = []
+    for word in str(value or "").casefold().split():
+        word = "".join(ch for ch in word if ch.isalnum())
+        if word:
+            words.append(word)
+    return " ".join(words)
+
+def trigrams(text: str, query: bool = False) -> set:
+    grams = set()
+    for word in text.split():
+        # Records are padded on both sides; queries only at the front so an
+        # unfinished word still matches as a prefix.
+        padded = "  " + word + ("" if query else " ")
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+def _record_entries(record):
+    terms, grams = set(), set()
+    if not record:
+        return terms, grams
+    for field in SEARCH_FIELDS:
+        text = normalize(record.get(field))
+        if not text:
+            continue
+        terms.add((field, text))
+        terms.update((field, word) for word in text.split())
+        grams.update((gram, field) for gram in trigrams(text))
+    return terms, grams
+
+def _index_student(conn, collection, key, old, new):
+    old_terms, old_grams = _record_entries(old)
+    new_terms, new_grams = _record_entries(new)
+    pending = getattr(_local, "pending", None)
+    if pending is None:
+        pending = _new_changes()
+    elif key in pending["keys"]:
+        # Changes to the same record must land in order.
+        _apply(conn, pending)
+        _local.pending = pending = _new_changes()
+    pending["keys"].add(key)
+    pending["terms_removed"] += [(field, term, key) for field, term in old_terms - new_terms]
+    pending["terms_added"] += [(field, term, key) for field, term in new_terms - old_terms]
+    for gram, field in old_grams - new_grams:
+        pending["grams_removed"].append((gram, field, key))
+        pending["df"][(gram, field)] -= 1
+    for gram, field in new_grams - old_grams:
+        pending["grams_added"].append((gram, field, key))
+        pending["df"][(gram, field)] += 1
+    if getattr(_local, "pending", None) is None:
+        _apply(conn, pending)
+
+def _new_changes() -> dict:
+    return {
+        "keys": set(), "terms_removed": [], "terms_added": [],
+        "grams_removed": [], "grams_added": [], "df": collections.Counter(),
+    }
+
+def _apply(conn, changes: dict):
+    # Rows go in primary-key order, which keeps B-tree page writes local.
+    conn.executemany(
+        "DELETE FROM search_terms WHERE field = ? AND term = ? AND key = ?", sorted(changes["terms_removed"])
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO search_terms (field, term, key) VALUES (?, ?, ?)", sorted(changes["terms_added"])
+    )
+    conn.executemany(
+        "DELETE FROM search_grams WHERE gram = ? AND field = ? AND key = ?", sorted(changes["grams_removed"])
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO search_grams (gram, field, key) VALUES (?, ?, ?)", sorted(changes["grams_added"])
+    )
+    conn.executemany(
+        "INSERT INTO search_df (gram, field, df) VALUES (?, ?, ?) "
+        "ON CONFLICT (gram, field) DO UPDATE SET df = df + excluded.df",
+        sorted((gram, field, delta) for (gram, field), delta in changes["df"].items() if delta),
+    )
+    # Grams no record uses any more would otherwise look like the rarest ones.
+    conn.executemany(
+        "DELETE FROM search_df WHERE gram = ? AND field = ? AND df <= 0",
+        sorted((gram, field) for (gram, field), delta in changes["df"].items() if delta < 0),
+    )
+
+@contextlib.contextmanager
+def deferred_index(conn):
+    # For bulk writes inside one transaction: index changes are collected and
+    # applied together on exit, with a single df update per distinct gram.
+    if getattr(_local, "pending", None) is not None:
+        yield
+        return
+    _local.pending = _new_changes()
+    try:
+        yield
+        _apply(conn, _local.pending)
+    finally:
+        _local.pending = None
+
+def rebuild_index(db_path: str = None):
+    with datastore.transaction(db_path) as conn:
+        conn.execute("DELETE FROM search_terms")
+        conn.execute("DELETE FROM search_grams")
+        conn.execute("DELETE FROM search_df")
+        rows = conn.execute(
+            "SELECT key, data FROM records WHERE collection = 'students'"
+        ).fetchall()
+        for key, raw in rows:
+            _index_student(conn, "students", key, None, json.loads(raw))
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('search_built', ?)", (INDEX_VERSION,))
+
+def _ensure_built(db_path: str = None):
+    conn = datastore.get_connection(db_path)
+    row = conn.execute("SELECT value FROM meta WHERE name = 'search_built'").fetchone()
+    if not row or row[0] != INDEX_VERSION:
+        rebuild_index(db_path)
+
+
+# ----------------- Queries -----------------
+
+def _prefix_matches(conn, text: str, fields, limit: int) -> list:
+    keys = []
+    for field in fields:
+        rows = conn.execute(
+            "SELECT DISTINCT key FROM search_terms WHERE field = ? AND term >= ? AND term < ? LIMIT ?",
+            (field, text, text + "\U0010ffff", limit),
+        )
+        for (key,) in rows:
+            if key not in keys:
+                keys.append(key)
+        if len(keys) >= limit:
+            break
+    return keys[:limit]
+
+def _fuzzy_candidates(conn, grams: set, fields, limit: int) -> list:
+    gram_marks = ",".join("?" * len(grams))
+    field_marks = ",".join("?" * len(fields))
+    df = {}
+    for gram, count in conn.execute(
+        f"SELECT gram, SUM(df) FROM search_df WHERE gram IN ({gram_marks}) AND field IN ({field_marks}) "
+        f"GROUP BY gram",
+        (*grams, *fields),
+    ):
+        df[gram] = count
+    # Rarest grams first; stop once the postings budget is used up, but always
+    # keep enough grams that a record could still reach MIN_SCORE.
+    needed = max(1, int(len(grams) * MIN_SCORE + 0.999))
+    chosen, postings = [], 0
+    for gram in sorted(df, key=df.get):
+        if len(chosen) >= needed and postings + df[gram] > POSTINGS_BUDGET:
+            break
+        chosen.append(gram)
+        postings += df[gram]
+    if not chosen:
+        return []
+    gram_marks = ",".join("?" * len(chosen))
+    rows = conn.execute(
+        f"SELECT key FROM search_grams WHERE gram IN ({gram_marks}) AND field IN ({field_marks}) "
+        f"GROUP BY key ORDER BY COUNT(DISTINCT gram) DESC LIMIT ?",
+        (*chosen, *fields, limit),
+    )
+    return [key for (key,) in rows]
+
+def search_students(query: str, fields=SEARCH_FIELDS, limit: int = 20, db_path: str = None) -> list:
+    # Up to `limit` (admission_no, score) pairs, best match first. A full
+    # prefix match scores 2.0; otherwise score is the share of query grams
+    # found in the record, plus 0.5 when the query appears inside a value.
+    text = normalize(query)
+    grams = trigrams(text, query=True)
+    if not grams:
+        return []
+    _ensure_built(db_path)
+    conn = datastore.get_connection(db_path)
+
+    prefixed = _prefix_matches(conn, text, fields, limit)
+    results = [(key, 2.0) for key in prefixed]
+    if len(results) >= limit:
+        return results
+
+    seen = set(prefixed)
+    for key in _fuzzy_candidates(conn, grams, fields, limit * 10):
+        if key in seen:
+            continue
+        record = datastore.get_record("students", key, db_path) or {}
+        values = [normalize(record.get(field)) for field in fields]
+        record_grams = set()
+        for value in values:
+            record_grams |= trigrams(value)
+        score = len(grams & record_grams) / len(grams)
+        if score < MIN_SCORE:
+            continue
+        if any(text in value for value in values):
+            score += 0.5
+        results.append((key, round(score, 3)))
+    results.sort(key=lambda item: -item[1])
+    return results[:limit]
+
+
+datastore.register_schema(SCHEMA)
+datastore.register_hook("students", _index_student)
@@ -0,0 +1,131 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+
+import datastore
+
+# ----------------- Signed session tokens -----------------
+# Logins used to live only in st.session_state, which belongs to one server
+# process. With several app processes behind a proxy a reconnect can land on
+# another one, so a login is also handed to the browser as a signed token
+# (kept in the page URL) that any process can check:
+#
+#   <base64url JSON {"role", "sub", "exp"}>.<base64url HMAC-SHA256>
+#
+# The key comes from FICSE_SESSION_SECRET, or is generated once and kept in
+# the shared database, so every process on the same data store agrees on it.
+# The signature also covers the subject's credential version (see
+# register_version) and revocation epoch, a counter kept in the data store
+# that logging out or changing the password moves on. Either revokes every
+# token issued before, including ones copied out of the URL or history.
+
+SECRET_ENV = "FICSE_SESSION_SECRET"
+TTL = {"student": 12 * 3600, "admin": 2 * 3600, "file": 15 * 60}  # seconds; "file" for download links
+
+_secret = None
+_versions = {}  # role -> version(subject) -> str, or None when the subject no longer exists
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_epochs (
+    role TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    epoch INTEGER NOT NULL,
+    PRIMARY KEY (role, subject)
+);
+"""
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def secret(db_path: str = None) -> bytes:
+    global _secret
+    if _secret is None:
+        value = os.environ.get(SECRET_ENV)
+        if not value:
+            with datastore.transaction(db_path) as conn:
+                conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('session_secret', ?)",
+                             (secrets.token_hex(32),))
+                value = conn.execute("SELECT value FROM meta WHERE name = 'session_secret'").fetchone()[0]
+        _secret = value.encode("utf-8")
+    return _secret
+
+def register_version(role: str, version):
+    # version(subject) returns a string that changes whenever the subject's
+    # credentials do (a password hash will do), or None for an unknown one.
+    _versions[role] = version
+
+def _version(role: str, subject: str):
+    version = _versions.get(role)
+    return version(subject) if version else ""
+
+def epoch(role: str, subject: str, db_path: str = None) -> int:
+    row = datastore.get_connection(db_path).execute(
+        "SELECT epoch FROM session_epochs WHERE role = ? AND subject = ?", (role, subject)
+    ).fetchone()
+    return row[0] if row else 0
+
+def _bump(conn, role: str, subject: str):
+    conn.execute(
+        "INSERT INTO session_epochs (role, subject, epoch) VALUES (?, ?, 1) "
+        "ON CONFLICT (role, subject) DO UPDATE SET epoch = epoch + 1",
+        (role, subject),
+    )
+
+def revoke(role: str, subject: str, db_path: str = None):
+    # Every token issued to the subject so far stops verifying, on every process.
+    with datastore.transaction(db_path) as conn:
+        _bump(conn, role, subject)
+
+def _revoke_student_tokens(conn, collection, key, old, new):
+    # A password change or a deleted account logs the student out everywhere.
+    if old and (new is None or new.get("password") != old.get("password")):
+        _bump(conn, "student", key)
+
+def _sign(payload: str, version: str, epoch: int) -> str:
+    message = f"{payload}.{version}.{epoch}".encode("utf-8")
+    return _b64(hmac.new(secret(), message, hashlib.sha256).digest())
+
+def issue(role: str, subject: str, ttl: int = None) -> str:
+    if role not in TTL:
+        raise ValueError(f"Unknown role: {role}")
+    version = _version(role, subject)
+    if version is None:
+        raise ValueError(f"Unknown {role}: {subject}")
+    claims = {"role": role, "sub": subject, "exp": int(time.time()) + (ttl or TTL[role])}
+    payload = _b64(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload, version, epoch(role, subject))}"
+
+def verify(token: str, role: str = None):
+    # The claims of a genuine, unexpired token (of the given role) whose
+    # subject's credentials have not changed since, else None.
+    payload, _, signature = (token or "").partition(".")
+    if not signature:
+        return None
+    try:
+        claims = json.loads(_unb64(payload))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict) or claims.get("role") not in TTL or not isinstance(claims.get("sub"), str):
+        return None
+    if role and claims["role"] != role:
+        return None
+    version = _version(claims["role"], claims.get("sub"))
+    if version is None:
+        return None
+    if not hmac.compare_digest(signature, _sign(payload, version, epoch(claims["role"], claims["sub"]))):
+        return None
+    if claims.get("exp", 0) < time.time():
+        return None
+    return claims
+
+
+datastore.register_schema(SCHEMA)
+datastore.register_hook("users", _revoke_student_tokens)
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datacache  # noqa: E402
+import datastore  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    # Every test runs in an empty data directory with fresh connections;
+    # cached frames keyed by collection version would otherwise leak across.
+    monkeypatch.chdir(tmp_path)
+    datacache.invalidate()
+    yield tmp_path
+    for conn in getattr(datastore._local, "conns", {}).values():
+        conn.close()
+    datastore._local.conns = {}
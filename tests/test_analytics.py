@@ -0,0 +1,67 @@
+import analytics
+import datastore
+
+
+def student(course="MS Office", status="Pending", gender="Female", marks=None, day="2026-03-01"):
+    record = {"courses": [course], "status": status, "gender": gender, "applied_at": f"{day} 10:00:00"}
+    if marks is not None:
+        record["scholarship_marks"] = marks
+    return record
+
+
+def counts() -> dict:
+    rows = datastore.get_connection().execute("SELECT metric, a, b, count FROM analytics_counts")
+    return {(m, a, b): c for m, a, b, c in rows}
+
+
+def test_counters_follow_every_write():
+    analytics.rebuild()
+    datastore.put_records("students", {
+        "A1": student(marks=49.5),
+        "A2": student(course="Tuition Class: 8th", gender="Male", marks=50),
+        "A3": student(day="2026-03-02"),
+    })
+    datastore.update_record("students", "A3", lambda s: dict(s, status="Approved"))
+    datastore.delete_record("students", "A1")
+    assert counts() == {
+        ("students", "", ""): 2,
+        ("admissions", "Tuition", "2026-03-01"): 1,
+        ("admissions", "MS Office", "2026-03-02"): 1,
+        ("status", "Pending", ""): 1,
+        ("status", "Approved", ""): 1,
+        ("gender", "Male", ""): 1,
+        ("gender", "Female", ""): 1,
+        ("marks", "050", ""): 1,
+    }
+    assert analytics.verify() == []
+    assert analytics.admissions("2026-03-02", "2026-03-31") == [("2026-03-02", "MS Office", 1)]
+
+
+def test_summary_reads_the_counters():
+    datastore.put_records("students", {
+        "A1": student(marks=49.5),
+        "A2": student(marks=50),
+        "A3": student(marks=100),
+        "A4": student(),
+    })
+    summary = analytics.summary()
+    assert summary["students"] == 4
+    assert summary["with_marks"] == 3
+    assert summary["pass_rate"] == 2 / 3
+    assert summary["marks"] == {"40-49": 1, "50-59": 1, "100": 1}
+
+
+def test_verify_finds_drift_and_rebuild_repairs_it():
+    datastore.put_records("students", {"A1": student(), "A2": student(status="Approved")})
+    analytics.rebuild()
+    conn = datastore.get_connection()
+    # A write made before the hook existed, or straight to the table.
+    conn.execute("UPDATE analytics_counts SET count = 5 WHERE metric = 'students'")
+    conn.execute("DELETE FROM analytics_counts WHERE metric = 'status' AND a = 'Approved'")
+    assert analytics.verify() == [
+        ("status", "Approved", "", 0, 1),
+        ("students", "", "", 5, 2),
+    ]
+    assert analytics.rebuild() == 2
+    assert analytics.verify() == []
+    assert analytics.summary()["status"] == {"Approved": 1, "Pending": 1}
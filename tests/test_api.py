@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+import api
+import datastore
+import exporter
+import results
+import sessions
+
+
+def get(app, path: str):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app({"type": "http", "method": "GET", "path": path}, receive, send))
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return sent[0]["status"], body
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(api, "RELOAD_INTERVAL", 0)
+    datastore.put_records("students", {
+        "A1": {"full_name": "Legacy", "scholarship_marks": "72.5"},
+        "A2": {"full_name": "Boundary", "scholarship_marks": results.PASS_MARKS},
+        "A3": {"full_name": "Below", "scholarship_marks": results.PASS_MARKS - 1, "course_completed": True},
+        "A4": {"full_name": "No Marks"},
+    })
+    return api.make_app()
+
+
+def test_parse_marks():
+    assert results.parse_marks("72.5") == 72.5
+    assert results.parse_marks(80) == 80.0
+    assert results.parse_marks(None) is None
+    assert results.parse_marks("absent") is None
+
+
+def test_result_lookups(app):
+    status, body = get(app, "/results/A1")
+    assert status == 200
+    assert json.loads(body) == {"admission_no": "A1", "name": "Legacy", "marks": 72.5, "status": "Passed"}
+    assert json.loads(get(app, "/results/A2")[1])["status"] == "Passed"
+    assert json.loads(get(app, "/results/A3")[1])["status"] == "Failed"
+    assert get(app, "/results/A4") == (404, api.NO_MARKS)
+    assert get(app, "/results/missing") == (404, api.NOT_FOUND)
+
+
+def test_index_follows_writes(app):
+    get(app, "/results/A4")
+    datastore.update_record("students", "A4", lambda s: dict(s, scholarship_marks=90))
+    status, body = get(app, "/results/A4")
+    assert status == 200 and json.loads(body)["marks"] == 90
+
+
+def test_certificates_only_for_completed_courses(app):
+    assert get(app, "/certificates/A1") == (404, api.NOT_COMPLETED)
+    status, body = get(app, "/certificates/A3")
+    assert status == 200 and body.startswith(b"%PDF")
+
+
+def test_file_downloads_stream_from_disk(app, monkeypatch):
+    monkeypatch.setattr(api, "FILE_CHUNK", 1000)
+    os.makedirs(exporter.EXPORT_DIR)
+    path = os.path.join(exporter.EXPORT_DIR, "students.csv")
+    with open(path, "wb") as f:
+        f.write(b"x" * 2500)
+    url = api.download_url(path)
+    assert url.startswith(api.DEFAULT_URL + "/files/")
+    sent = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app({"type": "http", "method": "GET", "path": url[len(api.DEFAULT_URL):]}, receive, send))
+    assert sent[0]["status"] == 200 and (b"content-length", b"2500") in sent[0]["headers"]
+    assert [len(m["body"]) for m in sent[1:]] == [1000, 1000, 500, 0]
+
+
+def test_file_downloads_need_a_valid_link(app):
+    with open("ficse.txt", "w") as f:
+        f.write("outside the download directories")
+    datastore.put_record("users", "ali", {"password": "h1"})
+    student = sessions.issue("student", "ali")
+    for token in (sessions.issue("file", "ficse.txt"), sessions.issue("file", "exports/../ficse.txt"),
+                  sessions.issue("file", "exports/missing.zip"), sessions.issue("file", "exports/x", ttl=-1),
+                  student, "junk"):
+        assert get(app, f"/files/{token}")[0] == 404
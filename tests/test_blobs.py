@@ -0,0 +1,53 @@
+import io
+import os
+
+import pytest
+
+import blobs
+import datastore
+
+
+def store(data: bytes) -> dict:
+    return blobs.store_stream(io.BytesIO(data), "photo.jpg")
+
+
+def test_last_reference_removes_the_file_after_commit():
+    blob = store(b"photo bytes")
+    freed = []
+    blobs.on_free(freed.append)
+    try:
+        datastore.put_record("students", "A1", {"photo_blob": blob["hash"]})
+        datastore.put_record("students", "A1", {"photo_blob": None})
+        assert not os.path.exists(blob["path"])
+        assert freed == [blob["hash"]]
+    finally:
+        blobs._on_free.remove(freed.append)
+
+
+def test_rolled_back_delete_keeps_the_file():
+    blob = store(b"photo bytes")
+    datastore.put_record("students", "A1", {"photo_blob": blob["hash"]})
+    with pytest.raises(RuntimeError):
+        with datastore.transaction():
+            datastore.delete_record("students", "A1")
+            raise RuntimeError("abort")
+    assert os.path.exists(blob["path"])
+    assert blobs.usage() == {"blobs": 1, "bytes": len(b"photo bytes"), "references": 1}
+
+
+def test_file_stored_again_before_removal_survives():
+    blob = store(b"photo bytes")
+    datastore.put_record("students", "A1", {"photo_blob": blob["hash"]})
+    with datastore.transaction():
+        # Another upload of the same bytes lands between the commit and the
+        # deferred removal.
+        datastore.after_commit(lambda: store(b"photo bytes"))
+        datastore.delete_record("students", "A1")
+    assert os.path.exists(blob["path"])
+    assert blobs.usage()["blobs"] == 1
+
+
+def test_garbage_collection_of_unreferenced_uploads():
+    blob = store(b"abandoned form")
+    assert blobs.collect_garbage(min_age_hours=0) == 1
+    assert not os.path.exists(blob["path"])
@@ -0,0 +1,71 @@
+import threading
+
+import datacache
+import datastore
+from views import common
+
+
+def counting_loader(calls: list, value):
+    def load():
+        calls.append(value)
+        return value
+    return load
+
+
+def test_a_new_stamp_reloads_and_stats_count_it():
+    before = datacache.stats()
+    calls = []
+    assert datacache.get("k", 1, counting_loader(calls, "a")) == "a"
+    assert datacache.get("k", 1, counting_loader(calls, "b")) == "a"
+    assert datacache.get("k", 2, counting_loader(calls, "c")) == "c"
+    assert calls == ["a", "c"]
+    after = datacache.stats()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 2
+    assert after["entries"] == 1
+    assert 0 < after["hit_rate"] <= 1
+
+
+def test_invalidate_one_path_or_everything():
+    calls = []
+    datacache.get("a", 1, counting_loader(calls, "a"))
+    datacache.get("b", 1, counting_loader(calls, "b"))
+    datacache.invalidate("a")
+    datacache.get("a", 1, counting_loader(calls, "a"))
+    datacache.get("b", 1, counting_loader(calls, "b"))
+    assert calls == ["a", "b", "a"]
+    datacache.invalidate()
+    assert datacache.stats()["entries"] == 0
+
+
+def test_collection_reads_follow_the_version_stamp():
+    datastore.put_record("students", "A1", {"full_name": "Sara Khan"})
+    first = common.load_json("students.json")
+    assert common.load_json("students.json") is first
+    datastore.put_record("students", "A2", {"full_name": "Aisha Bano"})
+    assert set(common.load_json("students.json")) == {"A1", "A2"}
+
+
+def test_a_write_on_another_connection_is_seen():
+    # Another process or thread writes through its own connection; the
+    # version row it bumps is what this process checks on the next read.
+    datastore.put_record("students", "A1", {"full_name": "Sara Khan"})
+    assert set(common.load_json("students.json")) == {"A1"}
+    writer = threading.Thread(target=datastore.put_record, args=("students", "A2", {"full_name": "Aisha Bano"}))
+    writer.start()
+    writer.join()
+    assert set(common.load_json("students.json")) == {"A1", "A2"}
+
+
+def test_reads_inside_a_rolled_back_write_are_not_cached():
+    datastore.put_record("students", "A1", {"full_name": "Sara Khan"})
+    try:
+        with datastore.transaction():
+            datastore.put_record("students", "X1", {"full_name": "Never Saved"})
+            assert "X1" in common.load_json("students.json")
+            raise RuntimeError("rolled back")
+    except RuntimeError:
+        pass
+    # The next commit reaches the version the rolled-back write had.
+    datastore.put_record("students", "A2", {"full_name": "Aisha Bano"})
+    assert set(common.load_json("students.json")) == {"A1", "A2"}
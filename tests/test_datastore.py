@@ -0,0 +1,73 @@
+import os
+import threading
+
+import pytest
+
+import datastore
+
+
+def test_expected_rev_zero_refuses_to_overwrite():
+    datastore.put_record("users", "ali", {"cnic": "1"}, expected_rev=0)
+    with pytest.raises(datastore.ConflictError):
+        datastore.put_record("users", "ali", {"cnic": "2"}, expected_rev=0)
+    assert datastore.get_record("users", "ali") == {"cnic": "1"}
+
+
+def test_stale_rev_is_rejected():
+    datastore.put_record("users", "ali", {"n": 1})
+    _, rev = datastore.get_record_rev("users", "ali")
+    datastore.put_record("users", "ali", {"n": 2}, expected_rev=rev)
+    with pytest.raises(datastore.ConflictError):
+        datastore.put_record("users", "ali", {"n": 3}, expected_rev=rev)
+    assert datastore.get_record_rev("users", "ali") == ({"n": 2}, rev + 1)
+
+
+def test_update_record_reapplies_change_after_a_concurrent_write():
+    datastore.put_record("students", "A1", {"count": 0})
+    calls = []
+
+    def change(current):
+        calls.append(current["count"])
+        if len(calls) == 1:
+            # Another session writes between our read and our write.
+            datastore.put_record("students", "A1", {"count": 10})
+        return dict(current, count=current["count"] + 1)
+
+    assert datastore.update_record("students", "A1", change) == {"count": 11}
+    assert calls == [0, 10]
+
+
+def test_update_record_gives_up_and_reports_missing_records():
+    datastore.put_record("students", "A1", {"count": 0})
+
+    def always_conflicting(current):
+        datastore.put_record("students", "A1", dict(current, count=current["count"] + 1))
+        return current
+
+    with pytest.raises(datastore.ConflictError):
+        datastore.update_record("students", "A1", always_conflicting, retries=3)
+    with pytest.raises(KeyError):
+        datastore.update_record("students", "missing", lambda s: s)
+
+
+def test_concurrent_increments_are_not_lost():
+    datastore.put_record("students", "A1", {"count": 0})
+
+    def worker():
+        for _ in range(25):
+            datastore.update_record("students", "A1", lambda s: dict(s, count=s["count"] + 1), retries=100)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert datastore.get_record("students", "A1")["count"] == 100
+
+
+def test_use_data_dir_is_idempotent(data_dir, monkeypatch):
+    monkeypatch.setattr(datastore, "_data_dirs", {})
+    monkeypatch.setenv(datastore.DATA_DIR_ENV, "data")
+    target = datastore.use_data_dir()
+    assert target == os.path.realpath(data_dir / "data") == os.getcwd()
+    assert datastore.use_data_dir() == target == os.getcwd()  # not data/data
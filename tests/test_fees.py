@@ -0,0 +1,84 @@
+import datetime
+import sqlite3
+
+import pytest
+
+import datastore
+import fees
+
+DIT = fees.COURSES[0][0]
+TYPING = fees.COURSES[4][0]
+
+
+@pytest.fixture
+def students():
+    datastore.put_records("students", {
+        "FICSE-20250301-100": {"full_name": "Ali", "courses": [DIT, TYPING]},
+        "FICSE-20250301-101": {"full_name": "Sara", "courses": [DIT]},
+    })
+    return ["FICSE-20250301-100", "FICSE-20250301-101"]
+
+
+def post_some(students):
+    day1, day2 = datetime.date(2025, 3, 1), datetime.date(2025, 3, 2)
+    for adm in students:
+        fees.charge_standard_fees(adm)
+    fees.post(students[0], DIT, "payment", 5000, day=day1)
+    fees.post(students[0], TYPING, "waiver", 1000, day=day1)
+    fees.post(students[1], DIT, "payment", 15000, day=day2)
+    fees.post(students[0], DIT, "payment", 2500, day=day2)
+
+
+def test_aggregates_follow_postings(students):
+    post_some(students)
+    assert fees.student_balances(students[0]) == [
+        {"course": DIT, "charged": 15000, "paid": 7500, "waived": 0, "balance": 7500},
+        {"course": TYPING, "charged": 4000, "paid": 0, "waived": 1000, "balance": 3000},
+    ]
+    assert [(d["admission_no"], d["balance"]) for d in fees.defaulters()] == [
+        (students[0], 7500), (students[0], 3000)]
+    assert fees.daily_totals("2025-03-02", "2025-03-02") == [
+        {"day": "2025-03-02", "charged": 0, "paid": 17500, "waived": 0, "postings": 2}]
+    assert fees.verify() == []
+
+
+def test_charge_standard_fees_charges_once(students):
+    assert fees.charge_standard_fees(students[0]) == [DIT, TYPING]
+    assert fees.charge_standard_fees(students[0]) == []
+
+
+def test_invalid_postings_are_refused(students):
+    for kind, amount in (("refund", 100), ("payment", 0), ("payment", 10.5), ("payment", True)):
+        with pytest.raises(ValueError):
+            fees.post(students[0], DIT, kind, amount)
+    with pytest.raises(ValueError):
+        fees.post("FICSE-19990101-1", DIT, "payment", 100)
+    assert fees.student_ledger(students[0]) == [] and fees.verify() == []
+
+
+def test_ledger_is_append_only(students):
+    post_some(students)
+    conn = datastore.get_connection()
+    for sql in ("UPDATE fee_ledger SET amount = 1", "DELETE FROM fee_ledger"):
+        with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+            with datastore.transaction() as tx:
+                tx.execute(sql)
+    assert conn.execute("SELECT COUNT(*) FROM fee_ledger").fetchone()[0] == 7
+
+
+def test_verify_reports_drift_and_rebuild_repairs_it(students):
+    post_some(students)
+    expected = fees.student_balances(students[0])
+    with datastore.transaction() as conn:
+        conn.execute("UPDATE fee_balances SET balance = balance + 1 WHERE admission_no = ? AND course = ?",
+                     (students[0], DIT))
+        conn.execute("DELETE FROM fee_daily WHERE day = '2025-03-01'")
+        conn.execute("INSERT INTO fee_courses (course, paid) VALUES ('Ghost', 0)")  # all-zero row: harmless
+    problems = fees.verify()
+    assert [(table, key) for table, key, _, _ in problems] == [
+        ("fee_balances", (students[0], DIT)), ("fee_daily", ("2025-03-01",))]
+    assert problems[0][2][3] == 7501 and problems[0][3][3] == 7500
+    assert problems[1][2] is None
+    assert fees.rebuild() == 7
+    assert fees.verify() == []
+    assert fees.student_balances(students[0]) == expected
@@ -0,0 +1,44 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import datastore
+from views import forgot_password
+from views.common import make_hash
+
+
+def page():
+    from views import forgot_password
+    forgot_password.render()
+
+
+def reset(username, cnic, password="new-pass"):
+    at = AppTest.from_function(page).run()
+    for field, value in zip(at.text_input, (username, cnic, password, password)):
+        field.input(value)
+    return at.button[0].click().run()
+
+
+@pytest.mark.parametrize("stored, entered, match", [
+    ("42101-1234567-1", "4210112345671", True),
+    ("42101-1234567-1", "42101-1234567-2", False),
+    ("", "", False),
+    ("", "-", False),
+    (None, "", False),
+    ("n/a", "--", False),
+])
+def test_cnic_matches(stored, entered, match):
+    assert forgot_password.cnic_matches(stored, entered) is match
+
+
+@pytest.mark.parametrize("entered", ["", "-", "abc"])
+def test_account_without_cnic_cannot_be_reset(entered):
+    datastore.put_record("users", "ali", {"cnic": "", "password": make_hash("old")})
+    at = reset("ali", entered)
+    assert [e.value for e in at.error] == ["User not found or CNIC mismatch!"]
+    assert datastore.get_record("users", "ali")["password"] == make_hash("old")
+
+
+def test_matching_cnic_resets_the_password():
+    datastore.put_record("users", "ali", {"cnic": "42101-1234567-1", "password": make_hash("old")})
+    reset("ali", "4210112345671")
+    assert datastore.get_record("users", "ali")["password"] == make_hash("new-pass")
@@ -0,0 +1,52 @@
+import concurrent.futures
+import datetime
+
+import datastore
+import ids
+
+DAY = datetime.date(2025, 3, 1)
+
+
+def number(adm: str) -> int:
+    return int(adm.rsplit("-", 1)[1])
+
+
+def restart():
+    # Every connection closed, as when the server process is restarted.
+    for conn in getattr(datastore._local, "conns", {}).values():
+        conn.close()
+    datastore._local.conns = {}
+
+
+def test_numbers_are_unique_across_threads_and_restarts():
+    def allocate(_):
+        return [ids.next_admission_no(DAY) for _ in range(20)] + ids.admission_numbers(5, DAY)
+
+    with concurrent.futures.ThreadPoolExecutor(8) as pool:  # a connection per thread
+        batches = list(pool.map(allocate, range(8)))
+    issued = [adm for batch in batches for adm in batch]
+    for batch in batches:
+        assert [number(adm) for adm in batch] == sorted(number(adm) for adm in batch)
+    assert len(set(issued)) == len(issued) == 200
+    assert sorted(map(number, issued)) == list(range(ids.FIRST_NUMBER, ids.FIRST_NUMBER + 200))
+
+    restart()
+    assert number(ids.next_admission_no(DAY)) == ids.FIRST_NUMBER + 200
+
+
+def test_counters_start_above_numbers_already_in_use():
+    datastore.put_records("students", {"FICSE-20250301-457": {}, "FICSE-20250302-900": {}})
+    datastore.put_records("teachers", {"T120": {}, "T7": {}})
+    assert ids.next_admission_no(DAY) == "FICSE-20250301-458"
+    assert ids.next_admission_no(datetime.date(2025, 3, 3)) == "FICSE-20250303-100"
+    assert ids.teacher_ids(2) == ["T121", "T122"]
+
+
+def test_rolled_back_block_is_given_back():
+    try:
+        with datastore.transaction():
+            ids.admission_numbers(10, DAY)
+            raise RuntimeError("import failed")
+    except RuntimeError:
+        pass
+    assert ids.next_admission_no(DAY) == "FICSE-20250301-100"
@@ -0,0 +1,81 @@
+import csv
+import datetime
+import io
+
+import datastore
+import ids
+import importer
+
+HEADER = "Student Name,Father,Mobile,Course,Address,CNIC,DOB,Gender,Email\n"
+CLEAN = (
+    "Ali Khan,Akbar,03001234567,Diploma in Information Technology,Kandiaro,42101-1234567-1,01/02/2005,m,ali@example.com\n"
+    'Sara Bano,Bashir,0300-7654321,"typing (english, urdu, sindhi); Tuition 8th",Kandiaro,42101-7654321-2,2006-03-04,F,\n'
+)
+BAD = (
+    "No Father,,03001111111,Diploma in Information Technology,Kandiaro,,,,\n"
+    "Odd Course,Father,03002222222,Basket Weaving,Kandiaro,,,,\n"
+    "Bad Date,Father,03003333333,MS Office / Word / Excel / PowerPoint,Kandiaro,,31/02/2005,,\n"
+    "Dup CNIC,Father,03004444444,MS Office / Word / Excel / PowerPoint,Kandiaro,4210112345671,,,\n"
+)
+
+
+def sheet(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode("utf-8-sig"))
+
+
+def students() -> dict:
+    return datastore.load_collection("students")
+
+
+def test_clean_import_normalizes_and_numbers_rows():
+    result = importer.import_file(sheet(HEADER + CLEAN), "admissions.csv", "admissions", notify_students=False)
+    assert (result["rows"], result["imported"], result["errors"]) == (2, 2, [])
+    by_name = {s["full_name"]: s for s in students().values()}
+    ali, sara = by_name["Ali Khan"], by_name["Sara Bano"]
+    assert ali["courses"] == ["Diploma in Information Technology (12 Months)"]
+    assert sara["courses"] == ["Typing (English, Urdu, Sindhi) (02 Months)", "Tuition Class: 8th"]
+    assert (ali["contact_no"], sara["contact_no"]) == ("03001234567", "03007654321")
+    assert importer.normalize_phone(3001234567) == "03001234567"  # a spreadsheet number cell
+    assert (ali["cnic"], ali["date_of_birth"], ali["gender"]) == ("4210112345671", "2005-02-01", "Male")
+    assert ali["status"] == "Pending" and "email" not in sara
+    prefix = f"FICSE-{datetime.date.today():%Y%m%d}-"
+    assert sorted(students()) == [f"{prefix}100", f"{prefix}101"]
+    assert datastore.find_keys("students", "cnic", "42101-7654321-2") == [sara["admission_no"]]
+
+
+def test_dry_run_writes_nothing_and_uses_no_numbers():
+    result = importer.import_file(sheet(HEADER + CLEAN + BAD), "admissions.csv", "admissions", dry_run=True)
+    assert (result["rows"], result["imported"], result["dry_run"]) == (6, 2, True)
+    assert len(result["errors"]) == 4
+    assert students() == {}
+    assert ids.next_admission_no().endswith("-100")
+
+
+def test_rejected_rows_are_reported_and_the_rest_imported():
+    result = importer.import_file(sheet(HEADER + CLEAN + BAD), "admissions.csv", "admissions", batch_size=3,
+                                  notify_students=False)
+    assert (result["rows"], result["imported"]) == (6, 2)
+    errors = {e["row"]: e["error"] for e in result["errors"]}
+    assert errors == {
+        4: "missing father_name",
+        5: "unknown course 'Basket Weaving'",
+        6: "unreadable date '31/02/2005'",
+        7: "CNIC 4210112345671 is already registered",
+    }
+    report = list(csv.DictReader(io.StringIO(importer.error_report_csv(result["errors"]).decode("utf-8-sig"))))
+    assert [(int(r["row"]), r["error"]) for r in report] == sorted(errors.items())
+    assert len(students()) == 2
+
+
+def test_marks_import():
+    datastore.put_record("students", "A1", {"full_name": "Ali"})
+    text = "Adm No,Score\nA1,72\nA2,50\nA1,101\n,40\nA1,abc\n"
+    result = importer.import_file(sheet(text), "marks.csv", "marks")
+    assert result["imported"] == 1
+    assert [e["error"] for e in result["errors"]] == [
+        "admission number not found",
+        "marks 101 must be a whole number from 0 to 100",
+        "missing admission_no",
+        "marks 'abc' are not a number",
+    ]
+    assert datastore.get_record("students", "A1")["scholarship_marks"] == 72
@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+import datastore
+import jobs
+
+
+@pytest.fixture(autouse=True)
+def kinds(monkeypatch):
+    monkeypatch.setattr(jobs, "KINDS", {})
+    jobs.register("count", _count)
+    jobs.register("once", _count, resumable=False)
+    jobs.register("boom", _boom)
+    jobs.register("self_cancel", _self_cancel)
+
+
+def _count(params, ctx):
+    # Counts to params["to"], checkpointing each step, and records where it started.
+    start = (ctx.state or {}).get("next", 0)
+    for i in range(start, params["to"]):
+        ctx.progress(i, params["to"])
+        ctx.checkpoint({"next": i + 1})
+    return {"started_at": start}
+
+def _boom(params, ctx):
+    raise RuntimeError("broken")
+
+def _self_cancel(params, ctx):
+    jobs.cancel(ctx.job_id)
+    ctx.progress(1, 10)
+    return {"finished": True}
+
+
+def run_all():
+    jobs.Runner(threads=1, processes=1).run(until_idle=True)
+
+
+def crash(job_id, heartbeat_at=0.0):
+    # As if the runner holding the job died part-way through.
+    with datastore.transaction() as conn:
+        conn.execute("UPDATE jobs SET status = 'running', owner = 'elsewhere:1', heartbeat_at = ?, "
+                     "attempts = attempts + 1, state = ? WHERE id = ?", (heartbeat_at, '{"next": 3}', job_id))
+
+
+def test_jobs_run_to_their_final_status():
+    done, failed = jobs.submit("count", {"to": 5}), jobs.submit("boom")
+    cancelled, stopped = jobs.submit("count", {"to": 5}), jobs.submit("self_cancel")
+    assert jobs.cancel(cancelled)
+    run_all()
+    statuses = {job["id"]: (job["status"], job["result"], job["error"]) for job in jobs.list_jobs()}
+    assert statuses == {
+        done: ("done", {"started_at": 0}, None),
+        failed: ("failed", None, "RuntimeError: broken"),
+        cancelled: ("cancelled", None, None),
+        stopped: ("cancelled", None, None),
+    }
+    assert (jobs.get_job(done)["done"], jobs.get_job(done)["total"]) == (5, 5)
+    assert not jobs.cancel(done)
+    with pytest.raises(ValueError):
+        jobs.submit("unknown")
+
+
+def test_abandoned_job_resumes_from_its_checkpoint():
+    job_id = jobs.submit("count", {"to": 5})
+    crash(job_id)
+    run_all()
+    job = jobs.get_job(job_id)
+    assert (job["status"], job["result"], job["attempts"]) == ("done", {"started_at": 3}, 2)
+
+
+def test_recent_heartbeat_is_left_alone():
+    job_id = jobs.submit("count", {"to": 5})
+    crash(job_id, heartbeat_at=time.time())
+    with datastore.transaction() as conn:
+        assert jobs.recover_abandoned(conn, time.time()) == 0
+    assert jobs.get_job(job_id)["status"] == "running"
+
+
+def test_abandoned_job_fails_when_it_cannot_resume():
+    once, tired = jobs.submit("once", {"to": 5}), jobs.submit("count", {"to": 5})
+    crash(once)
+    for _ in range(jobs.MAX_ATTEMPTS):
+        crash(tired)
+    with datastore.transaction() as conn:
+        assert jobs.recover_abandoned(conn, time.time()) == 2
+    assert jobs.get_job(once)["error"] == "Job interrupted and cannot be resumed"
+    assert jobs.get_job(tired)["error"] == "Job interrupted too many times"
+
+
+def test_delete_job_removes_its_file(data_dir):
+    report = data_dir / "report.csv"
+    report.write_text("x")
+    jobs.register("report", lambda params, ctx: {"file": str(report)})
+    job_id = jobs.submit("report")
+    jobs.delete_job(job_id)  # still queued: kept
+    assert jobs.get_job(job_id) is not None
+    run_all()
+    jobs.delete_job(job_id)
+    assert jobs.get_job(job_id) is None and not report.exists()
+
+
+def test_import_error_report_is_job_output(data_dir, monkeypatch):
+    monkeypatch.setattr(jobs, "KINDS", {})
+    jobs.register("import", jobs._import, resumable=False)
+    upload = data_dir / "blobs" / "sheet.csv"
+    upload.parent.mkdir()
+    upload.write_text("Student Name,Father,Mobile,Course\nNo Father,,03001111111,Basket Weaving\n")
+    job_id = jobs.submit("import", {"path": str(upload), "filename": "sheet.csv", "kind": "admissions",
+                                    "notify": False})
+    run_all()
+    result = jobs.get_job(job_id)["result"]
+    assert result["errors"] == 1 and result["file"] == f"exports/import_{job_id}.errors.csv"
+    assert "unknown course" in (data_dir / result["file"]).read_text()
+    assert sorted(p.name for p in upload.parent.iterdir()) == ["sheet.csv"]
+    jobs.delete_job(job_id)
+    assert not (data_dir / result["file"]).exists() and upload.exists()
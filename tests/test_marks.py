@@ -0,0 +1,72 @@
+import pandas as pd
+
+import datastore
+import marks
+
+
+def seed():
+    datastore.put_records("students", {
+        "A1": {"full_name": "Legacy", "scholarship_marks": "72.5"},
+        "A2": {"full_name": "Whole", "scholarship_marks": 60},
+        "A3": {"full_name": "None yet"},
+    })
+
+
+def edit(frame: pd.DataFrame, **new_marks) -> pd.DataFrame:
+    edited = frame.copy()
+    for adm, value in new_marks.items():
+        edited.loc[edited["admission_no"] == adm, "scholarship_marks"] = value
+    return edited
+
+
+def test_unchanged_legacy_fractional_marks_are_not_a_change():
+    seed()
+    frame = marks.marks_frame()
+    assert marks.diff_marks(frame, frame.copy()) == ({}, [])
+
+
+def test_diff_keeps_the_old_fraction_and_validates_new_marks():
+    seed()
+    frame = marks.marks_frame()
+    changes, errors = marks.diff_marks(frame, edit(frame, A1=80, A2=pd.NA, A3=101))
+    assert changes == {"A1": (72.5, 80), "A2": (60, None)}
+    assert errors == ["A3: marks 101 must be a whole number from 0 to 100"]
+
+
+def test_out_of_range_marks_are_reported_not_cleared():
+    seed()
+    frame = marks.marks_frame()
+    changes, errors = marks.diff_marks(frame, edit(frame, A2=150, A3=float("inf")))
+    assert changes == {}
+    assert errors == ["A2: marks 150 must be a whole number from 0 to 100",
+                      "A3: marks inf must be a whole number from 0 to 100"]
+
+
+def test_commit_then_undo():
+    seed()
+    frame = marks.marks_frame()
+    changes, _ = marks.diff_marks(frame, edit(frame, A1=80, A3=45))
+    batch_id, skipped = marks.commit_marks(changes)
+    assert skipped == []
+    assert datastore.get_record("students", "A1")["scholarship_marks"] == 80
+    assert marks.last_batch()["id"] == batch_id
+
+    assert marks.undo_batch(batch_id) == {"restored": 2, "skipped": []}
+    assert datastore.get_record("students", "A1")["scholarship_marks"] == 72.5
+    assert "scholarship_marks" not in datastore.get_record("students", "A3")
+    assert marks.last_batch() is None
+
+
+def test_rows_changed_by_someone_else_are_skipped():
+    seed()
+    frame = marks.marks_frame()
+    changes, _ = marks.diff_marks(frame, edit(frame, A1=80, A2=70))
+    datastore.update_record("students", "A2", lambda s: dict(s, scholarship_marks=65))
+    batch_id, skipped = marks.commit_marks(changes)
+    assert skipped == ["A2"]
+    assert datastore.get_record("students", "A2")["scholarship_marks"] == 65
+
+    # Changed again after the batch: undo leaves it alone.
+    datastore.update_record("students", "A1", lambda s: dict(s, scholarship_marks=90))
+    assert marks.undo_batch(batch_id) == {"restored": 0, "skipped": ["A1"]}
+    assert datastore.get_record("students", "A1")["scholarship_marks"] == 90
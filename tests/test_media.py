@@ -0,0 +1,52 @@
+import io
+import os
+
+from PIL import Image
+
+import blobs
+import datastore
+import media
+
+
+def upload(name: str, color="red") -> io.BytesIO:
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 300), color).save(buffer, "PNG")
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+def test_same_photo_uploaded_twice_gets_two_entries():
+    first = media.register_upload(upload("ali.png"), "teacher", "Ali")
+    second = media.register_upload(upload("sara.png"), "teacher", "Sara")
+    assert first["id"] != second["id"] and first["blob"] == second["blob"]
+    assert media.count_media("teacher") == 2
+    assert blobs.usage()["references"] == 2
+
+    media.remove_file(first["id"])
+    assert datastore.get_record("media", second["id"])["caption"] == "Sara"
+    assert os.path.exists(second["path"])
+    assert os.path.exists(media.media_src(second))
+
+    media.remove_file(second["id"])
+    assert not os.path.exists(second["path"])
+    assert not os.path.exists(second["derivatives"]["640"])
+
+
+def test_file_on_disk_keeps_its_entry_when_indexed_again():
+    os.makedirs("gallery")
+    with open(os.path.join("gallery", "old.png"), "wb") as f:
+        f.write(upload("old.png").read())
+    media.import_existing()
+    media.import_existing(force=True)
+    items, _ = media.list_media("gallery", 10)
+    assert [item["caption"] for item in items] == ["old.png"]
+
+
+def test_resumed_job_writes_the_same_entry():
+    blob = blobs.store_stream(upload("a.png"), "a.png")
+    media_id = media.new_media_id("gallery")
+    for _ in range(2):
+        media.register_file(blob["path"], "gallery", "a.png", blob=blob["hash"], media_id=media_id)
+    assert media.count_media("gallery") == 1
+    assert blobs.usage()["references"] == 1
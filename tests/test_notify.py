@@ -0,0 +1,98 @@
+import threading
+import time
+
+import datastore
+import notify
+
+ADM = "FICSE-20250301-100"
+
+
+class Recorder:
+    def __init__(self, failures=()):
+        self.failures = list(failures)  # exceptions to raise, one per call, before succeeding
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send(self, recipient, subject, body):
+        with self.lock:
+            if self.failures:
+                raise self.failures.pop(0)
+            self.sent.append((recipient, subject))
+
+
+def admit(**fields):
+    datastore.put_record("students", ADM, dict({"full_name": "Ali", "courses": ["Python"]}, **fields))
+
+
+def outbox():
+    cursor = datastore.get_connection().execute(
+        "SELECT channel, event, status, attempts, next_attempt_at, last_error FROM outbox ORDER BY id")
+    return [dict(zip(("channel", "event", "status", "attempts", "next_attempt_at", "last_error"), row))
+            for row in cursor]
+
+
+def make_due():
+    with datastore.transaction() as conn:
+        conn.execute("UPDATE outbox SET next_attempt_at = 0 WHERE status = 'pending'")
+
+
+def run(transports):
+    return notify.Worker(transports, rate_limits={c: 1000.0 for c in transports}).run(until_idle=True)
+
+
+def test_writes_queue_one_message_per_channel_and_newest_marks_only():
+    admit(email="ali@example.com", contact_no="0300-1234567")
+    assert [(m["channel"], m["event"]) for m in outbox()] == [("email", "admission"), ("sms", "admission")]
+    datastore.update_record("students", ADM, lambda s: dict(s, scholarship_marks=40))
+    datastore.update_record("students", ADM, lambda s: dict(s, scholarship_marks="65"))
+    assert [m["status"] for m in outbox() if m["event"] == "marks"] == ["superseded"] * 2 + ["pending"] * 2
+    with notify.muted():
+        datastore.update_record("students", ADM, lambda s: dict(s, course_completed=True))
+    assert not any(m["event"] == "certificate" for m in outbox())
+
+
+def test_claim_leases_messages_until_recorded():
+    admit(email="ali@example.com")
+    rows = notify.claim("email", 10)
+    assert [row[4] for row in rows] == [1]
+    assert notify.claim("email", 10) == []  # leased, not due again
+    assert outbox()[0]["next_attempt_at"] > time.time() + notify.LEASE - 60
+    make_due()  # the worker holding the lease died; the message is claimed again
+    rows = notify.claim("email", 10)
+    assert [row[4] for row in rows] == [2]
+    notify.record_result(rows[0][0], rows[0][4])
+    assert outbox()[0]["status"] == "sent"
+    make_due()
+    assert notify.claim("email", 10) == []
+
+
+def test_backoff_doubles_with_jitter_up_to_the_cap():
+    for attempts in range(1, 12):
+        want = min(notify.BACKOFF_MAX, notify.BACKOFF_BASE * 2 ** (attempts - 1))
+        assert 0.8 * want <= notify.backoff(attempts) <= 1.2 * want
+
+
+def test_temporary_failures_retry_then_give_up():
+    admit(email="ali@example.com")
+    transport = Recorder([ConnectionError("down")] * notify.MAX_ATTEMPTS)
+    assert run({"email": transport})["retry"] == 1
+    message = outbox()[0]
+    assert (message["status"], message["attempts"], message["last_error"]) == (
+        "pending", 1, "ConnectionError: down")
+    for _ in range(notify.MAX_ATTEMPTS - 1):
+        make_due()
+        run({"email": transport})
+    message = outbox()[0]
+    assert (message["status"], message["attempts"]) == ("failed", notify.MAX_ATTEMPTS)
+    assert transport.sent == []
+    assert notify.retry_failed() == 1
+    make_due()
+    assert run({"email": transport}) == {"sent": 1, "retry": 0, "failed": 0}
+
+
+def test_permanent_failure_is_not_retried():
+    admit(email="ali@example.com", contact_no="03001234567")
+    stats = run({"email": Recorder([notify.PermanentError("no such mailbox")]), "sms": Recorder()})
+    assert stats == {"sent": 1, "retry": 0, "failed": 1}
+    assert {m["channel"]: m["status"] for m in outbox()} == {"email": "failed", "sms": "sent"}
+    assert notify.status_counts() == {"email": {"failed": 1}, "sms": {"sent": 1}}
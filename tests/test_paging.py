@@ -0,0 +1,66 @@
+import pytest
+
+import datastore
+
+
+def seed():
+    # Ties on status, one record without it.
+    datastore.put_records("students", {
+        "A1": {"admission_no": "A1", "status": "Pending"},
+        "A2": {"admission_no": "A2", "status": "Approved"},
+        "A3": {"admission_no": "A3", "status": "Pending"},
+        "A4": {"admission_no": "A4"},
+        "A5": {"admission_no": "A5", "status": "Approved"},
+    })
+
+
+def walk(limit: int, **kwargs) -> list:
+    pages, cursor = [], None
+    while True:
+        records, cursor = datastore.page_records("students", "status", limit, after=cursor, **kwargs)
+        pages.append([r["admission_no"] for r in records])
+        if cursor is None:
+            return pages
+
+
+def test_empty_collection_is_one_empty_page():
+    assert datastore.page_records("students", "status", 10) == ([], None)
+
+
+def test_pages_cover_every_record_once_in_order():
+    seed()
+    assert walk(2) == [["A4", "A2"], ["A5", "A1"], ["A3"]]
+    assert walk(2, descending=True) == [["A3", "A1"], ["A5", "A2"], ["A4"]]
+
+
+def test_an_exactly_full_last_page_has_no_cursor():
+    seed()
+    assert walk(5) == [["A4", "A2", "A5", "A1", "A3"]]
+    assert walk(1)[-1] == ["A3"]
+
+
+def test_deleting_the_cursor_row_does_not_lose_the_place():
+    seed()
+    records, cursor = datastore.page_records("students", "status", 2)
+    assert cursor == ("Approved", "A2")
+    datastore.delete_record("students", "A2")
+    datastore.put_record("students", "A0", {"admission_no": "A0", "status": "Approved"})  # sorts before the cursor
+    records, cursor = datastore.page_records("students", "status", 2, after=cursor)
+    assert [r["admission_no"] for r in records] == ["A5", "A1"]
+
+
+def test_partitions_page_separately():
+    for i, kind in enumerate(["gallery", "alumni", "gallery", "gallery"]):
+        datastore.put_record("media", f"m{i}", {"id": f"m{i}", "kind": kind, "uploaded_at": f"2026-01-0{i + 1}"})
+    records, cursor = datastore.page_records("media", "uploaded_at", 2, partition="gallery")
+    assert [r["id"] for r in records] == ["m0", "m2"]
+    records, cursor = datastore.page_records("media", "uploaded_at", 2, after=cursor, partition="gallery")
+    assert ([r["id"] for r in records], cursor) == (["m3"], None)
+    assert datastore.count_records("media", partition="alumni") == 1
+
+
+def test_unindexed_fields_are_refused():
+    with pytest.raises(ValueError):
+        datastore.page_records("students", "cnic", 10)
+    with pytest.raises(ValueError):
+        datastore.page_records("teachers", "name", 10)
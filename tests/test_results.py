@@ -0,0 +1,140 @@
+import os
+import threading
+import zlib
+
+import pytest
+
+import datastore
+import results
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshots(monkeypatch):
+    monkeypatch.setattr(results, "_snapshots", {})
+
+
+def seed(count: int = 100) -> dict:
+    students = {}
+    for i in range(count):
+        student = {"full_name": f"Student {i}" if i % 7 else f"طالب {i}"}
+        if i % 5 == 1:
+            student["scholarship_marks"] = f"{40 + i % 30}.5"  # legacy text marks
+        elif i % 5 != 0:
+            student["scholarship_marks"] = i % 101
+        students[f"FICSE-20250301-{100 + i}"] = student
+    datastore.put_records("students", students)
+    return students
+
+
+def read_layout(path: str) -> list:
+    # Walks the file exactly as documented at the top of results.py.
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, bucket_count, count, version, _ = results.HEADER.unpack_from(data, 0)
+    assert magic == results.MAGIC
+    assert bucket_count & (bucket_count - 1) == 0
+    assert bucket_count * results.BUCKET_TARGET >= count
+    assert version == datastore.collection_version("students")
+    records, expected_offset = [], results.HEADER.size + results.BUCKET.size * bucket_count
+    for b in range(bucket_count):
+        offset, n = results.BUCKET.unpack_from(data, results.HEADER.size + results.BUCKET.size * b)
+        assert offset == expected_offset  # buckets are packed back to back
+        keys = []
+        for _ in range(n):
+            status, key_len, name_len, marks = results.RECORD.unpack_from(data, offset)
+            offset += results.RECORD.size
+            key = data[offset:offset + key_len]
+            name = data[offset + key_len:offset + key_len + name_len].decode("utf-8")
+            offset += key_len + name_len
+            assert zlib.crc32(key) % bucket_count == b
+            keys.append(key)
+            records.append((key.decode(), name, status, marks))
+        assert keys == sorted(keys)
+        expected_offset = offset
+    assert expected_offset == len(data) and len(records) == count
+    return records
+
+
+def test_layout_matches_the_documented_format():
+    students = seed()
+    info = results.publish()
+    records = read_layout(results.SNAPSHOT_FILE)
+    assert info["records"] == len(students) and info["bytes"] == os.path.getsize(results.SNAPSHOT_FILE)
+    for adm, name, status, marks in records:
+        parsed = results.parse_marks(students[adm].get("scholarship_marks"))
+        assert name == students[adm]["full_name"]
+        if parsed is None:
+            assert (status, marks) == (results.NO_MARKS, 0.0)
+        else:
+            assert marks == parsed
+            assert status == (results.PASSED if parsed >= results.PASS_MARKS else results.FAILED)
+
+
+def test_lookups_agree_with_live_records():
+    students = seed()
+    results.publish()
+    snapshot = results.current()
+    for adm, student in students.items():
+        assert snapshot.lookup(adm) == results.result_of(adm, student)
+    assert snapshot.lookup("FICSE-19990101-1") is None
+
+
+def test_republish_is_picked_up_and_old_mappings_stay_readable():
+    assert results.current() is None
+    seed(10)
+    results.publish()
+    old = results.current()
+    datastore.update_record("students", "FICSE-20250301-100", lambda s: dict(s, scholarship_marks=99))
+    results.publish()
+    new = results.current()
+    assert new is not old
+    assert new.lookup("FICSE-20250301-100")["marks"] == 99
+    assert old.lookup("FICSE-20250301-100")["marks"] is None
+
+
+def test_lookup_reads_records_changed_since_publishing():
+    seed(10)
+    results.publish()
+    assert results.lookup("FICSE-20250301-100")["marks"] is None
+    datastore.update_record("students", "FICSE-20250301-100", lambda s: dict(s, scholarship_marks=80))
+    datastore.put_record("students", "FICSE-20250301-999", {"full_name": "Late", "scholarship_marks": 30})
+    assert results.lookup("FICSE-20250301-100")["status"] == "Passed"
+    assert results.lookup("FICSE-20250301-999")["status"] == "Failed"
+    assert results.lookup("FICSE-19990101-1") is None
+    results.publish()
+    assert results.current().lookup("FICSE-20250301-999")["marks"] == 30
+
+
+def test_concurrent_publishes_each_write_their_own_temp_file():
+    seed(200)
+    errors = []
+
+    def publish():
+        try:
+            for _ in range(5):
+                results.publish()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=publish) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(read_layout(results.SNAPSHOT_FILE)) == 200
+    assert [name for name in os.listdir(".") if name.endswith(".tmp")] == []
+
+
+@pytest.mark.parametrize("value, parsed", [
+    (72, 72.0), ("72.5", 72.5), (0, 0.0), ("100", 100.0), (None, None), ("absent", None),
+    ("nan", None), (float("inf"), None), ("-inf", None), (True, None), (False, None), (-1, None), (100.5, None),
+])
+def test_parse_marks_accepts_only_real_marks(value, parsed):
+    assert results.parse_marks(value) == parsed
+
+
+def test_grade_is_the_one_pass_mark():
+    assert results.grade(float(results.PASS_MARKS)) == (results.PASS_MARKS, results.PASSED)
+    assert results.grade(results.PASS_MARKS - 0.5) == (results.PASS_MARKS - 0.5, results.FAILED)
+    assert isinstance(results.grade(72.0)[0], int)
@@ -0,0 +1,58 @@
+import datastore
+import search
+
+
+def tables() -> dict:
+    conn = datastore.get_connection()
+    return {table: sorted(conn.execute(f"SELECT * FROM {table}").fetchall())
+            for table in ("search_terms", "search_grams", "search_df")}
+
+
+def keys(query: str, **kwargs) -> list:
+    return [key for key, _ in search.search_students(query, **kwargs)]
+
+
+def seed():
+    datastore.put_records("students", {
+        "A1": {"full_name": "Muhammad Ali", "father_name": "Akbar Khan", "cnic": "4210112345671"},
+        "A2": {"full_name": "Aisha Bano", "father_name": "Bashir Ahmed", "contact_no": "03001234567"},
+        "A3": {"full_name": "Sara Khan", "father_name": "Muhammad Yousuf"},
+    })
+
+
+def test_prefix_and_fuzzy_matches():
+    seed()
+    assert search.search_students("Muhammad Ali")[0] == ("A1", 2.0)
+    assert search.search_students("Muhammad Ali", fields=("full_name",)) == [("A1", 2.0)]
+    assert sorted(keys("khan")) == ["A1", "A3"]
+    assert keys("khan", fields=("full_name",)) == ["A3"]
+    assert keys("0300123") == ["A2"]
+    assert keys("Aisha Bno")[0] == "A2"  # misspelt
+    assert keys("zzzz") == [] and keys("  ") == []
+
+
+def test_writes_keep_the_index_in_step():
+    seed()
+    datastore.update_record("students", "A2", lambda s: dict(s, full_name="Ayesha Noor"))
+    datastore.delete_record("students", "A3")
+    assert keys("Ayesha Noor") == ["A2"]
+    assert "A3" not in keys("Sara Khan")
+    assert keys("Muhammad", fields=("father_name",)) == []
+    live = tables()
+    search.rebuild_index()
+    assert tables() == live
+    assert all(df > 0 for _, _, df in live["search_df"])
+    datastore.delete_record("students", "A1")
+    datastore.delete_record("students", "A2")
+    assert tables() == {"search_terms": [], "search_grams": [], "search_df": []}
+
+
+def test_deferred_bulk_writes_match_a_rebuild():
+    with datastore.transaction() as conn, search.deferred_index(conn):
+        seed()
+        # The same record twice in one batch: the later version wins.
+        datastore.update_record("students", "A1", lambda s: dict(s, full_name="Imran Ali"))
+    bulk = tables()
+    search.rebuild_index()
+    assert tables() == bulk
+    assert keys("Imran") == ["A1"] and keys("Muhammad Ali", fields=("full_name",)) == []
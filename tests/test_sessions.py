@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import datastore
+import sessions
+
+
+@pytest.fixture(autouse=True)
+def fresh(monkeypatch):
+    monkeypatch.setattr(sessions, "_secret", None)
+    monkeypatch.setattr(sessions, "_versions", {})
+    sessions.register_version("student", lambda name: (datastore.get_record("users", name) or {}).get("password"))
+
+
+def test_token_round_trip_and_tampering():
+    datastore.put_record("users", "ali", {"password": "h1"})
+    token = sessions.issue("student", "ali")
+    assert sessions.verify(token, "student")["sub"] == "ali"
+    assert sessions.verify(token, "admin") is None
+    datastore.put_record("users", "sara", {"password": "h1"})  # same password hash
+    payload, _, signature = token.partition(".")
+    claims = json.loads(sessions._unb64(payload))
+    forged = sessions._b64(json.dumps(dict(claims, sub="sara")).encode())
+    assert sessions.verify(f"{forged}.{signature}") is None
+    assert sessions.verify(f"{payload}.{signature[::-1]}") is None
+    for junk in (None, "", "abc", "e30.", "!!!.sig", "bnVsbA.sig"):
+        assert sessions.verify(junk) is None
+
+
+def test_password_change_revokes_tokens():
+    datastore.put_record("users", "ali", {"password": "h1"})
+    token = sessions.issue("student", "ali")
+    datastore.update_record("users", "ali", lambda u: dict(u, password="h2"))
+    assert sessions.verify(token, "student") is None
+    assert sessions.verify(sessions.issue("student", "ali"), "student")["sub"] == "ali"
+
+
+def test_unknown_or_deleted_subject_has_no_token():
+    with pytest.raises(ValueError):
+        sessions.issue("student", "nobody")
+    datastore.put_record("users", "ali", {"password": "h1"})
+    token = sessions.issue("student", "ali")
+    datastore.delete_record("users", "ali")
+    assert sessions.verify(token) is None
+
+
+def test_expired_token_is_refused():
+    datastore.put_record("users", "ali", {"password": "h1"})
+    assert sessions.verify(sessions.issue("student", "ali", ttl=-1)) is None
+
+
+def test_logout_revokes_every_token_of_the_subject():
+    datastore.put_record("users", "ali", {"password": "h1"})
+    datastore.put_record("users", "sara", {"password": "h1"})
+    laptop, phone, other = (sessions.issue("student", "ali"), sessions.issue("student", "ali"),
+                            sessions.issue("student", "sara"))
+    sessions.revoke("student", "ali")
+    assert sessions.verify(laptop) is None and sessions.verify(phone) is None
+    assert sessions.verify(other)["sub"] == "sara"
+    assert sessions.verify(sessions.issue("student", "ali"))["sub"] == "ali"
+
+
+def test_password_change_moves_the_epoch_on():
+    datastore.put_record("users", "ali", {"password": "h1", "cnic": "1"})
+    datastore.update_record("users", "ali", lambda u: dict(u, cnic="2"))
+    assert sessions.epoch("student", "ali") == 0
+    datastore.update_record("users", "ali", lambda u: dict(u, password="h2"))
+    assert sessions.epoch("student", "ali") == 1
+
+
+def test_admin_tokens_can_be_revoked():
+    sessions.register_version("admin", lambda name: "fixed-hash" if name == "admin" else None)
+    token = sessions.issue("admin", "admin")
+    assert sessions.verify(token, "admin")["sub"] == "admin"
+    sessions.revoke("admin", "admin")
+    assert sessions.verify(token, "admin") is None
+    assert sessions.verify(sessions.issue("admin", "admin"), "admin")["sub"] == "admin"
@@ -0,0 +1,25 @@
+import importlib
+
+# ----------------- Pages -----------------
+# Menu label -> module in this package. A page module is only imported the
+# first time someone opens that page; each one exposes render().
+PAGES = {
+    "Home": "home",
+    "Register": "register",
+    "Forgot Password": "forgot_password",
+    "Login": "login",
+    "Admission Form": "admission",
+    "Courses": "courses",
+    "Teachers": "teachers",
+    "Gallery": "gallery",
+    "Contact": "contact",
+    "Admin Panel": "admin",
+    "Scholarship": "scholarship",
+    "Careers": "careers",
+    "Result": "result",
+    "Certificate": "certificate",
+}
+
+
+def render(label: str):
+    importlib.import_module(f"{__name__}.{PAGES[label]}").render()
@@ -0,0 +1,645 @@
+import datetime
+import os
+
+import pandas as pd
+import streamlit as st
+
+import analytics
+import api
+import blobs
+import bulk_pdfs
+import datacache
+import datastore
+import exporter
+import fees
+import ids
+import importer
+import jobs
+import marks
+import media
+import notify
+import pdfs
+import results
+import search
+
+from .common import (ADMIN_CREDENTIALS, TEACHERS_FILE, forget_login, load_json, make_hash, new_uploads, remember_login,
+                     rerun_section, show_media_grid)
+
+
+# ----------------- Admin helpers -----------------
+def show_student_details(student, show_photo=False):
+    st.markdown(f"### {student.get('full_name')} | Admission No: {student.get('admission_no')}")
+    st.write(f"- Father Name: {student.get('father_name')}")
+    st.write(f"- Date of Birth: {student.get('date_of_birth')}")
+    st.write(f"- Gender: {student.get('gender')}")
+    st.write(f"- Contact No: {student.get('contact_no')}")
+    st.write(f"- WhatsApp No: {student.get('whatsapp_no')}")
+    st.write(f"- Email: {student.get('email')}")
+    st.write(f"- Qualification: {student.get('qualification')}")
+    st.write(f"- Courses: {', '.join(student.get('courses', []))}")
+    st.write(f"- Status: {student.get('status')}")
+    # Photos are only sent to the browser when asked for.
+    if show_photo and student.get("photo_path") and os.path.exists(student["photo_path"]):
+        st.image(media.display_path(student["photo_path"], 320), width=120)
+
+    if not student.get("course_completed") and st.button(
+        "Mark course completed", key=f"completed_{student['admission_no']}"
+    ):
+        try:
+            datastore.update_record("students", student["admission_no"], lambda s: dict(s, course_completed=True))
+        except KeyError:
+            st.error("This student was deleted meanwhile.")
+        except datastore.ConflictError:
+            st.error("The record kept changing; please try again.")
+        else:
+            st.success("Course marked as completed; the certificate is now available.")
+            rerun_section()
+
+    if st.button(f"Delete Student {student.get('full_name')}", key=f"del_student_{student['admission_no']}"):
+        datastore.delete_record("students", student["admission_no"])
+        st.success(f"{student.get('full_name')} deleted successfully!")
+        rerun_section()
+
+
+def _download(col, label: str, path: str):
+    # Exports and batches can be large: api.py sends the file from disk in
+    # chunks, so it is never read into this process (see api.download_url).
+    col.link_button(label, api.download_url(path))
+
+
+@st.fragment(run_every=2)
+def show_jobs(kinds, key, limit=5):
+    # Background jobs of the given kinds, refreshed every two seconds.
+    for job in jobs.list_jobs(kinds, limit):
+        cols = st.columns([3, 4, 2, 1])
+        cols[0].write(f"#{job['id']} {job['title']}, {job['created_at'][:16]}")
+        result = job["result"] if isinstance(job["result"], dict) else {}
+        if job["status"] in jobs.ACTIVE:
+            total = job["total"] or 0
+            label = f"{job['status']}: {job['done']} / {total}" if total else job["status"]
+            if job["message"]:
+                label += f" ({job['message']})"
+            cols[1].progress(min(job["done"] / total, 1.0) if total else 0.0, text=label)
+            if job["cancel_requested"]:
+                cols[2].write("cancelling...")
+            elif cols[2].button("Cancel", key=f"{key}_cancel_{job['id']}"):
+                jobs.cancel(job["id"])
+                st.rerun(scope="fragment")
+        else:
+            summary = ", ".join(f"{name} {value}" for name, value in result.items()
+                                if name not in ("file", "zip_path") and value is not None)
+            cols[1].write(f"{job['status']}{': ' + summary if summary else ''}")
+            if job["error"]:
+                cols[1].caption(job["error"])
+            path = result.get("file")
+            if path and os.path.exists(path):
+                _download(cols[2], "Download", path)
+            if cols[3].button("Delete", key=f"{key}_delete_{job['id']}"):
+                jobs.delete_job(job["id"])
+                st.rerun(scope="fragment")
+
+
+def submit_photos(files, kind):
+    # The bytes are stored now (the upload only lives in this session);
+    # resizing and adding them to the manifest happens in a background job.
+    items = []
+    for file in files:
+        try:
+            blob = blobs.store_stream(file, file.name)
+            items.append({"id": media.new_media_id(kind), "path": blob["path"], "hash": blob["hash"],
+                          "caption": file.name})
+        except blobs.BlobTooLarge as e:
+            st.error(str(e))
+    if items:
+        jobs.submit("media", {"kind": kind, "items": items}, title=f"{len(items)} {kind} photos")
+        st.success(f"{len(items)} photos uploaded; they appear below once processed.")
+
+
+# ----------------- Student Information -----------------
+@st.fragment
+def students_section():
+    st.subheader("Registered Students & Admission Forms")
+
+    search_option = st.radio("Search by:", ["All", "Name", "CNIC", "Admission No", "Any Field"])
+
+    search_query = ""
+    if search_option != "All":
+        search_query = st.text_input(f"Enter {search_option}")
+
+    col_sort, col_order, col_size, col_view = st.columns(4)
+    sort_label = col_sort.selectbox("Sort by", ["Applied At", "Status", "Name"])
+    sort_field = {"Applied At": "applied_at", "Status": "status", "Name": "full_name"}[sort_label]
+    descending = col_order.radio("Order", ["Descending", "Ascending"]) == "Descending"
+    page_size = col_size.selectbox("Page size", [10, 25, 50, 100], index=1)
+    view_mode = col_view.radio("View", ["Table", "Detailed"])
+
+    # Back to the first page whenever the listing itself changes.
+    listing = (search_option, search_query, sort_field, descending, page_size)
+    if st.session_state.get("student_listing") != listing:
+        st.session_state["student_listing"] = listing
+        st.session_state["student_cursors"] = [None]
+    cursors = st.session_state["student_cursors"]
+
+    if search_option == "All":
+        total = datastore.count_records("students")
+        page, next_cursor = datastore.page_records(
+            "students", sort_field, page_size, after=cursors[-1], descending=descending
+        )
+    else:
+        adm_nos = []
+        if search_option == "CNIC":
+            # Students matched through their own CNIC or their login account's CNIC.
+            adm_nos = datastore.find_keys("students", "cnic", search_query, prefix=True)
+            for uname in datastore.find_keys("users", "cnic", search_query, prefix=True):
+                adm_nos += datastore.find_keys("students", "full_name", uname)
+            adm_nos = list(dict.fromkeys(adm_nos))
+        elif search_query:
+            # Ranked fuzzy/prefix matches from the trigram index.
+            fields = {
+                "Name": search.NAME_FIELDS,
+                "Admission No": ("admission_no",),
+                "Any Field": search.SEARCH_FIELDS,
+            }[search_option]
+            adm_nos = [a for a, _ in search.search_students(search_query, fields=fields, limit=100)]
+        total = len(adm_nos)
+        start = cursors[-1] or 0
+        page = [rec for rec in (datastore.get_record("students", a) for a in adm_nos[start:start + page_size]) if rec]
+        next_cursor = start + page_size if start + page_size < total else None
+
+    st.write(f"**Total Students Found: {total}** (page {len(cursors)} of {max(1, -(-total // page_size))})")
+    nav_prev, nav_next = st.columns(2)
+    if nav_prev.button("◀ Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        rerun_section()
+    if nav_next.button("Next ▶", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        rerun_section()
+
+    if view_mode == "Table":
+        st.dataframe([
+            {
+                "Admission No": s.get("admission_no"),
+                "Name": s.get("full_name"),
+                "Father Name": s.get("father_name"),
+                "Contact No": s.get("contact_no"),
+                "Courses": ", ".join(s.get("courses", [])),
+                "Status": s.get("status"),
+                "Applied At": s.get("applied_at"),
+            }
+            for s in page
+        ], use_container_width=True)
+        options = {f"{s.get('full_name')} ({s['admission_no']})": s for s in page}
+        chosen = st.selectbox("Open student", ["-"] + list(options))
+        if chosen != "-":
+            show_student_details(options[chosen], show_photo=True)
+    else:
+        show_photos = st.checkbox("Show photos")
+        for student in page:
+            show_student_details(student, show_photo=show_photos)
+
+
+# ----------------- Analytics -----------------
+@st.fragment
+def analytics_section():
+    st.subheader("Admissions & Results Analytics")
+    days = st.selectbox("Admissions over the last", [30, 90, 365], index=1, format_func=lambda d: f"{d} days")
+    data = analytics.dashboard(days)
+    summary = data["summary"]
+    col_total, col_marks, col_pass = st.columns(3)
+    col_total.metric("Students", summary["students"])
+    col_marks.metric("With scholarship marks", summary["with_marks"])
+    col_pass.metric("Pass rate (marks >= 50)",
+                    "-" if summary["pass_rate"] is None else f"{summary['pass_rate']:.0%}")
+
+    if data["daily"]:
+        st.write("### Admissions per day")
+        st.bar_chart(pd.DataFrame.from_dict(data["daily"], orient="index").fillna(0).sort_index())
+        st.write("### Admissions per course")
+        st.bar_chart(pd.Series(data["per_course"], name="Admissions"), horizontal=True)
+    else:
+        st.info(f"No admissions since {data['date_from']}.")
+
+    col_status, col_gender = st.columns(2)
+    with col_status:
+        st.write("### Status")
+        st.bar_chart(pd.Series(summary["status"], name="Students"))
+    with col_gender:
+        st.write("### Gender")
+        st.bar_chart(pd.Series(summary["gender"], name="Students"))
+    if summary["marks"]:
+        st.write("### Scholarship marks")
+        st.bar_chart(pd.Series(summary["marks"], name="Students"))
+
+    if st.button("Recount from student records"):
+        with st.spinner("Recounting..."):
+            st.session_state["analytics_message"] = f"Recounted {analytics.rebuild()} students."
+        rerun_section()
+    if st.session_state.get("analytics_message"):
+        st.success(st.session_state.pop("analytics_message"))
+
+
+# ----------------- Bulk Certificates / Admission Forms -----------------
+@st.fragment
+def bulk_pdfs_section():
+    st.subheader("Bulk Certificates & Admission Forms")
+    bulk_options = bulk_pdfs.filter_options()
+    col_kind, col_course, col_cohort, col_status = st.columns(4)
+    bulk_kind = col_kind.radio("Documents", ["Certificates", "Admission Forms"])
+    bulk_course = col_course.selectbox("Course", ["All"] + bulk_options["courses"])
+    bulk_cohort = col_cohort.selectbox("Cohort (month applied)", ["All"] + bulk_options["cohorts"])
+    bulk_status = col_status.selectbox("Status", ["All"] + bulk_options["statuses"], key="bulk_status")
+    completed_only = bulk_kind == "Certificates" and st.checkbox("Only students with course completed", value=True)
+    bulk_filters = {
+        "course": None if bulk_course == "All" else bulk_course,
+        "cohort": None if bulk_cohort == "All" else bulk_cohort,
+        "status": None if bulk_status == "All" else bulk_status,
+        "completed_only": completed_only,
+    }
+    bulk_keys = bulk_pdfs.select_students(**bulk_filters)
+    st.write(f"{len(bulk_keys)} students selected")
+
+    if st.button("Generate ZIP", disabled=not bulk_keys):
+        kind = "certificate" if bulk_kind == "Certificates" else "admission"
+        batch_id = bulk_pdfs.create_batch(kind, bulk_keys, bulk_filters)
+        jobs.submit("bulk_pdfs", {"batch_id": batch_id}, title=f"{bulk_kind} batch #{batch_id}")
+        rerun_section()
+
+    st.write("### Jobs")
+    show_jobs(["bulk_pdfs"], "bulk_jobs")
+    st.write("### Batches")
+    for batch in bulk_pdfs.list_batches(5):
+        cols = st.columns([3, 2, 2, 1])
+        cols[0].write(f"#{batch['id']} {batch['kind']}s, {batch['created_at'][:16]}")
+        cols[1].write(f"{batch['status']}: {batch['done']} / {batch['total']}")
+        if batch["status"] in ("done", "partial") and batch["zip_path"] and os.path.exists(batch["zip_path"]):
+            _download(cols[2], "Download ZIP", batch["zip_path"])
+        if batch["status"] in ("failed", "partial") and cols[2].button("Resume", key=f"bulk_resume_{batch['id']}"):
+            jobs.submit("bulk_pdfs", {"batch_id": batch["id"]}, title=f"Resume batch #{batch['id']}")
+            rerun_section()
+        if batch["status"] != "running" and cols[3].button("Delete", key=f"bulk_delete_{batch['id']}"):
+            bulk_pdfs.delete_batch(batch["id"])
+            rerun_section()
+
+
+# ----------------- Scholarship Marks -----------------
+@st.fragment
+def marks_section():
+    st.subheader("Scholarship Marks")
+    marks_data = marks.marks_frame()
+    if marks_data.empty:
+        st.info("No student data to display.")
+    else:
+        col_find, col_missing = st.columns([3, 1])
+        marks_query = col_find.text_input("Find by name or admission no", key="marks_query")
+        only_missing = col_missing.checkbox("Only without marks", key="marks_missing")
+        shown = marks_data
+        if marks_query:
+            shown = shown[shown["full_name"].str.contains(marks_query, case=False, regex=False)
+                          | shown["admission_no"].str.contains(marks_query, case=False, regex=False)]
+        if only_missing:
+            shown = shown[shown["scholarship_marks"].isna()]
+        st.caption(f"{len(shown)} of {len(marks_data)} students. Edit marks in the grid, then save all changes at once.")
+        edited = st.data_editor(
+            shown,
+            key=f"marks_editor_{marks_query}_{only_missing}",
+            hide_index=True,
+            use_container_width=True,
+            disabled=["admission_no", "full_name"],
+            column_config={
+                "admission_no": "Admission No",
+                "full_name": "Name",
+                "scholarship_marks": st.column_config.NumberColumn("Scholarship Marks", min_value=0, max_value=100, step=1),
+            },
+        )
+        marks_changes, marks_errors = marks.diff_marks(shown, edited)
+        for message in marks_errors:
+            st.error(message)
+        if st.button(f"Save {len(marks_changes)} changed marks", disabled=not marks_changes or bool(marks_errors)):
+            batch_id, skipped = marks.commit_marks(marks_changes)
+            if skipped:
+                st.warning(f"Changed by someone else meanwhile, not saved: {', '.join(skipped)}")
+            if batch_id:
+                st.session_state["marks_saved"] = f"Saved marks for {len(marks_changes) - len(skipped)} students."
+                rerun_section()
+        if st.session_state.get("marks_saved"):
+            st.success(st.session_state.pop("marks_saved"))
+
+        last_marks_batch = marks.last_batch()
+        if last_marks_batch:
+            st.caption(f"Last saved batch: {len(last_marks_batch['changes'])} students at {last_marks_batch['created_at'][:19]}")
+            if st.button("Undo last batch"):
+                undone = marks.undo_batch(last_marks_batch["id"])
+                message = f"Restored previous marks for {undone['restored']} students."
+                if undone["skipped"]:
+                    message += f" Left alone (changed again since): {', '.join(undone['skipped'])}"
+                st.session_state["marks_saved"] = message
+                rerun_section()
+
+        published = results.current()
+        if published is None:
+            st.caption("Results have not been published yet; the Result page reads marks directly.")
+        else:
+            published_at = datetime.datetime.fromtimestamp(published.published_at).strftime("%d-%m-%Y %H:%M")
+            st.caption(f"Results published {published_at} ({published.records} students).")
+            if published.version != datastore.collection_version("students"):
+                st.warning("Student records changed since results were last published; the Result page "
+                           "reads them from the records until they are published again.")
+        if st.button("Publish results"):
+            info = results.publish()
+            st.session_state["marks_saved"] = f"Published results for {info['records']} students."
+            rerun_section()
+
+
+# ----------------- Bulk Import -----------------
+@st.fragment
+def import_section():
+    st.subheader(f"Bulk Import ({' / '.join(t.upper() for t in importer.SHEET_TYPES)})")
+    import_kind = st.radio("Import", ["Admissions", "Scholarship Marks"], horizontal=True)
+    st.caption(
+        "Admissions: one row per student with Full Name, Father Name, Contact No, Courses "
+        "(separate several with ';'), Present Address; optional Date of Birth, Gender, CNIC, Email, "
+        "Admission No. Scholarship Marks: Admission No and Marks."
+    )
+    import_file = st.file_uploader("Sheet to import", type=list(importer.SHEET_TYPES), key="bulk_import_file")
+    dry_run = st.checkbox("Dry run (check the file, write nothing)", value=True)
+    notify_students = st.checkbox("Notify the students (admission / result messages)", value=True)
+    if import_file and st.button("Run Import"):
+        # Kept in the blob store like any other upload (unreferenced, it is
+        # collected after a day); the photo size limit does not apply.
+        sheet = blobs.store_stream(import_file, import_file.name, max_bytes=import_file.size)
+        jobs.submit("import", {"path": sheet["path"], "filename": import_file.name,
+                               "kind": "admissions" if import_kind == "Admissions" else "marks",
+                               "dry_run": dry_run, "notify": notify_students},
+                    title=f"{'Dry run of ' if dry_run else ''}{import_kind.lower()} import of {import_file.name}")
+    show_jobs(["import"], "import_jobs")
+
+
+# ----------------- Export Data -----------------
+@st.fragment
+def export_section():
+    st.subheader("Export Data")
+    col_data, col_fmt = st.columns(2)
+    export_dataset = col_data.selectbox("Data", list(exporter.DATASETS))
+    export_format = col_fmt.selectbox("Format", exporter.available_formats())
+    all_columns = list(exporter.DATASETS[export_dataset][2])
+    export_columns = st.multiselect("Columns", all_columns, default=all_columns, key=f"export_cols_{export_dataset}")
+    export_filters = {}
+    if export_dataset != "users":
+        col_course, col_status = st.columns(2)
+        export_course = col_course.selectbox("Course", ["All"] + bulk_pdfs.filter_options()["courses"], key="export_course")
+        export_status = col_status.text_input("Status (blank for all)", key="export_status")
+        export_filters = {"course": None if export_course == "All" else export_course,
+                          "status": export_status or None}
+    if st.checkbox("Limit to a date range", key="export_use_dates"):
+        col_from, col_to = st.columns(2)
+        export_filters["date_from"] = str(col_from.date_input("From", key="export_from"))
+        export_filters["date_to"] = str(col_to.date_input("To", key="export_to"))
+    if st.button("Prepare Export", disabled=not export_columns):
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(exporter.EXPORT_DIR, f"{export_dataset}_{stamp}.{export_format}")
+        jobs.submit("export", {"dataset": export_dataset, "format": export_format, "path": path,
+                               "columns": export_columns, "filters": export_filters},
+                    title=f"{export_dataset} {export_format} export")
+    show_jobs(["export"], "export_jobs")
+
+
+# ----------------- Gallery Upload -----------------
+@st.fragment
+def gallery_section():
+    st.subheader("Manage Gallery Photos")
+    uploaded_gallery = st.file_uploader(
+        "Upload Photos to Gallery (Will appear on Home Page)", 
+        type=["jpg","jpeg","png"], 
+        accept_multiple_files=True
+    )
+    fresh_gallery = new_uploads(uploaded_gallery, "gallery_upload")
+    if fresh_gallery:
+        submit_photos(fresh_gallery, "gallery")
+    show_jobs(["media"], "gallery_jobs", limit=3)
+
+    st.write("### Existing Gallery Images")
+    if not show_media_grid("gallery", 12, "admin_gallery", width=320, allow_delete=True):
+        st.info("No images in gallery yet.")
+
+
+# ----------------- Manage Teachers -----------------
+@st.fragment
+def teachers_section():
+    st.subheader("Manage Teachers")
+    teacher_name = st.text_input("Teacher Name")
+    teacher_subject = st.text_input("Teacher Subject")
+    teacher_photo = st.file_uploader("Teacher Photo", type=["jpg", "jpeg", "png"], key="t_photo")
+    if st.button("Add / Update Teacher"):
+        if teacher_name and teacher_subject:
+            t_id = ids.next_teacher_id()
+            photo_path = photo_media_id = None
+            try:
+                if teacher_photo:
+                    # Filed as kind "teacher" so it never shows up in the public gallery.
+                    photo_record = media.register_upload(teacher_photo, "teacher", caption=teacher_name)
+                    photo_path, photo_media_id = photo_record["path"], photo_record["id"]
+                datastore.put_record("teachers", t_id, {
+                    "name": teacher_name,
+                    "subject": teacher_subject,
+                    "photo_path": photo_path,
+                    "photo_media_id": photo_media_id
+                }, expected_rev=0)
+                st.success(f"Teacher {teacher_name} added/updated successfully")
+            except blobs.BlobTooLarge as e:
+                st.error(str(e))
+            except datastore.ConflictError:
+                st.error("Teacher ID already taken, please try again.")
+
+    st.write("### Existing Teachers")
+    teachers = load_json(TEACHERS_FILE)
+    for tid, info in teachers.items():
+        cols = st.columns([2,2,1,1])
+        cols[0].write(f"**{info['name']}**")
+        cols[1].write(f"{info['subject']}")
+        if info.get("photo_path") and os.path.exists(info["photo_path"]):
+            cols[2].image(media.display_path(info["photo_path"], 320), width=70)
+        if cols[3].button("Delete", key=f"del_teacher_{tid}"):
+            datastore.delete_record("teachers", tid)
+            if info.get("photo_media_id"):
+                media.remove_file(info["photo_media_id"])
+            st.success("Deleted successfully")
+            rerun_section()
+
+
+# ----------------- Alumni / Achievements Upload -----------------
+@st.fragment
+def alumni_section():
+    st.subheader("Manage Alumni Achievements")
+    uploaded_alumni = st.file_uploader(
+        "Upload Alumni Achievement Photos", 
+        type=["jpg","jpeg","png"], 
+        accept_multiple_files=True,
+        key="alumni_upload"
+    )
+    fresh_alumni = new_uploads(uploaded_alumni, "alumni_upload")
+    if fresh_alumni:
+        submit_photos(fresh_alumni, "alumni")
+    show_jobs(["media"], "alumni_jobs", limit=3)
+
+    st.write("### Existing Alumni Photos")
+    if not show_media_grid("alumni", 12, "admin_alumni", width=320, allow_delete=True):
+        st.info("No alumni achievements uploaded yet.")
+
+
+# ----------------- Fees -----------------
+@st.fragment
+def fees_section():
+    st.subheader("Fees")
+    fee_adm = st.text_input("Admission No", key="fee_adm").strip()
+    fee_student = datastore.get_record("students", fee_adm) if fee_adm else None
+    if fee_adm and fee_student is None:
+        st.error("Admission Number not found.")
+    if fee_student:
+        st.write(f"**{fee_student.get('full_name') or fee_student.get('name')}**: {', '.join(fee_student.get('courses', []))}")
+        balances = fees.student_balances(fee_adm)
+        if balances:
+            st.dataframe(balances, use_container_width=True, hide_index=True)
+            st.write(f"**Outstanding: PKR {sum(b['balance'] for b in balances):,}**")
+        if st.button("Charge standard course fees"):
+            charged = fees.charge_standard_fees(fee_adm)
+            st.session_state["fee_message"] = (f"Charged {len(charged)} course fees." if charged
+                                               else "All listed course fees are already charged.")
+            rerun_section()
+
+        col_course, col_kind, col_amount = st.columns([3, 1, 1])
+        fee_course = col_course.selectbox("Course", fee_student.get("courses") or ["-"], key="fee_course")
+        fee_kind = col_kind.selectbox("Entry", list(fees.KINDS), index=1, key="fee_kind")
+        fee_amount = col_amount.number_input("Amount (PKR)", min_value=1, step=500, key="fee_amount")
+        fee_note = st.text_input("Note (receipt no, reason)", key="fee_note")
+        if st.button("Post entry"):
+            try:
+                fees.post(fee_adm, fee_course, fee_kind, int(fee_amount), fee_note)
+                st.session_state["fee_message"] = f"Posted {fee_kind} of PKR {int(fee_amount):,}."
+                rerun_section()
+            except ValueError as e:
+                st.error(str(e))
+        if st.session_state.get("fee_message"):
+            st.success(st.session_state.pop("fee_message"))
+        ledger = fees.student_ledger(fee_adm)
+        if ledger:
+            st.caption("Ledger (newest first). Entries are never edited; post a correcting entry instead.")
+            st.dataframe(ledger, use_container_width=True, hide_index=True)
+
+    st.write("### Defaulters")
+    col_course, col_min = st.columns([3, 1])
+    due_course = col_course.selectbox("Course", ["All"] + [c[0] for c in fees.COURSES], key="due_course")
+    due_min = col_min.number_input("Minimum due", min_value=1, value=1, step=500, key="due_min")
+    due = fees.defaulters(None if due_course == "All" else due_course, int(due_min))
+    if due:
+        st.dataframe(due, use_container_width=True, hide_index=True)
+    else:
+        st.info("No outstanding balances.")
+
+    st.write("### Collections")
+    col_from, col_to = st.columns(2)
+    today = datetime.date.today()
+    day_from = col_from.date_input("From", today - datetime.timedelta(days=30), key="fee_from")
+    day_to = col_to.date_input("To", today, key="fee_to")
+    days = fees.daily_totals(str(day_from), str(day_to))
+    if days:
+        st.write(f"Collected PKR {sum(d['paid'] for d in days):,} over {len(days)} days with postings.")
+        st.dataframe(days, use_container_width=True, hide_index=True)
+    st.dataframe(fees.course_totals(), use_container_width=True, hide_index=True)
+
+    if st.button("Check balances against the ledger"):
+        problems = fees.verify()
+        if problems:
+            st.error(f"{len(problems)} balances disagree with the ledger; run 'python fees.py rebuild'.")
+        else:
+            st.success("All balances match the ledger.")
+
+
+# ----------------- Notifications -----------------
+@st.fragment
+def notifications_section():
+    st.subheader("Student Notifications")
+    transports = notify.transports_from_env()
+    if transports:
+        st.caption(f"Sending by {', '.join(transports)} from a background worker.")
+    else:
+        st.info("No email / SMS / WhatsApp transport is configured for this server; "
+                "messages wait in the outbox until `python notify.py worker` runs with one.")
+    counts = notify.status_counts()
+    if not counts:
+        st.write("Nothing queued yet.")
+        return
+    st.dataframe(
+        [{"Channel": channel, **{status.title(): n for status, n in sorted(by_status.items())}}
+         for channel, by_status in sorted(counts.items())],
+        use_container_width=True,
+    )
+    show = st.radio("Show", ["Failed", "Pending", "Sent", "All"], horizontal=True, key="outbox_show")
+    st.dataframe(notify.recent(None if show == "All" else show.lower(), limit=50), use_container_width=True)
+    failed = sum(by_status.get("failed", 0) for by_status in counts.values())
+    if failed and st.button(f"Retry {failed} failed messages"):
+        notify.retry_failed()
+        rerun_section()
+
+
+# ----------------- Background Jobs -----------------
+@st.fragment
+def jobs_section():
+    st.subheader("Background Jobs")
+    st.caption("Bulk PDFs, photo processing, exports and imports run here, so they carry on "
+               "when this page is closed and resume after a server restart.")
+    show_jobs(None, "all_jobs", limit=25)
+
+
+# ----------------- Admin Panel -----------------
+# Only the chosen section runs, and each one is a fragment: pressing a button
+# or typing inside a section reruns that section alone, not the whole panel.
+SECTIONS = {
+    "Students": students_section,
+    "Analytics": analytics_section,
+    "Bulk PDFs": bulk_pdfs_section,
+    "Marks": marks_section,
+    "Fees": fees_section,
+    "Notifications": notifications_section,
+    "Jobs": jobs_section,
+    "Import": import_section,
+    "Export": export_section,
+    "Gallery": gallery_section,
+    "Teachers": teachers_section,
+    "Alumni": alumni_section,
+}
+
+
+def render():
+    st.header("Admin Panel")
+    
+    admin_user = st.text_input("Admin Username")
+    admin_pass = st.text_input("Admin Password", type="password")
+    if st.button("Admin Login"):
+        if admin_user == ADMIN_CREDENTIALS["username"] and make_hash(admin_pass) == ADMIN_CREDENTIALS["password_hash"]:
+            st.session_state["admin_logged_in"] = True
+            remember_login("admin", admin_user)
+            st.success("Admin logged in successfully")
+        else:
+            st.error("Invalid admin credentials")
+
+    if st.session_state.get("admin_logged_in"):
+        if st.button("Logout"):
+            st.session_state["admin_logged_in"] = False
+            forget_login("admin", ADMIN_CREDENTIALS["username"])
+            st.rerun()
+
+        cache_stats = datacache.stats()
+        st.caption(
+            f"Data cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+            f"(hit rate {cache_stats['hit_rate']:.0%}), {cache_stats['entries']} files cached"
+        )
+        pdf_stats = pdfs.cache.stats()
+        st.caption(
+            f"PDF cache: {pdf_stats['entries']} documents, "
+            f"{pdf_stats['bytes'] / 1024:.0f} KB of {pdf_stats['max_bytes'] // (1024 * 1024)} MB, "
+            f"{pdf_stats['hits']} hits, {pdf_stats['misses']} misses, {pdf_stats['evictions']} evictions"
+        )
+
+        section = st.radio("Section", list(SECTIONS), horizontal=True, key="admin_section")
+        st.write("---")
+        SECTIONS[section]()
@@ -0,0 +1,93 @@
+import datetime
+
+import streamlit as st
+
+import blobs
+import datastore
+
+from .common import generate_admission_no, save_student, save_uploaded_file
+
+
+# ----------------- Admission Form Page -----------------
+def render():
+    st.header("Admission Form 2025")
+    pre_username = st.session_state.get("username") if st.session_state.get("logged_in") else ""
+    col1, col2 = st.columns(2)
+    with col1:
+        full_name = st.text_input("Full Name", value=pre_username)
+        father_name = st.text_input("Father Name")
+        # Date of Birth updated from 1950 to today
+        date_of_birth = st.date_input(
+            "Date of Birth", 
+            min_value=datetime.date(1950, 1, 1),
+            max_value=datetime.date.today()
+        )
+        religion = st.text_input("Religion")
+        contact_no = st.text_input("Contact No")
+        qualification = st.text_input("Qualification")
+    with col2:
+        caste = st.text_input("Caste")
+        gender = st.radio("Gender", ["Male", "Female"])
+        nationality = st.text_input("Nationality")
+        whatsapp_no = st.text_input("WhatsApp No")
+        email = st.text_input("Email")
+        photo = st.file_uploader("Upload Passport Size Photo", type=["jpg", "jpeg", "png"])
+    present_address = st.text_area("Present Address")
+    st.write("### Select Course for Admission")
+    colA, colB = st.columns(2)
+    with colA:
+        c1 = st.checkbox("Diploma in Information Technology (12 Months)")
+        c2 = st.checkbox("Certificate in Information Technology (06 Months)")
+        c3 = st.checkbox("Short Course of Computer Science (04 Months)")
+    with colB:
+        c4 = st.checkbox("MS Office / Word / Excel / PowerPoint (02 Months)")
+        c5 = st.checkbox("Typing (English, Urdu, Sindhi) (02 Months)")
+        c6 = st.checkbox("Special Course - All Subjects Expert (02 Months)")
+        c7 = st.checkbox("Tuition (Select Class)")
+    tuition_class = ""
+    if c7:
+        tuition_class = st.text_input("Enter Class (e.g., 6th, 7th, 8th)")
+    selected_courses = []
+    if c1: selected_courses.append("Diploma in Information Technology (12 Months)")
+    if c2: selected_courses.append("Certificate in Information Technology (06 Months)")
+    if c3: selected_courses.append("Short Course of Computer Science (04 Months)")
+    if c4: selected_courses.append("MS Office / Word / Excel / PowerPoint (02 Months)")
+    if c5: selected_courses.append("Typing (English, Urdu, Sindhi) (02 Months)")
+    if c6: selected_courses.append("Special Course - All Subjects Expert (02 Months)")
+    if c7: selected_courses.append(f"Tuition Class: {tuition_class}")
+
+    if st.button("Submit Admission"):
+        try:
+            photo_blob = save_uploaded_file(photo)
+        except blobs.BlobTooLarge as e:
+            photo_blob = None
+            st.error(str(e))
+        if not (full_name and father_name and contact_no and selected_courses and present_address):
+            st.error("Please fill all required fields.")
+        elif photo is None or photo_blob:
+            admission_no = generate_admission_no()
+            student = {
+                "admission_no": admission_no,
+                "full_name": full_name,
+                "father_name": father_name,
+                "date_of_birth": str(date_of_birth),
+                "religion": religion,
+                "caste": caste,
+                "gender": gender,
+                "nationality": nationality,
+                "contact_no": contact_no,
+                "whatsapp_no": whatsapp_no,
+                "email": email,
+                "qualification": qualification,
+                "present_address": present_address,
+                "courses": selected_courses,
+                "photo_path": photo_blob["path"] if photo_blob else None,
+                "photo_blob": photo_blob["hash"] if photo_blob else None,
+                "status": "Pending",
+                "applied_at": str(datetime.datetime.now())
+            }
+            try:
+                save_student(student, new=True)
+                st.success(f"Admission submitted successfully! Your Admission No: **{admission_no}**")
+            except datastore.ConflictError:
+                st.error("Admission number already taken, please submit again.")
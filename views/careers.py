@@ -0,0 +1,30 @@
+import streamlit as st
+
+
+# ----------------- Careers Page -----------------
+def render():
+    st.title("💼 Careers")
+    st.markdown("---")
+    
+    st.info("Find latest job opportunities, internships, and guidance on career planning.")
+    
+    # Example career cards
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Teaching Positions**")
+        st.write("Join our academy as a qualified instructor.")
+        st.write("- Subjects: Computer Science, Math, English")
+        st.write("- Apply: Submit resume and cover letter")
+        if st.button("Apply Now", key="teaching_job"):
+            st.success("Redirecting to career application form...")
+
+    with col2:
+        st.markdown("**Administrative Positions**")
+        st.write("Work in academy administration, admissions, and support.")
+        st.write("- Roles: Admin, Accounts, Student Support")
+        if st.button("Apply Now", key="admin_job"):
+            st.success("Redirecting to career application form...")
+    
+    st.markdown("---")
+    st.write("For more information about careers, contact HR or visit our careers portal.")
@@ -0,0 +1,33 @@
+import streamlit as st
+
+import datastore
+import pdfs
+
+
+# ----------------- Certificate Page -----------------
+def render():
+    st.title("🎓 Course Completion Certificate")
+    st.markdown("---")
+    
+    st.info("Download your professionally designed course completion certificate below.")
+    
+    admission_no = st.text_input("Enter your Admission Number")
+    
+    if st.button("Download Certificate"):
+        student = datastore.get_record("students", admission_no) if admission_no else None
+        
+        if student:
+            
+            if student.get("course_completed", False):
+                # Rendered in memory and served from the PDF cache on repeat downloads.
+                name = pdfs.student_name(student)
+                st.download_button(
+                    label="📥 Download Certificate",
+                    data=pdfs.certificate_pdf(student),
+                    file_name=f"Certificate_{name}.pdf",
+                    mime="application/pdf"
+                )
+            else:
+                st.warning("Course not completed yet.")
+        else:
+            st.error("Admission Number not found.")
@@ -0,0 +1,198 @@
+import hashlib
+import os
+
+import streamlit as st
+
+# The data layer is imported here, ahead of any page, because search,
+# analytics, notify and blobs register write hooks that every
+# students/teachers write must run.
+import analytics  # noqa: F401  (registers the admissions counters hook)
+import blobs
+import datacache
+import datastore
+import ids
+import jobs
+import media
+import notify
+import search  # noqa: F401  (registers the students search hook)
+import sessions
+
+# ----------------- Configuration -----------------
+APP_TITLE = "FAYAZ INSTITUTE OF COMPUTER SCIENCE AND EDUCATION KANDIARO"
+TEACHERS_FILE = "teachers.json"
+UPLOAD_DIR = "uploads"
+GALLERY_DIR = "gallery"
+BACKGROUND_WORKERS_ENV = "FICSE_BACKGROUND_WORKERS"
+
+ADMIN_CREDENTIALS = {
+    "username": "admin",
+    "password_hash": hashlib.sha256("fayazadmin123".encode()).hexdigest()
+}
+
+DEFAULT_TEACHERS = {
+    "T001": {"name": "Muhammad Ali", "subject": "Mathematics"},
+    "T002": {"name": "Aisha Bano", "subject": "Computer Science"},
+    "T003": {"name": "Sara Khan", "subject": "English"},
+}
+
+
+# ----------------- One-time setup -----------------
+
+@st.cache_resource(show_spinner=False)
+def init(db_file: str):
+    # Runs once per server process and data store, not on every rerun.
+    # All processes started with the same FICSE_DATA_DIR share one data store.
+    datastore.use_data_dir()
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    os.makedirs(GALLERY_DIR, exist_ok=True)
+    with notify.muted():
+        datastore.migrate_json_files()
+    media.import_existing()
+    if not datastore.count_records("teachers"):
+        datastore.put_records("teachers", DEFAULT_TEACHERS)
+    # FICSE_BACKGROUND_WORKERS=0 leaves jobs and notices to separate
+    # "python jobs.py worker" / "python notify.py worker" processes, as when
+    # several app processes share one data store.
+    if os.environ.get(BACKGROUND_WORKERS_ENV, "1") == "0":
+        return True
+    # Queued notices go out from a background thread when a transport is
+    # configured; otherwise they wait for "python notify.py worker".
+    transports = notify.transports_from_env()
+    if transports:
+        notify.start_background(transports, db_file)
+    jobs.start_background(db_file)
+    return True
+
+
+# ----------------- Logins across app processes -----------------
+# A login is kept in st.session_state for this session and, as a signed
+# token, in the page URL. Behind a load balancer a reconnect may reach
+# another app process with an empty session; it restores the login from
+# the token instead of asking for the password again. Logging out or a
+# password reset revokes the tokens issued before (see sessions.py).
+
+SESSION_PARAMS = {"student": "session", "admin": "admin_session"}
+
+def _student_version(username: str):
+    user = datastore.get_record("users", username)
+    return user.get("password", "") if user else None
+
+def _admin_version(username: str):
+    return ADMIN_CREDENTIALS["password_hash"] if username == ADMIN_CREDENTIALS["username"] else None
+
+sessions.register_version("student", _student_version)
+sessions.register_version("admin", _admin_version)
+
+def remember_login(role: str, subject: str):
+    st.query_params[SESSION_PARAMS[role]] = sessions.issue(role, subject)
+
+def forget_login(role: str, subject: str = None):
+    # With a subject (on logout) every token it was issued is revoked too,
+    # not only the one in this page's URL.
+    if subject:
+        sessions.revoke(role, subject)
+    st.query_params.pop(SESSION_PARAMS[role], None)
+
+def restore_logins():
+    # On every rerun: cheap once the session state already has the login.
+    student = st.query_params.get(SESSION_PARAMS["student"])
+    if student and not st.session_state.get("logged_in"):
+        claims = sessions.verify(student, "student")
+        if claims:
+            st.session_state["logged_in"] = True
+            st.session_state["username"] = claims["sub"]
+        else:
+            forget_login("student")
+    admin = st.query_params.get(SESSION_PARAMS["admin"])
+    if admin and not st.session_state.get("admin_logged_in"):
+        if sessions.verify(admin, "admin"):
+            st.session_state["admin_logged_in"] = True
+        else:
+            forget_login("admin")
+
+
+# ----------------- Helper functions -----------------
+
+def make_hash(password: str) -> str:
+    return hashlib.sha256(password.encode()).hexdigest()
+
+def load_json(path: str):
+    # Served from the shared read cache; the returned dict must not be mutated.
+    collection = datastore.collection_for(path)
+    if not collection:
+        raise ValueError(f"{path} is not a stored collection")
+    return datacache.get(path, datastore.cache_stamp(collection), lambda: datastore.load_collection(collection))
+
+def save_student(student: dict, new: bool = False):
+    # new=True refuses to overwrite an existing admission with the same number.
+    datastore.put_record("students", student["admission_no"], student, expected_rev=0 if new else None)
+
+def generate_admission_no():
+    # FICSE-YYYYMMDD-NNN from the day's durable counter; never repeats.
+    return ids.next_admission_no()
+
+def save_uploaded_file(uploaded_file):
+    # Streams the upload into the content-addressed blob store and returns
+    # {"hash", "path", "size"}; the student record takes the reference.
+    if uploaded_file is None:
+        return None
+    blob = blobs.store_stream(uploaded_file, uploaded_file.name)
+    try:
+        media.make_derivatives(blob["path"])
+    except (OSError, ValueError):
+        pass
+    return blob
+
+def new_uploads(files, key: str):
+    # file_uploader keeps returning the same files on every rerun; only hand
+    # back the ones this session has not stored yet.
+    done = st.session_state.setdefault(f"{key}_stored", set())
+    fresh = [f for f in files or [] if f.file_id not in done]
+    done.update(f.file_id for f in fresh)
+    return fresh
+
+def rerun_section():
+    # Inside an admin section (a fragment) only that section reruns. Streamlit
+    # refuses a fragment-scoped rerun during a full-app run, so fall back to one.
+    try:
+        st.rerun(scope="fragment")
+    except st.errors.StreamlitAPIException:
+        st.rerun()
+
+
+# ----------------- Media helpers -----------------
+
+def show_media_grid(kind, page_size, key, width=640, allow_delete=False):
+    # One page of the media manifest in upload order; only that page's
+    # images are sent to the browser. Returns False when there is nothing to show.
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    items, next_cursor = media.list_media(kind, page_size, after=cursors[-1])
+    if not items and len(cursors) > 1:
+        cursors.pop()
+        rerun_section()
+    if not items:
+        return False
+    cols = st.columns(3)
+    for idx, item in enumerate(items):
+        with cols[idx % 3]:
+            st.image(media.media_src(item, width), caption=item["caption"], use_container_width=True)
+            if allow_delete and st.button("Delete", key=f"del_{key}_{item['id']}"):
+                media.remove_file(item["id"])
+                st.success(f"{item['caption']} deleted successfully")
+                rerun_section()
+    if len(cursors) > 1 or next_cursor is not None:
+        nav_prev, nav_info, nav_next = st.columns(3)
+        if nav_prev.button("◀ Previous", key=f"{key}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            rerun_section()
+        nav_info.write(f"Page {len(cursors)} of {max(1, -(-media.count_media(kind) // page_size))}")
+        if nav_next.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            rerun_section()
+    return True
+
+
+# ----------------- Footer -----------------
+def show_footer():
+    st.write("---")
+    st.write("© FAYAZ INSTITUTE OF COMPUTER SCIENCE AND EDUCATION KANDIARO")
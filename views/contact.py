@@ -0,0 +1,10 @@
+import streamlit as st
+
+
+# ----------------- Contact Page -----------------
+def render():
+    st.header("Contact Us")
+    st.write("Address: Kandiaro — Sindh, Pakistan")
+    st.write("Phone / WhatsApp: 0300-XXXXXXX")
+    st.write("Email: info@fayazinstitute.example")
+    st.markdown("[Open Google Maps](https://maps.google.com)")
@@ -0,0 +1,12 @@
+import streamlit as st
+
+import fees
+
+
+# ----------------- Courses Page -----------------
+def render():
+    st.header("Courses Offered")
+    for _, c, d, f in fees.COURSES:
+        st.subheader(c)
+        st.write(f"Duration: **{d}**, Fee: **PKR {f:,}**")
+        st.write("-----")
@@ -0,0 +1,47 @@
+import streamlit as st
+
+import datastore
+
+from .common import make_hash
+
+
+# ----------------- Forgot Password -----------------
+def cnic_matches(stored, entered) -> bool:
+    # Compared as digits only, so "42101-1234567-1" matches "4210112345671";
+    # an account without a CNIC on file can never be reset this way.
+    stored, entered = datastore.normalize_cnic(stored), datastore.normalize_cnic(entered)
+    return bool(stored) and stored == entered
+
+
+def render():
+    st.subheader("Reset Password")
+
+    username = st.text_input("Enter Username")
+    cnic = st.text_input("Enter CNIC / Mobile")
+    new_pass = st.text_input("Enter New Password", type="password")
+    confirm_pass = st.text_input("Confirm New Password", type="password")
+
+    if st.button("Reset Password"):
+        if new_pass != confirm_pass:
+            st.error("Passwords do not match!")
+            return
+        
+        user = datastore.get_record("users", username)
+
+        if user and cnic_matches(user.get("cnic"), cnic):
+
+            hashed = make_hash(new_pass)
+            try:
+                datastore.update_record("users", username, lambda u: dict(u, password=hashed))
+            except KeyError:
+                st.error("User not found or CNIC mismatch!")
+                return
+            except datastore.ConflictError:
+                st.error("The account kept changing; please try again.")
+                return
+
+            st.success("Password reset successfully! Please login again.")
+            st.rerun()
+
+        else:
+            st.error("User not found or CNIC mismatch!")
@@ -0,0 +1,11 @@
+import streamlit as st
+
+from .common import show_media_grid
+
+
+# ----------------- Gallery Page -----------------
+def render():
+    st.header("Gallery")
+    st.info("Gallery images are uploaded by Admin only.")
+    if not show_media_grid("gallery", 12, "gallery_page"):
+        st.info("No images in gallery yet.")
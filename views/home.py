@@ -0,0 +1,26 @@
+import streamlit as st
+
+import media
+
+from .common import APP_TITLE, show_media_grid
+
+
+# ----------------- Home Page -----------------
+def render():
+    st.header("Welcome")
+    st.subheader(APP_TITLE)
+    st.write("We provide high-quality education in Computer Science, English, Maths, ICT and more.")
+    
+    # Display gallery images uploaded by admin
+    if media.count_media("gallery"):
+        st.subheader("Gallery")
+        show_media_grid("gallery", 6, "home_gallery")
+    else:
+        st.info("No photos in gallery yet. Admin can upload images in the Admin Panel.")
+    
+    # Display alumni / achievements images
+    if media.count_media("alumni"):
+        st.subheader("Alumni Achievements")
+        show_media_grid("alumni", 6, "home_alumni")
+    else:
+        st.info("No alumni achievements uploaded yet.")
@@ -0,0 +1,54 @@
+import streamlit as st
+
+import datastore
+import fees
+import pdfs
+
+from .common import forget_login, make_hash, remember_login
+
+
+# ----------------- Login Page -----------------
+def render():
+    st.header("Student Login")
+    username = st.text_input("Username")
+    password = st.text_input("Password", type="password")
+    
+    
+    
+    if st.button("Login"):
+        user = datastore.get_record("users", username)
+        if user and user["password"] == make_hash(password):
+            st.session_state["logged_in"] = True
+            st.session_state["username"] = username
+            remember_login("student", username)
+            st.success("Login successful.")
+        else:
+            st.error("Invalid login.")
+
+    if st.session_state.get("logged_in"):
+        st.write("---")
+        st.subheader("Student Dashboard")
+        uname = st.session_state["username"]
+        uinfo = datastore.get_record("users", uname) or {}
+        st.write(f"**Name:** {uname}")
+        st.write(f"**CNIC:** {uinfo.get('cnic')}")
+        st.write(f"**Mobile:** {uinfo.get('mobile')}")
+        matches = (datastore.find_keys("students", "full_name", uname)
+                   or datastore.find_keys("students", "cnic", uinfo.get("cnic")))
+        admission_record = datastore.get_record("students", matches[0]) if matches else None
+        if admission_record:
+            st.success("Admission Record Found")
+            st.write(f"**Admission No:** {admission_record['admission_no']}")
+            st.write(f"**Status:** {admission_record['status']}")
+            balances = fees.student_balances(admission_record["admission_no"])
+            if balances:
+                st.write(f"**Fees Outstanding:** PKR {sum(b['balance'] for b in balances):,}")
+            if st.button("Download Admission PDF"):
+                st.download_button("Download PDF", data=pdfs.admission_form_pdf(admission_record), file_name=f"{admission_record['admission_no']}.pdf", mime="application/pdf")
+        else:
+            st.info("No admission found. Submit admission form.")
+
+        if st.button("Logout"):
+            st.session_state["logged_in"] = False
+            forget_login("student", st.session_state.get("username"))
+            st.rerun()
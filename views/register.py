@@ -0,0 +1,42 @@
+import datetime
+
+import streamlit as st
+
+import datastore
+
+from .common import make_hash
+
+
+# ----------------- Register Page -----------------
+def render():
+    st.header("Student Registration")
+    st.write("Create login for student portal.")
+    col1, col2 = st.columns(2)
+    with col1:
+        username = st.text_input("Full Name")
+        cnic = st.text_input("CNIC (without dashes)")
+        mobile = st.text_input("Mobile Number")
+    with col2:
+        password = st.text_input("Password", type="password")
+        password2 = st.text_input("Confirm Password", type="password")
+        agree = st.checkbox("I confirm the information is correct.")
+    if st.button("Register"):
+        if not (username and password and password2 and cnic and mobile):
+            st.error("All fields required.")
+        elif password != password2:
+            st.error("Passwords do not match.")
+        elif datastore.get_record("users", username):
+            st.error("Username already exists.")
+        elif not agree:
+            st.error("Please confirm the info.")
+        else:
+            try:
+                datastore.put_record("users", username, {
+                    "cnic": cnic,
+                    "mobile": mobile,
+                    "password": make_hash(password),
+                    "created_at": str(datetime.datetime.now())
+                }, expected_rev=0)
+                st.success("Registration successful. Go to Login.")
+            except datastore.ConflictError:
+                st.error("Username already exists.")
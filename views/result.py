@@ -0,0 +1,28 @@
+import streamlit as st
+
+import results
+
+
+# ----------------- Result Page -----------------
+def render():
+    st.title("📊 Scholarship Result")
+    st.markdown("---")
+    
+    st.info("Check your scholarship exam results below.")
+
+    # Input student info to fetch result
+    admission_no = st.text_input("Enter your Admission Number")
+    
+    if st.button("View Result"):
+        # The published snapshot while it is current, the student's record otherwise.
+        result = results.lookup(admission_no) if admission_no else None
+        
+        if result:
+            if result["marks"] is not None:
+                st.success(f"Student: {result['name']}")
+                st.write(f"Marks Obtained: {result['marks']}")
+                st.write(f"Status: {result['status']}")
+            else:
+                st.warning("Marks not available yet.")
+        else:
+            st.error("Admission Number not found.")
@@ -0,0 +1,33 @@
+import streamlit as st
+
+
+# ----------------- Scholarship Page -----------------
+def render():
+    st.title("🎓 Scholarships")
+    st.markdown("---")
+    
+    st.info("Explore available scholarships, eligibility criteria, and application procedures below.")
+    
+    # Example scholarship cards
+    st.subheader("Available Scholarships")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Merit-Based Scholarship**")
+        st.write("Awarded to students with outstanding academic performance.")
+        st.write("- Eligibility: GPA ≥ 3.5")
+        st.write("- Amount: 50% tuition fee waiver")
+        if st.button("Apply Now", key="merit_scholarship"):
+            st.success("Redirecting to scholarship application form...")
+
+    with col2:
+        st.markdown("**Need-Based Scholarship**")
+        st.write("For students who need financial assistance.")
+        st.write("- Eligibility: Verified financial documents")
+        st.write("- Amount: Up to 100% tuition fee waiver")
+        if st.button("Apply Now", key="need_scholarship"):
+            st.success("https://www.google.com/")
+
+    st.markdown("---")
+    st.write("For more information, contact our office or visit the official scholarship page.")
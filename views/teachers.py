@@ -0,0 +1,11 @@
+import streamlit as st
+
+from .common import TEACHERS_FILE, load_json
+
+
+# ----------------- Teachers Page -----------------
+def render():
+    st.header("Our Teachers")
+    t = load_json(TEACHERS_FILE)
+    for tid, info in t.items():
+        st.write(f"**{info['name']}** — {info['subject']}")